@@ -2,11 +2,8 @@
 Module for including functions of AWS IoT operations of PicoLTE module.
 """
 
-import time
-
 from pico_lte.common import config
-from pico_lte.utils.manager import StateManager, Step
-from pico_lte.utils.status import Status
+from pico_lte.utils.manager import Param, Step, Workflow
 from pico_lte.utils.helpers import get_parameter
 
 
@@ -33,6 +30,13 @@ class AWS:
         self.mqtt = mqtt
         self.http = http
 
+        # steps of the workflows are built once, on their first run
+        self.publish_message_workflow = Workflow(self._publish_message_steps, "aws.publish_message")
+        self.subscribe_topics_workflow = Workflow(
+            self._subscribe_topics_steps, "aws.subscribe_message"
+        )
+        self.post_message_workflow = Workflow(self._post_message_steps, "aws.post_message")
+
     def publish_message(self, payload, host=None, port=None, topic=None):
         """
         Function for publishing a message to AWS IoT by using MQTT.
@@ -62,6 +66,17 @@ class AWS:
         if topic is None:
             topic = get_parameter(["aws", "mqtts", "pub_topic"])
 
+        return self.publish_message_workflow.run(
+            {
+                "host": host,
+                "port": port,
+                "payload": payload,
+                "topic": topic,
+            }
+        )
+
+    def _publish_message_steps(self):
+        """Returns the steps of publish_message(), see Workflow."""
         # Check if client is connected to the broker
         step_check_mqtt_connected = Step(
             function=self.mqtt.is_connected_to_broker,
@@ -110,21 +125,14 @@ class AWS:
         step_ssl_configuration = Step(
             function=self.ssl.configure_for_x509_certification,
             name="ssl_configuration",
-            success="set_mqtt_version",
+            success="set_mqtt_configs",
             fail="failure",
             cachable=True,
         )
 
-        step_set_mqtt_version = Step(
-            function=self.mqtt.set_version_config,
-            name="set_mqtt_version",
-            success="set_mqtt_ssl_mode",
-            fail="failure",
-        )
-
-        step_set_mqtt_ssl_mode = Step(
-            function=self.mqtt.set_ssl_mode_config,
-            name="set_mqtt_ssl_mode",
+        step_set_mqtt_configs = Step(
+            function=self.mqtt.set_ssl_connection_configs,
+            name="set_mqtt_configs",
             success="open_mqtt_connection",
             fail="failure",
         )
@@ -134,7 +142,7 @@ class AWS:
             name="open_mqtt_connection",
             success="connect_mqtt_broker",
             fail="failure",
-            function_params={"host": host, "port": port},
+            function_params={"host": Param("host"), "port": Param("port")},
         )
 
         step_connect_mqtt_broker = Step(
@@ -149,36 +157,23 @@ class AWS:
             name="publish_message",
             success="success",
             fail="failure",
-            function_params={"payload": payload, "topic": topic},
+            function_params={"payload": Param("payload"), "topic": Param("topic")},
             cachable=True,
         )
 
-        # Add cache if it is not already existed
-        function_name = "aws.publish_message"
-
-        sm = StateManager(first_step=step_check_mqtt_connected, function_name=function_name)
-
-        sm.add_step(step_check_mqtt_connected)
-        sm.add_step(step_check_mqtt_opened)
-        sm.add_step(step_deactivate_pdp_context)
-        sm.add_step(step_load_certificates)
-        sm.add_step(step_network_reg)
-        sm.add_step(step_get_pdp_ready)
-        sm.add_step(step_ssl_configuration)
-        sm.add_step(step_set_mqtt_version)
-        sm.add_step(step_set_mqtt_ssl_mode)
-        sm.add_step(step_open_mqtt_connection)
-        sm.add_step(step_connect_mqtt_broker)
-        sm.add_step(step_publish_message)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_check_mqtt_connected,
+            step_check_mqtt_opened,
+            step_deactivate_pdp_context,
+            step_load_certificates,
+            step_network_reg,
+            step_get_pdp_ready,
+            step_ssl_configuration,
+            step_set_mqtt_configs,
+            step_open_mqtt_connection,
+            step_connect_mqtt_broker,
+            step_publish_message,
+        ]
 
     def subscribe_topics(self, host=None, port=None, topics=None):
         """
@@ -203,6 +198,10 @@ class AWS:
         if port is None:
             port = get_parameter(["aws", "mqtts", "port"], 8883)
 
+        return self.subscribe_topics_workflow.run({"host": host, "port": port, "topics": topics})
+
+    def _subscribe_topics_steps(self):
+        """Returns the steps of subscribe_topics(), see Workflow."""
         # Check if client is connected to the broker
         step_check_mqtt_connected = Step(
             function=self.mqtt.is_connected_to_broker,
@@ -254,20 +253,13 @@ class AWS:
         step_ssl_configuration = Step(
             function=self.ssl.configure_for_x509_certification,
             name="ssl_configuration",
-            success="set_mqtt_version",
-            fail="failure",
-        )
-
-        step_set_mqtt_version = Step(
-            function=self.mqtt.set_version_config,
-            name="set_mqtt_version",
-            success="set_mqtt_ssl_mode",
+            success="set_mqtt_configs",
             fail="failure",
         )
 
-        step_set_mqtt_ssl_mode = Step(
-            function=self.mqtt.set_ssl_mode_config,
-            name="set_mqtt_ssl_mode",
+        step_set_mqtt_configs = Step(
+            function=self.mqtt.set_ssl_connection_configs,
+            name="set_mqtt_configs",
             success="open_mqtt_connection",
             fail="failure",
         )
@@ -277,7 +269,7 @@ class AWS:
             name="open_mqtt_connection",
             success="connect_mqtt_broker",
             fail="failure",
-            function_params={"host": host, "port": port},
+            function_params={"host": Param("host"), "port": Param("port")},
         )
 
         step_connect_mqtt_broker = Step(
@@ -292,36 +284,23 @@ class AWS:
             name="subscribe_topics",
             success="success",
             fail="failure",
-            function_params={"topics": topics},
+            function_params={"topics": Param("topics")},
             cachable=True,
         )
 
-        # Add cache if it is not already existed
-        function_name = "aws.subscribe_message"
-
-        sm = StateManager(first_step=step_check_mqtt_connected, function_name=function_name)
-
-        sm.add_step(step_check_mqtt_connected)
-        sm.add_step(step_check_mqtt_opened)
-        sm.add_step(step_deactivate_pdp_context)
-        sm.add_step(step_load_certificates)
-        sm.add_step(step_network_reg)
-        sm.add_step(step_get_pdp_ready)
-        sm.add_step(step_ssl_configuration)
-        sm.add_step(step_set_mqtt_version)
-        sm.add_step(step_set_mqtt_ssl_mode)
-        sm.add_step(step_open_mqtt_connection)
-        sm.add_step(step_connect_mqtt_broker)
-        sm.add_step(step_subscribe_topics)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_check_mqtt_connected,
+            step_check_mqtt_opened,
+            step_deactivate_pdp_context,
+            step_load_certificates,
+            step_network_reg,
+            step_get_pdp_ready,
+            step_ssl_configuration,
+            step_set_mqtt_configs,
+            step_open_mqtt_connection,
+            step_connect_mqtt_broker,
+            step_subscribe_topics,
+        ]
 
     def read_messages(self):
         """
@@ -352,6 +331,10 @@ class AWS:
             if endpoint and topic:
                 url = f"https://{endpoint}:8443/topics/{topic}?qos=1"
 
+        return self.post_message_workflow.run({"url": url, "payload": payload})
+
+    def _post_message_steps(self):
+        """Returns the steps of post_message(), see Workflow."""
         step_load_certificates = Step(
             function=self.auth.load_certificates,
             name="load_certificates",
@@ -392,7 +375,7 @@ class AWS:
             name="set_server_url",
             success="post_request",
             fail="failure",
-            function_params={"url": url},
+            function_params={"url": Param("url")},
         )
 
         step_post_request = Step(
@@ -400,7 +383,7 @@ class AWS:
             name="post_request",
             success="read_response",
             fail="failure",
-            function_params={"data": payload},
+            function_params={"data": Param("payload")},
             cachable=True,
             interval=2,
         )
@@ -413,24 +396,13 @@ class AWS:
             function_params={"desired_response": '"message":"OK"'},
         )
 
-        # Add cache if it is not already existed
-        function_name = "aws.post_message"
-
-        sm = StateManager(first_step=step_load_certificates, function_name=function_name)
-
-        sm.add_step(step_load_certificates)
-        sm.add_step(step_network_reg)
-        sm.add_step(step_get_pdp_ready)
-        sm.add_step(step_ssl_configuration)
-        sm.add_step(step_http_ssl_configuration)
-        sm.add_step(step_set_server_url)
-        sm.add_step(step_post_request)
-        sm.add_step(step_read_response)
-
-        while True:
-            result = sm.run()
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_load_certificates,
+            step_network_reg,
+            step_get_pdp_ready,
+            step_ssl_configuration,
+            step_http_ssl_configuration,
+            step_set_server_url,
+            step_post_request,
+            step_read_response,
+        ]
@@ -2,11 +2,8 @@
 Module for including functions of Azure IoT operations of PicoLTE module.
 """
 
-import time
-
 from pico_lte.common import config
-from pico_lte.utils.manager import StateManager, Step
-from pico_lte.utils.status import Status
+from pico_lte.utils.manager import Param, Step, Workflow
 from pico_lte.utils.helpers import get_parameter
 
 
@@ -36,6 +33,14 @@ class Azure:
         self.device_id = get_parameter(["azure", "device_id"]) if (device_id is None) else device_id
         self.hub_name = get_parameter(["azure", "hub_name"]) if (hub_name is None) else hub_name
 
+        # steps of the workflows are built once, on their first run
+        self.publish_message_workflow = Workflow(
+            self._publish_message_steps, "azure.publish_message"
+        )
+        self.subscribe_topics_workflow = Workflow(
+            self._subscribe_topics_steps, "azure.subscribe_message"
+        )
+
     def publish_message(
         self, payload, host=None, port=None, topic=None, client_id=None, username=None
     ):
@@ -89,6 +94,19 @@ class Azure:
             else username
         )
 
+        return self.publish_message_workflow.run(
+            {
+                "host": host,
+                "port": port,
+                "username": username,
+                "client_id": client_id,
+                "payload": payload,
+                "topic": topic,
+            }
+        )
+
+    def _publish_message_steps(self):
+        """Returns the steps of publish_message(), see Workflow."""
         # Check if client is connected to the broker
         step_check_mqtt_connected = Step(
             function=self.mqtt.is_connected_to_broker,
@@ -137,21 +155,14 @@ class Azure:
         step_ssl_configuration = Step(
             function=self.ssl.configure_for_x509_certification,
             name="ssl_configuration",
-            success="set_mqtt_version",
+            success="set_mqtt_configs",
             fail="failure",
             cachable=True,
         )
 
-        step_set_mqtt_version = Step(
-            function=self.mqtt.set_version_config,
-            name="set_mqtt_version",
-            success="set_mqtt_ssl_mode",
-            fail="failure",
-        )
-
-        step_set_mqtt_ssl_mode = Step(
-            function=self.mqtt.set_ssl_mode_config,
-            name="set_mqtt_ssl_mode",
+        step_set_mqtt_configs = Step(
+            function=self.mqtt.set_ssl_connection_configs,
+            name="set_mqtt_configs",
             success="open_mqtt_connection",
             fail="failure",
         )
@@ -161,7 +172,7 @@ class Azure:
             name="open_mqtt_connection",
             success="connect_mqtt_broker",
             fail="failure",
-            function_params={"host": host, "port": port},
+            function_params={"host": Param("host"), "port": Param("port")},
         )
 
         step_connect_mqtt_broker = Step(
@@ -170,9 +181,9 @@ class Azure:
             success="publish_message",
             fail="failure",
             function_params={
-                "username": username,
+                "username": Param("username"),
                 "password": "unused",
-                "client_id_string": client_id,
+                "client_id_string": Param("client_id"),
             },
         )
 
@@ -181,36 +192,23 @@ class Azure:
             name="publish_message",
             success="success",
             fail="failure",
-            function_params={"payload": payload, "topic": topic},
+            function_params={"payload": Param("payload"), "topic": Param("topic")},
             cachable=True,
         )
 
-        # Add cache if it is not already existed
-        function_name = "azure.publish_message"
-
-        sm = StateManager(first_step=step_check_mqtt_connected, function_name=function_name)
-
-        sm.add_step(step_check_mqtt_connected)
-        sm.add_step(step_check_mqtt_opened)
-        sm.add_step(step_deactivate_pdp_context)
-        sm.add_step(step_load_certificates)
-        sm.add_step(step_network_reg)
-        sm.add_step(step_get_pdp_ready)
-        sm.add_step(step_ssl_configuration)
-        sm.add_step(step_set_mqtt_version)
-        sm.add_step(step_set_mqtt_ssl_mode)
-        sm.add_step(step_open_mqtt_connection)
-        sm.add_step(step_connect_mqtt_broker)
-        sm.add_step(step_publish_message)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_check_mqtt_connected,
+            step_check_mqtt_opened,
+            step_deactivate_pdp_context,
+            step_load_certificates,
+            step_network_reg,
+            step_get_pdp_ready,
+            step_ssl_configuration,
+            step_set_mqtt_configs,
+            step_open_mqtt_connection,
+            step_connect_mqtt_broker,
+            step_publish_message,
+        ]
 
     def subscribe_topics(self, host=None, port=None, topics=None, client_id=None, username=None):
         """
@@ -251,6 +249,18 @@ class Azure:
             else username
         )
 
+        return self.subscribe_topics_workflow.run(
+            {
+                "host": host,
+                "port": port,
+                "username": username,
+                "client_id": client_id,
+                "topics": topics,
+            }
+        )
+
+    def _subscribe_topics_steps(self):
+        """Returns the steps of subscribe_topics(), see Workflow."""
         # Check if client is connected to the broker
         step_check_mqtt_connected = Step(
             function=self.mqtt.is_connected_to_broker,
@@ -302,20 +312,13 @@ class Azure:
         step_ssl_configuration = Step(
             function=self.ssl.configure_for_x509_certification,
             name="ssl_configuration",
-            success="set_mqtt_version",
+            success="set_mqtt_configs",
             fail="failure",
         )
 
-        step_set_mqtt_version = Step(
-            function=self.mqtt.set_version_config,
-            name="set_mqtt_version",
-            success="set_mqtt_ssl_mode",
-            fail="failure",
-        )
-
-        step_set_mqtt_ssl_mode = Step(
-            function=self.mqtt.set_ssl_mode_config,
-            name="set_mqtt_ssl_mode",
+        step_set_mqtt_configs = Step(
+            function=self.mqtt.set_ssl_connection_configs,
+            name="set_mqtt_configs",
             success="open_mqtt_connection",
             fail="failure",
         )
@@ -325,7 +328,7 @@ class Azure:
             name="open_mqtt_connection",
             success="connect_mqtt_broker",
             fail="failure",
-            function_params={"host": host, "port": port},
+            function_params={"host": Param("host"), "port": Param("port")},
         )
 
         step_connect_mqtt_broker = Step(
@@ -334,9 +337,9 @@ class Azure:
             success="subscribe_topics",
             fail="failure",
             function_params={
-                "username": username,
+                "username": Param("username"),
                 "password": "unused",
-                "client_id_string": client_id,
+                "client_id_string": Param("client_id"),
             },
         )
 
@@ -345,36 +348,23 @@ class Azure:
             name="subscribe_topics",
             success="success",
             fail="failure",
-            function_params={"topics": topics},
+            function_params={"topics": Param("topics")},
             cachable=True,
         )
 
-        # Add cache if it is not already existed
-        function_name = "azure.subscribe_message"
-
-        sm = StateManager(first_step=step_check_mqtt_connected, function_name=function_name)
-
-        sm.add_step(step_check_mqtt_connected)
-        sm.add_step(step_check_mqtt_opened)
-        sm.add_step(step_deactivate_pdp_context)
-        sm.add_step(step_load_certificates)
-        sm.add_step(step_network_reg)
-        sm.add_step(step_get_pdp_ready)
-        sm.add_step(step_ssl_configuration)
-        sm.add_step(step_set_mqtt_version)
-        sm.add_step(step_set_mqtt_ssl_mode)
-        sm.add_step(step_open_mqtt_connection)
-        sm.add_step(step_connect_mqtt_broker)
-        sm.add_step(step_subscribe_topics)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_check_mqtt_connected,
+            step_check_mqtt_opened,
+            step_deactivate_pdp_context,
+            step_load_certificates,
+            step_network_reg,
+            step_get_pdp_ready,
+            step_ssl_configuration,
+            step_set_mqtt_configs,
+            step_open_mqtt_connection,
+            step_connect_mqtt_broker,
+            step_subscribe_topics,
+        ]
 
     def read_messages(self):
         """
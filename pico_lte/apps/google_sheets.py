@@ -5,7 +5,7 @@ import time
 import json
 
 from pico_lte.common import config, debug
-from pico_lte.utils.manager import StateManager, Step
+from pico_lte.utils.manager import Param, StateManager, Step, Workflow
 from pico_lte.utils.status import Status
 from pico_lte.utils.helpers import get_parameter, read_json_file, write_json_file
 from pico_lte.modules.config import Config
@@ -37,6 +37,19 @@ class GoogleSheets:
         self.network = network
         self.http = http
 
+        # steps of the workflows are built once, on their first run
+        self.set_network_workflow = Workflow(self._set_network_steps, "set_network")
+        self.get_data_workflow = Workflow(self._get_data_steps, "google_sheets.get_data")
+        self.add_row_workflow = Workflow(self._add_row_steps, "google_sheets.add_row")
+        self.add_data_workflow = Workflow(self._add_data_steps, "google_sheets.add_data")
+        self.create_sheet_workflow = Workflow(
+            self._create_sheet_steps, "google_sheets.create_sheet"
+        )
+        self.delete_data_workflow = Workflow(self._delete_data_steps, "google_sheets.delete_data")
+        self.generate_access_token_workflow = Workflow(
+            self._generate_access_token_steps, "google_sheets.generate_access_token"
+        )
+
     def set_network(self):
         """
         Function includes network configurations for tcp/ip connection
@@ -47,6 +60,10 @@ class GoogleSheets:
             Result dictionary that contains "status and ""response" keys.
         """
 
+        return self.set_network_workflow.run()
+
+    def _set_network_steps(self):
+        """Returns the steps of set_network(), see Workflow."""
         step_network_reg = Step(
             function=self.network.register_network,
             name="register_network",
@@ -67,22 +84,11 @@ class GoogleSheets:
             fail="failure",
         )
 
-        function_name = "set_network"
-
-        sm = StateManager(first_step=step_network_reg, function_name=function_name)
-
-        sm.add_step(step_network_reg)
-        sm.add_step(step_get_pdp_ready)
-        sm.add_step(step_http_ssl_configuration)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_network_reg,
+            step_get_pdp_ready,
+            step_http_ssl_configuration,
+        ]
 
     def get_data(self, sheet=None, data_range=None):
         """
@@ -129,6 +135,43 @@ class GoogleSheets:
 
         header = generate_header()
 
+        sm = StateManager(self.get_data_workflow, params={"url": url, "data": header})
+
+        while True:
+            result = sm.run()
+
+            if result["status"] == Status.SUCCESS:
+                del result["interval"]
+                self.new_access_token_generated = False
+                try:
+                    response = json.loads(result["response"][0])["values"]
+                    result["response"] = response
+                except:
+                    pass
+                return result
+
+            elif result["status"] == Status.ERROR:
+                try:
+                    if (
+                        "403" in result["response"][1]
+                        and not self.new_access_token_generated
+                    ):
+                        self.generate_access_token()
+                        header = generate_header()
+                        sm = StateManager(
+                            self.get_data_workflow, params={"url": url, "data": header}
+                        )
+                        self.new_access_token_generated = True
+                    else:
+                        del result["interval"]
+                        return result
+                except:
+                    del result["interval"]
+                    return result
+            time.sleep(result["interval"])
+
+    def _get_data_steps(self):
+        """Returns the steps of get_data(), see Workflow."""
         step_set_network = Step(
             function=self.set_network,
             name="set_network",
@@ -141,7 +184,7 @@ class GoogleSheets:
             name="set_server_url",
             success="set_content_type",
             fail="failure",
-            function_params={"url": url},
+            function_params={"url": Param("url")},
         )
 
         step_set_content_type = Step(
@@ -159,7 +202,7 @@ class GoogleSheets:
             fail="failure",
             function_params={
                 "header_mode": 1,
-                "data": header,
+                "data": Param("data"),
                 "timeout": 15,
             },
             cachable=True,
@@ -176,55 +219,13 @@ class GoogleSheets:
             interval=1,
         )
 
-        function_name = "google_sheets.get_data"
-
-        sm = StateManager(first_step=step_set_network, function_name=function_name)
-
-        sm.add_step(step_set_network)
-        sm.add_step(step_set_server_url)
-        sm.add_step(step_set_content_type)
-        sm.add_step(step_request)
-        sm.add_step(step_read_response)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                del result["interval"]
-                self.new_access_token_generated = False
-                try:
-                    response = json.loads(result["response"][0])["values"]
-                    result["response"] = response
-                except:
-                    pass
-                return result
-
-            elif result["status"] == Status.ERROR:
-                try:
-                    if (
-                        "403" in result["response"][1]
-                        and not self.new_access_token_generated
-                    ):
-                        self.generate_access_token()
-                        header = generate_header()
-                        sm = StateManager(
-                            first_step=step_set_network, function_name=function_name
-                        )
-                        sm.add_step(step_set_network)
-                        sm.add_step(step_set_server_url)
-                        sm.add_step(step_set_content_type)
-                        sm.add_step(step_request)
-                        sm.add_step(step_read_response)
-                        step_request.update_function_params(data=header)
-                        sm.update_step(step_request)
-                        self.new_access_token_generated = True
-                    else:
-                        del result["interval"]
-                        return result
-                except:
-                    del result["interval"]
-                    return result
-            time.sleep(result["interval"])
+        return [
+            step_set_network,
+            step_set_server_url,
+            step_set_content_type,
+            step_request,
+            step_read_response,
+        ]
 
     def add_row(self, sheet=None, data=None):
         """
@@ -272,6 +273,43 @@ class GoogleSheets:
 
         header = generate_header()
 
+        sm = StateManager(self.add_row_workflow, params={"url": url, "data": header + payload})
+
+        while True:
+            result = sm.run()
+
+            if result["status"] == Status.SUCCESS:
+                del result["interval"]
+                self.new_access_token_generated = False
+                try:
+                    response = json.loads(result["response"][0])
+                    result["response"] = response
+                except:
+                    pass
+                return result
+
+            elif result["status"] == Status.ERROR:
+                try:
+                    if (
+                        "401" in result["response"][1]
+                        and not self.new_access_token_generated
+                    ):
+                        self.generate_access_token()
+                        header = generate_header()
+                        sm = StateManager(
+                            self.add_row_workflow, params={"url": url, "data": header + payload}
+                        )
+                        self.new_access_token_generated = True
+                    else:
+                        del result["interval"]
+                        return result
+                except:
+                    del result["interval"]
+                    return result
+            time.sleep(result["interval"])
+
+    def _add_row_steps(self):
+        """Returns the steps of add_row(), see Workflow."""
         step_set_network = Step(
             function=self.set_network,
             name="set_network",
@@ -284,7 +322,7 @@ class GoogleSheets:
             name="set_server_url",
             success="set_content_type",
             fail="failure",
-            function_params={"url": url},
+            function_params={"url": Param("url")},
         )
 
         step_set_content_type = Step(
@@ -302,7 +340,7 @@ class GoogleSheets:
             fail="failure",
             function_params={
                 "header_mode": 1,
-                "data": header + payload,
+                "data": Param("data"),
                 "timeout": 15,
             },
             cachable=True,
@@ -319,55 +357,13 @@ class GoogleSheets:
             interval=1,
         )
 
-        function_name = "google_sheets.add_row"
-
-        sm = StateManager(first_step=step_set_network, function_name=function_name)
-
-        sm.add_step(step_set_network)
-        sm.add_step(step_set_server_url)
-        sm.add_step(step_set_content_type)
-        sm.add_step(step_request)
-        sm.add_step(step_read_response)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                del result["interval"]
-                self.new_access_token_generated = False
-                try:
-                    response = json.loads(result["response"][0])
-                    result["response"] = response
-                except:
-                    pass
-                return result
-
-            elif result["status"] == Status.ERROR:
-                try:
-                    if (
-                        "401" in result["response"][1]
-                        and not self.new_access_token_generated
-                    ):
-                        self.generate_access_token()
-                        header = generate_header()
-                        sm = StateManager(
-                            first_step=step_set_network, function_name=function_name
-                        )
-                        sm.add_step(step_set_network)
-                        sm.add_step(step_set_server_url)
-                        sm.add_step(step_set_content_type)
-                        sm.add_step(step_request)
-                        sm.add_step(step_read_response)
-                        step_request.update_function_params(data=header + payload)
-                        sm.update_step(step_request)
-                        self.new_access_token_generated = True
-                    else:
-                        del result["interval"]
-                        return result
-                except:
-                    del result["interval"]
-                    return result
-            time.sleep(result["interval"])
+        return [
+            step_set_network,
+            step_set_server_url,
+            step_set_content_type,
+            step_request,
+            step_read_response,
+        ]
 
     def add_data(self, sheet=None, data=None, data_range=None):
         """
@@ -420,6 +416,44 @@ class GoogleSheets:
 
         header = generate_header()
 
+        sm = StateManager(self.add_data_workflow, params={"url": url, "data": header + payload})
+
+        while True:
+            result = sm.run()
+
+            if result["status"] == Status.SUCCESS:
+                del result["interval"]
+                self.new_access_token_generated = False
+                try:
+                    response = json.loads(result["response"][0])
+                    result["response"] = response
+                except:
+                    pass
+                return result
+
+            elif result["status"] == Status.ERROR:
+                try:
+                    if (
+                        "401" in result["response"][1]
+                        and not self.new_access_token_generated
+                    ):
+                        self.generate_access_token()
+                        header = generate_header()
+                        sm = StateManager(
+                            self.add_data_workflow, params={"url": url, "data": header + payload}
+                        )
+                        self.new_access_token_generated = True
+                    else:
+                        del result["interval"]
+                        return result
+
+                except:
+                    del result["interval"]
+                    return result
+            time.sleep(result["interval"])
+
+    def _add_data_steps(self):
+        """Returns the steps of add_data(), see Workflow."""
         step_set_network = Step(
             function=self.set_network,
             name="set_network",
@@ -432,7 +466,7 @@ class GoogleSheets:
             name="set_server_url",
             success="set_content_type",
             fail="failure",
-            function_params={"url": url},
+            function_params={"url": Param("url")},
         )
 
         step_set_content_type = Step(
@@ -450,7 +484,7 @@ class GoogleSheets:
             fail="failure",
             function_params={
                 "header_mode": 1,
-                "data": header + payload,
+                "data": Param("data"),
                 "timeout": 15,
             },
             cachable=True,
@@ -467,56 +501,13 @@ class GoogleSheets:
             interval=1,
         )
 
-        function_name = "google_sheets.add_data"
-
-        sm = StateManager(first_step=step_set_network, function_name=function_name)
-
-        sm.add_step(step_set_network)
-        sm.add_step(step_set_server_url)
-        sm.add_step(step_set_content_type)
-        sm.add_step(step_request)
-        sm.add_step(step_read_response)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                del result["interval"]
-                self.new_access_token_generated = False
-                try:
-                    response = json.loads(result["response"][0])
-                    result["response"] = response
-                except:
-                    pass
-                return result
-
-            elif result["status"] == Status.ERROR:
-                try:
-                    if (
-                        "401" in result["response"][1]
-                        and not self.new_access_token_generated
-                    ):
-                        self.generate_access_token()
-                        header = generate_header()
-                        sm = StateManager(
-                            first_step=step_set_network, function_name=function_name
-                        )
-                        sm.add_step(step_set_network)
-                        sm.add_step(step_set_server_url)
-                        sm.add_step(step_set_content_type)
-                        sm.add_step(step_request)
-                        sm.add_step(step_read_response)
-                        step_request.update_function_params(data=header + payload)
-                        sm.update_step(step_request)
-                        self.new_access_token_generated = True
-                    else:
-                        del result["interval"]
-                        return result
-
-                except:
-                    del result["interval"]
-                    return result
-            time.sleep(result["interval"])
+        return [
+            step_set_network,
+            step_set_server_url,
+            step_set_content_type,
+            step_request,
+            step_read_response,
+        ]
 
     def create_sheet(self, sheets=None):
         """
@@ -564,6 +555,53 @@ class GoogleSheets:
 
         header = generate_header()
 
+        sm = StateManager(self.create_sheet_workflow, params={"url": url, "data": header + payload})
+
+        def update_config_file(spreadsheet_id=""):
+            config = read_json_file("../config.json")
+            config["google_sheets"]["spreadsheetId"] = spreadsheet_id
+            write_json_file("../config.json", config)
+            self.config_object.read_parameters_from_json_file("../config.json")
+
+        while True:
+            result = sm.run()
+
+            if result["status"] == Status.SUCCESS:
+                del result["interval"]
+                self.new_access_token_generated = False
+                try:
+                    response = json.loads(result["response"][0][:-2] + "}}}}")
+                    result["response"] = response
+                    spreadsheet_id = result["response"]["spreadsheetId"]
+                    update_config_file(spreadsheet_id)
+                except:
+                    debug.warning("Spreadsheet ID can not be added to config.json!")
+                return result
+
+            elif result["status"] == Status.ERROR:
+                try:
+                    if (
+                        "401" in result["response"][1]
+                        and not self.new_access_token_generated
+                    ):
+                        self.generate_access_token()
+                        header = generate_header()
+                        sm = StateManager(
+                            self.create_sheet_workflow,
+                            params={"url": url, "data": header + payload},
+                        )
+                        self.new_access_token_generated = True
+                    else:
+                        del result["interval"]
+                        return result
+
+                except:
+                    del result["interval"]
+                    return result
+            time.sleep(result["interval"])
+
+    def _create_sheet_steps(self):
+        """Returns the steps of create_sheet(), see Workflow."""
         step_set_network = Step(
             function=self.set_network,
             name="set_network",
@@ -576,7 +614,7 @@ class GoogleSheets:
             name="set_server_url",
             success="set_content_type",
             fail="failure",
-            function_params={"url": url},
+            function_params={"url": Param("url")},
         )
 
         step_set_content_type = Step(
@@ -594,7 +632,7 @@ class GoogleSheets:
             fail="failure",
             function_params={
                 "header_mode": 1,
-                "data": header + payload,
+                "data": Param("data"),
                 "timeout": 15,
             },
             cachable=True,
@@ -611,64 +649,13 @@ class GoogleSheets:
             interval=1,
         )
 
-        function_name = "google_sheets.create_sheet"
-
-        sm = StateManager(first_step=step_set_network, function_name=function_name)
-
-        sm.add_step(step_set_network)
-        sm.add_step(step_set_server_url)
-        sm.add_step(step_set_content_type)
-        sm.add_step(step_request)
-        sm.add_step(step_read_response)
-
-        def update_config_file(spreadsheet_id=""):
-            config = read_json_file("../config.json")
-            config["google_sheets"]["spreadsheetId"] = spreadsheet_id
-            write_json_file("../config.json", config)
-            self.config_object.read_parameters_from_json_file("../config.json")
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                del result["interval"]
-                self.new_access_token_generated = False
-                try:
-                    response = json.loads(result["response"][0][:-2] + "}}}}")
-                    result["response"] = response
-                    spreadsheet_id = result["response"]["spreadsheetId"]
-                    update_config_file(spreadsheet_id)
-                except:
-                    debug.warning("Spreadsheet ID can not be added to config.json!")
-                return result
-
-            elif result["status"] == Status.ERROR:
-                try:
-                    if (
-                        "401" in result["response"][1]
-                        and not self.new_access_token_generated
-                    ):
-                        self.generate_access_token()
-                        header = generate_header()
-                        sm = StateManager(
-                            first_step=step_set_network, function_name=function_name
-                        )
-                        sm.add_step(step_set_network)
-                        sm.add_step(step_set_server_url)
-                        sm.add_step(step_set_content_type)
-                        sm.add_step(step_request)
-                        sm.add_step(step_read_response)
-                        step_request.update_function_params(data=header + payload)
-                        sm.update_step(step_request)
-                        self.new_access_token_generated = True
-                    else:
-                        del result["interval"]
-                        return result
-
-                except:
-                    del result["interval"]
-                    return result
-            time.sleep(result["interval"])
+        return [
+            step_set_network,
+            step_set_server_url,
+            step_set_content_type,
+            step_request,
+            step_read_response,
+        ]
 
     def delete_data(self, sheet=None, data_range=None):
         """
@@ -715,6 +702,44 @@ class GoogleSheets:
 
         header = generate_header()
 
+        sm = StateManager(self.delete_data_workflow, params={"url": url, "data": header})
+
+        while True:
+            result = sm.run()
+
+            if result["status"] == Status.SUCCESS:
+                del result["interval"]
+                self.new_access_token_generated = False
+                try:
+                    response = json.loads(result["response"][0])
+                    result["response"] = response
+                except:
+                    pass
+                return result
+
+            elif result["status"] == Status.ERROR:
+                try:
+                    if (
+                        "401" in result["response"][1]
+                        and not self.new_access_token_generated
+                    ):
+                        self.generate_access_token()
+                        header = generate_header()
+                        sm = StateManager(
+                            self.delete_data_workflow, params={"url": url, "data": header}
+                        )
+                        self.new_access_token_generated = True
+                    else:
+                        del result["interval"]
+                        return result
+
+                except:
+                    del result["interval"]
+                    return result
+            time.sleep(result["interval"])
+
+    def _delete_data_steps(self):
+        """Returns the steps of delete_data(), see Workflow."""
         step_set_network = Step(
             function=self.set_network,
             name="set_network",
@@ -727,7 +752,7 @@ class GoogleSheets:
             name="set_server_url",
             success="set_content_type",
             fail="failure",
-            function_params={"url": url},
+            function_params={"url": Param("url")},
         )
 
         step_set_content_type = Step(
@@ -745,7 +770,7 @@ class GoogleSheets:
             fail="failure",
             function_params={
                 "header_mode": 1,
-                "data": header,
+                "data": Param("data"),
                 "timeout": 15,
             },
             cachable=True,
@@ -762,56 +787,13 @@ class GoogleSheets:
             interval=1,
         )
 
-        function_name = "google_sheets.delete_data"
-
-        sm = StateManager(first_step=step_set_network, function_name=function_name)
-
-        sm.add_step(step_set_network)
-        sm.add_step(step_set_server_url)
-        sm.add_step(step_set_content_type)
-        sm.add_step(step_request)
-        sm.add_step(step_read_response)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                del result["interval"]
-                self.new_access_token_generated = False
-                try:
-                    response = json.loads(result["response"][0])
-                    result["response"] = response
-                except:
-                    pass
-                return result
-
-            elif result["status"] == Status.ERROR:
-                try:
-                    if (
-                        "401" in result["response"][1]
-                        and not self.new_access_token_generated
-                    ):
-                        self.generate_access_token()
-                        header = generate_header()
-                        sm = StateManager(
-                            first_step=step_set_network, function_name=function_name
-                        )
-                        sm.add_step(step_set_network)
-                        sm.add_step(step_set_server_url)
-                        sm.add_step(step_set_content_type)
-                        sm.add_step(step_request)
-                        sm.add_step(step_read_response)
-                        step_request.update_function_params(data=header)
-                        sm.update_step(step_request)
-                        self.new_access_token_generated = True
-                    else:
-                        del result["interval"]
-                        return result
-
-                except:
-                    del result["interval"]
-                    return result
-            time.sleep(result["interval"])
+        return [
+            step_set_network,
+            step_set_server_url,
+            step_set_content_type,
+            step_request,
+            step_read_response,
+        ]
 
     def generate_access_token(self):
         """
@@ -838,6 +820,25 @@ class GoogleSheets:
             ]
         )
 
+        sm = StateManager(self.generate_access_token_workflow, params={"url": url, "data": header})
+
+        while True:
+            result = sm.run()
+            if result["status"] == Status.SUCCESS:
+                self.access_token = json.loads(result["response"][0])["access_token"]
+                return {
+                    "status": Status.SUCCESS,
+                    "response": "Access token is generated.",
+                }
+            elif result["status"] == Status.ERROR:
+                return {
+                    "status": Status.ERROR,
+                    "response": "Access token could not be generated.",
+                }
+            time.sleep(result["interval"])
+
+    def _generate_access_token_steps(self):
+        """Returns the steps of generate_access_token(), see Workflow."""
         step_set_network = Step(
             function=self.set_network,
             name="set_network",
@@ -850,7 +851,7 @@ class GoogleSheets:
             name="set_server_url",
             success="set_content_type",
             fail="failure",
-            function_params={"url": url},
+            function_params={"url": Param("url")},
         )
 
         step_set_content_type = Step(
@@ -865,7 +866,7 @@ class GoogleSheets:
             name="post_request",
             success="read_response",
             fail="failure",
-            function_params={"header_mode": 1, "data": header, "timeout": 10},
+            function_params={"header_mode": 1, "data": Param("data"), "timeout": 10},
             interval=1,
             cachable=True,
             retry=2,
@@ -881,27 +882,10 @@ class GoogleSheets:
             interval=1,
         )
 
-        function_name = "google_sheets.generate_access_token"
-
-        sm = StateManager(first_step=step_set_network, function_name=function_name)
-
-        sm.add_step(step_set_network)
-        sm.add_step(step_set_server_url)
-        sm.add_step(step_set_content_type)
-        sm.add_step(step_post_request)
-        sm.add_step(step_read_response)
-
-        while True:
-            result = sm.run()
-            if result["status"] == Status.SUCCESS:
-                self.access_token = json.loads(result["response"][0])["access_token"]
-                return {
-                    "status": Status.SUCCESS,
-                    "response": "Access token is generated.",
-                }
-            elif result["status"] == Status.ERROR:
-                return {
-                    "status": Status.ERROR,
-                    "response": "Access token could not be generated.",
-                }
-            time.sleep(result["interval"])
+        return [
+            step_set_network,
+            step_set_server_url,
+            step_set_content_type,
+            step_post_request,
+            step_read_response,
+        ]
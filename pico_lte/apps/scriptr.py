@@ -2,12 +2,36 @@
 Module for including functions of scripter.io operations
 """
 
-import time
-
 from pico_lte.common import config
-from pico_lte.utils.manager import StateManager, Step
-from pico_lte.utils.status import Status
 from pico_lte.utils.helpers import get_parameter
+from pico_lte.utils.workflow_loader import load_workflow
+
+SEND_DATA_WORKFLOW = {
+    "name": "scriptr_io.send_data",
+    "steps": [
+        {"name": "register_network", "call": "network.register_network"},
+        {"name": "get_pdp_ready", "call": "network.get_pdp_ready"},
+        {
+            "name": "set_server_url",
+            "call": "http.set_server_url",
+            "params": {"url": "https://api.scriptrapps.io"},
+        },
+        {
+            "name": "post_request",
+            "call": "http.post",
+            "params": {"data": "$data", "header_mode": "1"},
+            "cachable": True,
+            "interval": 1,
+        },
+        {
+            "name": "read_response",
+            "call": "http.read_response",
+            "params": {"desired_response": '"status": "success"'},
+            "retry": 3,
+            "interval": 1,
+        },
+    ],
+}
 
 
 class Scriptr:
@@ -33,6 +57,11 @@ class Scriptr:
         self.network = network
         self.http = http
 
+        # steps of the workflows are built once, on their first run
+        self.send_data_workflow = load_workflow(
+            SEND_DATA_WORKFLOW, {"network": self.network, "http": self.http}
+        )
+
     def send_data(self, data, query=None, authorization=None):
         """
         Function for sending data to script.
@@ -70,61 +99,4 @@ class Scriptr:
             + "\n\n"
         )
 
-        step_network_reg = Step(
-            function=self.network.register_network,
-            name="register_network",
-            success="get_pdp_ready",
-            fail="failure",
-        )
-
-        step_get_pdp_ready = Step(
-            function=self.network.get_pdp_ready,
-            name="get_pdp_ready",
-            success="set_server_url",
-            fail="failure",
-        )
-
-        step_set_server_url = Step(
-            function=self.http.set_server_url,
-            name="set_server_url",
-            success="post_request",
-            fail="failure",
-            function_params={"url": "https://api.scriptrapps.io"},
-        )
-
-        step_post_request = Step(
-            function=self.http.post,
-            name="post_request",
-            success="read_response",
-            fail="failure",
-            function_params={"data": header + data, "header_mode": "1"},
-            cachable=True,
-            interval=1,
-        )
-
-        step_read_response = Step(
-            function=self.http.read_response,
-            name="read_response",
-            success="success",
-            fail="failure",
-            function_params={"desired_response": '"status": "success"'},
-            retry=3,
-            interval=1,
-        )
-
-        function_name = "scriptr_io.send_data"
-        sm = StateManager(first_step=step_network_reg, function_name=function_name)
-
-        sm.add_step(step_network_reg)
-        sm.add_step(step_get_pdp_ready)
-        sm.add_step(step_set_server_url)
-        sm.add_step(step_post_request)
-        sm.add_step(step_read_response)
-
-        while True:
-            result = sm.run()
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return self.send_data_workflow.run({"data": header + data})
@@ -1,11 +1,9 @@
 """
 Module for including functions of ThingSpeak for PicoLTE module.
 """
-import time
 
 from pico_lte.common import config
-from pico_lte.utils.manager import StateManager, Step
-from pico_lte.utils.status import Status
+from pico_lte.utils.manager import Param, Step, Workflow
 from pico_lte.utils.helpers import get_parameter
 
 
@@ -35,6 +33,14 @@ class ThingSpeak:
             get_parameter(["thingspeak", "channel_id"]) if (channel_id is None) else channel_id
         )
 
+        # steps of the workflows are built once, on their first run
+        self.publish_message_workflow = Workflow(
+            self._publish_message_steps, "thingspeak.publish_message"
+        )
+        self.subscribe_topics_workflow = Workflow(
+            self._subscribe_topics_steps, "thingspeak.subscribe_topics"
+        )
+
     def publish_message(
         self,
         payload,
@@ -89,6 +95,20 @@ class ThingSpeak:
         if isinstance(payload, dict):
             payload = ThingSpeak.create_message(payload)
 
+        return self.publish_message_workflow.run(
+            {
+                "host": host,
+                "port": port,
+                "client_id": client_id,
+                "username": username,
+                "password": password,
+                "payload": payload,
+                "topic": topic,
+            }
+        )
+
+    def _publish_message_steps(self):
+        """Returns the steps of publish_message(), see Workflow."""
         # Check if client is connected to the broker
         step_check_mqtt_connected = Step(
             function=self.mqtt.is_connected_to_broker,
@@ -126,7 +146,7 @@ class ThingSpeak:
             name="open_mqtt_connection",
             success="connect_mqtt_broker",
             fail="failure",
-            function_params={"host": host, "port": port},
+            function_params={"host": Param("host"), "port": Param("port")},
             interval=1,
         )
 
@@ -136,9 +156,9 @@ class ThingSpeak:
             success="publish_message",
             fail="failure",
             function_params={
-                "client_id_string": client_id,
-                "username": username,
-                "password": password,
+                "client_id_string": Param("client_id"),
+                "username": Param("username"),
+                "password": Param("password"),
             },
         )
 
@@ -147,32 +167,20 @@ class ThingSpeak:
             name="publish_message",
             success="success",
             fail="failure",
-            function_params={"payload": payload, "topic": topic, "qos": 1},
+            function_params={"payload": Param("payload"), "topic": Param("topic"), "qos": 1},
             retry=3,
             interval=1,
         )
 
-        # Add cache if it is not already existed
-        function_name = "thingspeak.publish_message"
-
-        sm = StateManager(first_step=step_check_mqtt_connected, function_name=function_name)
-
-        sm.add_step(step_check_mqtt_connected)
-        sm.add_step(step_check_mqtt_opened)
-        sm.add_step(step_network_reg)
-        sm.add_step(step_pdp_ready)
-        sm.add_step(step_open_mqtt_connection)
-        sm.add_step(step_connect_mqtt_broker)
-        sm.add_step(step_publish_message)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_check_mqtt_connected,
+            step_check_mqtt_opened,
+            step_network_reg,
+            step_pdp_ready,
+            step_open_mqtt_connection,
+            step_connect_mqtt_broker,
+            step_publish_message,
+        ]
 
     def subscribe_topics(
         self, host=None, port=None, topics=None, client_id=None, username=None, password=None
@@ -211,6 +219,19 @@ class ThingSpeak:
                 ("channels/" + str(self.channel_id) + "/subscribe/fields/+", 0),
             )
 
+        return self.subscribe_topics_workflow.run(
+            {
+                "host": host,
+                "port": port,
+                "client_id": client_id,
+                "username": username,
+                "password": password,
+                "topics": topics,
+            }
+        )
+
+    def _subscribe_topics_steps(self):
+        """Returns the steps of subscribe_topics(), see Workflow."""
         # Check if client is connected to the broker
         step_check_mqtt_connected = Step(
             function=self.mqtt.is_connected_to_broker,
@@ -248,7 +269,7 @@ class ThingSpeak:
             name="open_mqtt_connection",
             success="connect_mqtt_broker",
             fail="failure",
-            function_params={"host": host, "port": port},
+            function_params={"host": Param("host"), "port": Param("port")},
             interval=1,
         )
 
@@ -258,9 +279,9 @@ class ThingSpeak:
             success="subscribe_topics",
             fail="failure",
             function_params={
-                "client_id_string": client_id,
-                "username": username,
-                "password": password,
+                "client_id_string": Param("client_id"),
+                "username": Param("username"),
+                "password": Param("password"),
             },
         )
 
@@ -269,32 +290,20 @@ class ThingSpeak:
             name="subscribe_topics",
             success="success",
             fail="failure",
-            function_params={"topics": topics},
+            function_params={"topics": Param("topics")},
             retry=3,
             interval=1,
         )
 
-        # Add cache if it is not already existed
-        function_name = "thingspeak.subscribe_topics"
-
-        sm = StateManager(first_step=step_check_mqtt_connected, function_name=function_name)
-
-        sm.add_step(step_check_mqtt_connected)
-        sm.add_step(step_check_mqtt_opened)
-        sm.add_step(step_network_reg)
-        sm.add_step(step_pdp_ready)
-        sm.add_step(step_open_mqtt_connection)
-        sm.add_step(step_connect_mqtt_broker)
-        sm.add_step(step_subscribe_topics)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_check_mqtt_connected,
+            step_check_mqtt_opened,
+            step_network_reg,
+            step_pdp_ready,
+            step_open_mqtt_connection,
+            step_connect_mqtt_broker,
+            step_subscribe_topics,
+        ]
 
     def read_messages(self):
         """
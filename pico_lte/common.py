@@ -3,18 +3,27 @@ Basic module for using purpose of provining temporary memory
 for sharing data by different modules.
 """
 
+import _thread
+
 from pico_lte.utils.debug import Debug
 
 
 class StateCache:
-    """Data class for storing state data"""
+    """
+    Data class for storing state data. Managers running in different threads share
+    it, so the state and the last response are kept for each function name.
+    """
 
-    states = {}
-    last_response = None
+    def __init__(self):
+        self.states = {}
+        self.last_responses = {}
+        self.lock = _thread.allocate_lock()
+        self.store = None  # StateStore which saves the states to flash, if set
 
     def add_cache(self, function_name):
         """Gets cache for #function_name or adds new cache with #function_name key"""
-        self.states[function_name] = None
+        with self.lock:
+            self.states[function_name] = None
 
     def get_state(self, function_name):
         """Returns state of function_name"""
@@ -22,15 +31,31 @@ class StateCache:
 
     def set_state(self, function_name, state):
         """Sets state of function_name"""
-        self.states[function_name] = state
+        with self.lock:
+            self.states[function_name] = state
+            if self.store:
+                self.store.save(self.states)
+
+    def set_store(self, store):
+        """Loads the states saved by #store, and saves the changing states to it"""
+        with self.lock:
+            self.states.update(store.load())
+            self.store = store
+
+    def flush(self):
+        """Writes the states waiting to be saved, e.g. before deep sleep"""
+        if self.store:
+            with self.lock:
+                self.store.flush()
 
-    def get_last_response(self):
-        """Returns last response"""
-        return self.last_response
+    def get_last_response(self, function_name=None):
+        """Returns last response of function_name"""
+        return self.last_responses.get(function_name)
 
-    def set_last_response(self, response):
-        """Sets last response"""
-        self.last_response = response
+    def set_last_response(self, response, function_name=None):
+        """Sets last response of function_name"""
+        with self.lock:
+            self.last_responses[function_name] = response
 
 
 config = {}
@@ -6,6 +6,8 @@ from pico_lte.common import config
 
 from pico_lte.utils.helpers import read_json_file
 from pico_lte.utils.atcom import ATCom
+from pico_lte.utils.state_store import StateStore
+from pico_lte.utils.status import Status
 
 from pico_lte.modules.base import Base
 from pico_lte.modules.auth import Auth
@@ -62,8 +64,41 @@ class PicoLTE:
         self.google_sheets = GoogleSheets(self.base, self.network, self.http)
 
         # Power up modem
+        self.modem_booted = False  # whether the modem is powered on by this instance
         if self.base.power_status() != 0:
             self.base.power_on()
+            self.modem_booted = True
         self.base.wait_until_status_on()
+        self.base.restore_baudrate()
         self.base.wait_until_modem_ready_to_communicate()
         self.base.set_echo_off()
+
+    def restore_states(self, file_path="state_cache.json", flush_interval=5000):
+        """
+        Function for saving the states of the workflows to flash, and restoring the
+        states saved before a reboot or deep sleep. The workflows then skip the steps
+        which are already done, e.g. SSL configuration. The states are discarded if
+        they are saved for another modem, or if the modem has rebooted. Call
+        config["cache"].flush() before deep sleep to write the last changes.
+
+        Parameters
+        ----------
+        file_path : str, default: "state_cache.json"
+            Path of the file which stores the states
+        flush_interval : int, default: 5000
+            Minimum milliseconds between two writes to flash
+
+        Returns
+        -------
+        dict
+            Result that includes "status", "response" and "value" keys
+        """
+        result = self.base.get_imei()
+        if result["status"] != Status.SUCCESS or not result["value"]:
+            return result
+
+        store = StateStore(file_path, result["value"], flush_interval)
+        if self.modem_booted:
+            store.clear()  # the configurations of the modem are lost
+        config["cache"].set_store(store)
+        return result
@@ -8,7 +8,7 @@ import time
 from machine import Pin
 from pico_lte.common import debug
 from pico_lte.utils.status import Status
-from pico_lte.utils.helpers import get_desired_data
+from pico_lte.utils.helpers import get_desired_data, read_json_file, write_json_file
 
 
 class Base:
@@ -16,6 +16,8 @@ class Base:
     Class for inculding basic functions of PicoLTE module.
     """
 
+    BAUDRATE_FILE = "baudrate.json"
+
     def __init__(self, atcom):
         """
         Constructor for Base class
@@ -32,6 +34,7 @@ class Base:
         self.powerkey_pin.value(1)
         time.sleep(1)
         self.powerkey_pin.value(0)
+        self.atcom.reset_caches()
 
     def power_on(self):
         """
@@ -40,6 +43,7 @@ class Base:
         self.powerkey_pin.value(1)
         time.sleep(0.5)
         self.powerkey_pin.value(0)
+        self.atcom.reset_caches()
 
     def power_status(self):
         """
@@ -134,6 +138,137 @@ class Base:
         """
         return self.atcom.send_at_comm("ATE1")
 
+    def _verify_communication(self, attempts=3):
+        """Sends AT until the modem answers, for checking the link after a baudrate change."""
+        result = {"status": Status.TIMEOUT, "response": "timeout"}
+        for _ in range(attempts):
+            result = self.atcom.send_at_comm("AT", timeout=1)
+            if result["status"] == Status.SUCCESS:
+                break
+        return result
+
+    def set_baudrate(self, baudrate):
+        """
+        Function for switching the modem and UART to the given baudrate. The link is
+        verified with AT, and both sides are reverted to the previous baudrate if the
+        modem doesn't answer.
+
+        Parameters
+        ----------
+        baudrate : int
+            New baudrate, e.g. 460800 or 921600
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        previous = self.atcom.baudrate
+
+        result = self.atcom.send_at_comm(f"AT+IPR={baudrate}")
+        if result["status"] != Status.SUCCESS:
+            return result
+
+        self.atcom.set_baudrate(baudrate)
+        result = self._verify_communication()
+        if result["status"] == Status.SUCCESS:
+            return result
+
+        debug.warning(f"Modem doesn't answer at {baudrate} baud, reverting to {previous}.")
+        self.atcom.send_at_comm(f"AT+IPR={previous}", timeout=1)  # if the modem has switched
+        self.atcom.set_baudrate(previous)
+        self._verify_communication()
+        return {"status": Status.ERROR, "response": result["response"]}
+
+    def set_flow_control(self, cts_pin=None, rts_pin=None):
+        """
+        Function for enabling hardware (RTS/CTS) flow control on the modem and UART,
+        so large data-mode payloads don't overrun the modem's input buffer.
+
+        Parameters
+        ----------
+        cts_pin : Pin, default: None
+            Pin connected to the CTS output of the modem
+        rts_pin : Pin, default: None
+            Pin connected to the RTS input of the modem. Flow control is disabled
+            if any of the pins is None.
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        enabled = cts_pin is not None and rts_pin is not None
+        result = self.atcom.send_at_comm("AT+IFC=2,2" if enabled else "AT+IFC=0,0")
+        if result["status"] == Status.SUCCESS:
+            self.atcom.set_flow_control(cts_pin, rts_pin)
+        return result
+
+    def negotiate_baudrate(self, baudrates=(921600, 460800), file_path=BAUDRATE_FILE):
+        """
+        Function for switching to the highest baudrate the link works with. The
+        working baudrate is saved to be restored with restore_baudrate() at boot.
+
+        Parameters
+        ----------
+        baudrates : tuple, default: (921600, 460800)
+            Baudrates to try in order
+        file_path : str, default: "baudrate.json"
+            Path of the file which stores the working baudrate
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        result = {"status": Status.ERROR, "response": "No baudrate to try"}
+        for baudrate in baudrates:
+            result = self.set_baudrate(baudrate)
+            if result["status"] == Status.SUCCESS:
+                write_json_file(file_path, {"baudrate": baudrate})
+                break
+        return result
+
+    def restore_baudrate(self, file_path=BAUDRATE_FILE, timeout=30):
+        """
+        Function for switching to the baudrate saved by negotiate_baudrate(). The
+        modem may be at the saved baudrate, or at its default one after a power
+        cycle, so both are tried until the modem answers.
+
+        Parameters
+        ----------
+        file_path : str, default: "baudrate.json"
+            Path of the file which stores the working baudrate
+        timeout : int, default: 30
+            Timeout in seconds for waiting the modem.
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        saved = read_json_file(file_path)
+        if not saved or not saved.get("baudrate"):
+            return {"status": Status.SUCCESS, "response": "No saved baudrate"}
+
+        baudrate = saved["baudrate"]
+        default = self.atcom.baudrate
+
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            self.atcom.set_baudrate(baudrate)
+            result = self.atcom.send_at_comm("AT", timeout=1)
+            if result["status"] == Status.SUCCESS:
+                return result
+
+            self.atcom.set_baudrate(default)
+            result = self.atcom.send_at_comm("AT", timeout=1)
+            if result["status"] == Status.SUCCESS:
+                return self.set_baudrate(baudrate)
+            time.sleep(1)
+
+        return {"status": Status.TIMEOUT, "response": "timeout"}
+
     def check_sim_ready(self):
         """
         Function for checking SIM ready status
@@ -176,6 +311,26 @@ class Base:
         result = self.atcom.send_at_comm(command)
         return get_desired_data(result, "+QCCID: ")
 
+    def get_imei(self):
+        """
+        Function for getting IMEI of the modem
+
+        Returns
+        -------
+        dict
+            Result that includes "status", "response" and "value" keys
+        """
+        command = "AT+GSN"
+        result = self.atcom.send_at_comm(command)
+
+        result["value"] = None
+        if result["status"] == Status.SUCCESS:
+            for line in result["response"]:
+                if line.isdigit():
+                    result["value"] = line
+                    break
+        return result
+
     ####################
     ### Modem Config ###
     ####################
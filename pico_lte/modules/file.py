@@ -52,27 +52,41 @@ class File:
         command = f'AT+QFDEL="{file_name}"'
         return self.atcom.send_at_comm(command)
 
-    def upload_file_to_modem(self, filename, file, timeout=5000):
+    def upload_file_to_modem(self, filename, file, timeout=5000, length=None):
         """
-        Function for uploading file to modem
+        Function for uploading file to modem. The content is streamed in chunks,
+        so it doesn't have to fit the heap as a whole.
 
         Parameters
         ----------
-        file : str
-            Path to the file
+        filename : str
+            Name of the file on the modem
+        file : str, bytes, file or iterable
+            Content of the file, an open file, or an iterable (e.g. a generator)
+            which yields the content in parts
         timeout : int, default: 5000
             Timeout for the command
+        length : int, default: None
+            Size of the content in bytes. It is required for iterables, and found
+            by seeking for files.
 
         Returns
         -------
         dict
             Result that includes "status" and "response" keys
         """
-        len_file = len(file)
-        command = f'AT+QFUPL="{filename}",{len_file},{timeout}'
-        result = self.atcom.send_at_comm(command, "CONNECT", urc=True)
+        if length is None:
+            if hasattr(file, "seek"):
+                length = file.seek(0, 2)  # seek to the end to get the size
+                file.seek(0)
+            else:
+                length = len(file)
+
+        command = f'AT+QFUPL="{filename}",{length},{timeout}'
+        with self.atcom.transaction():
+            result = self.atcom.send_at_comm(command, "CONNECT", urc=True)
 
-        if result["status"] == Status.SUCCESS:
-            self.atcom.send_at_comm_once(file)  # send ca cert
-            return self.atcom.send_at_comm(self.CTRL_Z)  # send end char -> CTRL_Z
+            if result["status"] == Status.SUCCESS:
+                self.atcom.send_at_comm_once(file, line_end=False)  # send ca cert
+                return self.atcom.send_at_comm(self.CTRL_Z)  # send end char -> CTRL_Z
         return result
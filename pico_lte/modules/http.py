@@ -51,14 +51,33 @@ HTTP Server Response Codes
 
 from pico_lte.utils.status import Status
 from pico_lte.utils.helpers import get_parameter
+from pico_lte.utils.atcom import ResponseMatcher
 from pico_lte.common import debug
 
+HTTP_SUCCESS_CODES = (200, 201, 202, 203, 204, 205, 206, 207, 208, 226)
+HTTP_FAULT_CODES = tuple(range(701, 731, 1)) + tuple(range(400, 410))
+
 
 class HTTP:
     """
     Class for including functions of HTTP related operations of PicoLTE module.
     """
 
+    # Default response matchers, built once and shared by all the requests.
+    GET_DESIRED = ResponseMatcher(codes={"+QHTTPGET: 0,": HTTP_SUCCESS_CODES})
+    GET_FAULT = ResponseMatcher(
+        contains=["+CME ERROR:"], codes={"+QHTTPGET: 0,": HTTP_FAULT_CODES}
+    )
+    POST_DESIRED = ResponseMatcher(codes={"+QHTTPPOST: 0,": HTTP_SUCCESS_CODES})
+    POST_FAULT = ResponseMatcher(
+        contains=["+CME ERROR:"], codes={"+QHTTPPOST: 0,": HTTP_FAULT_CODES}
+    )
+    PUT_DESIRED = ResponseMatcher(codes={"+QHTTPPUT: 0,": HTTP_SUCCESS_CODES})
+    PUT_FAULT = ResponseMatcher(
+        contains=["+CME ERROR:"], codes={"+QHTTPPUT: 0,": HTTP_FAULT_CODES}
+    )
+    READ_FAULT = ResponseMatcher(codes={"+QHTTPREAD: ": range(701, 731, 1)})
+
     def __init__(self, atcom):
         """
         Initialization of the class.
@@ -238,10 +257,11 @@ class HTTP:
         if url:
             len_url = len(url)
             command = f"AT+QHTTPURL={len_url},{timeout}"
-            result = self.atcom.send_at_comm(command, "CONNECT", urc=True)
+            with self.atcom.transaction():
+                result = self.atcom.send_at_comm(command, "CONNECT", urc=True)
 
-            if result["status"] == Status.SUCCESS:
-                result = self.atcom.send_at_comm(url, line_end=False)  # send url
+                if result["status"] == Status.SUCCESS:
+                    result = self.atcom.send_at_comm(url, line_end=False)  # send url
             return result
         return {"response": "Missing arguments : url", "status": Status.ERROR}
 
@@ -270,9 +290,9 @@ class HTTP:
         timeout : int, default: 60
             Timeout in seconds
         desired_response : list, default: HTTP 2XX codes
-            The response messages waited to be successful.
-        fault_response : list, default: CME Error codes
-            The response message waited to understand error.
+            The HTTP status codes waited to be successful.
+        fault_response : list, default: HTTP 4XX and 7XX codes
+            The HTTP status codes waited to understand error.
 
         Returns
         -------
@@ -280,22 +300,14 @@ class HTTP:
             Result that includes "status" and "response" keys
         """
         if desired_response is None:
-            desired_response = [
-                "200",
-                "201",
-                "202",
-                "203",
-                "204",
-                "205",
-                "206",
-                "207",
-                "208",
-                "226",
-            ]
+            desired = self.GET_DESIRED
+        else:
+            desired = [f"+QHTTPGET: 0,{desired}" for desired in desired_response]
 
         if fault_response is None:
-            fault_codes = list(range(701, 731, 1)) + list(range(400, 410))
-            fault_response = [str(error_code) for error_code in fault_codes]
+            fault = self.GET_FAULT
+        else:
+            fault = [f"+QHTTPGET: 0,{fault}" for fault in fault_response] + ["+CME ERROR:"]
 
         # Set the request header config.
         result = self.set_request_header_status(status=header_mode)
@@ -303,26 +315,24 @@ class HTTP:
             if header_mode == 1:
                 # Send a GET request to the PicoLTE.
                 command = f"AT+QHTTPGET={timeout},{len(data)},{input_timeout}"
-                result = self.atcom.send_at_comm(
-                    command,
-                    desired="CONNECT",
-                    fault="+CME ERROR:",
-                    urc=True,
-                    timeout=60,
-                )
-                if result["status"] == Status.SUCCESS:
-                    # Send the request header.
-                    return self.atcom.send_at_comm(
-                        data,
-                        desired=[
-                            f"+QHTTPGET: 0,{desired}" for desired in desired_response
-                        ],
-                        fault=[f"+QHTTPGET: 0,{fault}" for fault in fault_response]
-                        + ["+CME ERROR:"],
+                with self.atcom.transaction():
+                    result = self.atcom.send_at_comm(
+                        command,
+                        desired="CONNECT",
+                        fault="+CME ERROR:",
                         urc=True,
-                        line_end=False,
-                        timeout=timeout,
+                        timeout=60,
                     )
+                    if result["status"] == Status.SUCCESS:
+                        # Send the request header.
+                        return self.atcom.send_at_comm(
+                            data,
+                            desired=desired,
+                            fault=fault,
+                            urc=True,
+                            line_end=False,
+                            timeout=timeout,
+                        )
             else:
                 # Send a GET request without header.
                 command = f"AT+QHTTPGET={timeout}"
@@ -356,9 +366,9 @@ class HTTP:
         timeout : int, default: 60
             Timeout in seconds.
         desired_response : list, default: HTTP 2XX codes
-            The response messages waited to be successful.
-        fault_response : list, default: CME Error codes
-            The response message waited to understand error.
+            The HTTP status codes waited to be successful.
+        fault_response : list, default: HTTP 4XX and 7XX codes
+            The HTTP status codes waited to understand error.
 
         Returns
         -------
@@ -366,48 +376,38 @@ class HTTP:
             Result that includes "status" and "response" keys
         """
         if desired_response is None:
-            desired_response = [
-                "200",
-                "201",
-                "202",
-                "203",
-                "204",
-                "205",
-                "206",
-                "207",
-                "208",
-                "226",
-            ]
+            desired = self.POST_DESIRED
+        else:
+            desired = [f"+QHTTPPOST: 0,{desired}" for desired in desired_response]
 
         if fault_response is None:
-            fault_codes = list(range(701, 731, 1)) + list(range(400, 410))
-            fault_response = [str(error_code) for error_code in fault_codes]
+            fault = self.POST_FAULT
+        else:
+            fault = [f"+QHTTPPOST: 0,{fault}" for fault in fault_response] + ["+CME ERROR:"]
 
         # Set the request header config.
         result = self.set_request_header_status(status=header_mode)
         if result["status"] == Status.SUCCESS:
             # Send a POST request to the PicoLTE.
             command = f"AT+QHTTPPOST={len(data)},{input_timeout},{timeout}"
-            result = self.atcom.send_at_comm(
-                command,
-                desired="CONNECT",
-                fault="+CME ERROR:",
-                urc=True,
-                timeout=timeout,
-            )
-            if result["status"] == Status.SUCCESS:
-                # Send the request (header and) body.
+            with self.atcom.transaction():
                 result = self.atcom.send_at_comm(
-                    data,
-                    desired=[
-                        f"+QHTTPPOST: 0,{desired}" for desired in desired_response
-                    ],
-                    fault=[f"+QHTTPPOST: 0,{fault}" for fault in fault_response]
-                    + ["+CME ERROR:"],
+                    command,
+                    desired="CONNECT",
+                    fault="+CME ERROR:",
                     urc=True,
-                    line_end=False,
                     timeout=timeout,
                 )
+                if result["status"] == Status.SUCCESS:
+                    # Send the request (header and) body.
+                    result = self.atcom.send_at_comm(
+                        data,
+                        desired=desired,
+                        fault=fault,
+                        urc=True,
+                        line_end=False,
+                        timeout=timeout,
+                    )
         return result
 
     def post_from_file(self, file_path, header_mode=0, timeout=60):
@@ -465,9 +465,9 @@ class HTTP:
         timeout : int, default: 60
             Timeout in seconds.
         desired_response : list, default: HTTP 2XX codes
-            The response messages waited to be successful.
-        fault_response : list, default: CME Error codes
-            The response message waited to understand error.
+            The HTTP status codes waited to be successful.
+        fault_response : list, default: HTTP 4XX and 7XX codes
+            The HTTP status codes waited to understand error.
 
         Returns
         -------
@@ -475,46 +475,38 @@ class HTTP:
             Result that includes "status" and "response" keys
         """
         if desired_response is None:
-            desired_response = [
-                "200",
-                "201",
-                "202",
-                "203",
-                "204",
-                "205",
-                "206",
-                "207",
-                "208",
-                "226",
-            ]
+            desired = self.PUT_DESIRED
+        else:
+            desired = [f"+QHTTPPUT: 0,{desired}" for desired in desired_response]
 
         if fault_response is None:
-            fault_codes = list(range(701, 731, 1)) + list(range(400, 410))
-            fault_response = [str(error_code) for error_code in fault_codes]
+            fault = self.PUT_FAULT
+        else:
+            fault = [f"+QHTTPPUT: 0,{fault}" for fault in fault_response] + ["+CME ERROR:"]
 
         # Set the request header config.
         result = self.set_request_header_status(status=header_mode)
         if result["status"] == Status.SUCCESS:
             # Send a PUT request to the PicoLTE.
             command = f"AT+QHTTPPUT={len(data)},{input_timeout},{timeout}"
-            result = self.atcom.send_at_comm(
-                command,
-                desired="CONNECT",
-                fault="+CME ERROR:",
-                urc=True,
-                timeout=timeout,
-            )
-            if result["status"] == Status.SUCCESS:
-                # Send the request (header and) body.
+            with self.atcom.transaction():
                 result = self.atcom.send_at_comm(
-                    data,
-                    desired=[f"+QHTTPPUT: 0,{desired}" for desired in desired_response],
-                    fault=[f"+QHTTPPUT: 0,{fault}" for fault in fault_response]
-                    + ["+CME ERROR:"],
+                    command,
+                    desired="CONNECT",
+                    fault="+CME ERROR:",
                     urc=True,
-                    line_end=False,
                     timeout=timeout,
                 )
+                if result["status"] == Status.SUCCESS:
+                    # Send the request (header and) body.
+                    result = self.atcom.send_at_comm(
+                        data,
+                        desired=desired,
+                        fault=fault,
+                        urc=True,
+                        line_end=False,
+                        timeout=timeout,
+                    )
         return result
 
     def put_from_file(self, file_path, file_type=0, header_mode=0, timeout=60):
@@ -574,9 +566,7 @@ class HTTP:
             desired_response = "+QHTTPREAD: 0"
 
         if fault_response is None:
-            fault_response = [
-                f"+QHTTPREAD: {str(error_code)}" for error_code in range(701, 731, 1)
-            ]
+            fault_response = self.READ_FAULT
 
         # Send a READ request to the PicoLTE.
         command = f"AT+QHTTPREAD={timeout}"
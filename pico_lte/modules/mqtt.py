@@ -12,6 +12,8 @@ class MQTT:
     """
 
     CTRL_Z = "\x1A"
+    # Lines kept while waiting up to a minute for a URC, so the wait uses constant memory.
+    URC_WINDOW = 8
 
     def __init__(self, atcom):
         """
@@ -82,6 +84,32 @@ class MQTT:
         command = f'AT+QMTCFG="SSL",{cid},{ssl_mode},{ssl_ctx_index}'
         return self.atcom.send_at_comm(command)
 
+    def set_ssl_connection_configs(self, cid=0, version=4, ssl_ctx_index=2):
+        """
+        Function for setting modem MQTT version and SSL mode configurations at once
+
+        Parameters
+        ----------
+        cid : int, default: 0
+            Client ID (range 0:5).
+        version : int, default: 4
+            MQTT version.
+            * 4 --> MQTT 3.1.1
+            * 3 --> MQTT 3.1
+        ssl_ctx_index : int, default: 2
+            SSL context index
+
+        Returns
+        -------
+        dict
+            Result that includes "status", "response" and "results" keys
+        """
+        commands = [
+            f'AT+QMTCFG="version",{cid},{version}',
+            f'AT+QMTCFG="SSL",{cid},1,{ssl_ctx_index}',
+        ]
+        return self.atcom.send_batch(commands)
+
     def set_keep_alive_time_config(self, cid=0, keep_alive_time=120):
         """
         Function for setting modem MQTT keep alive time configuration
@@ -244,22 +272,23 @@ class MQTT:
 
         if host and port:
             command = f'AT+QMTOPEN={cid},"{host}",{port}'
-            result = self.atcom.send_at_comm(command)
-
-            desired_response = f"+QMTOPEN: {cid},0"
-            fault_responses = [
-                f"+QMTOPEN: {cid},-1",
-                f"+QMTOPEN: {cid},1",
-                f"+QMTOPEN: {cid},2",
-                f"+QMTOPEN: {cid},3",
-                f"+QMTOPEN: {cid},4",
-                f"+QMTOPEN: {cid},5",
-            ]
-
-            if result["status"] == Status.SUCCESS:
-                result = self.atcom.get_urc_response(
-                    desired_response, fault_responses, timeout=60
-                )
+            with self.atcom.transaction():
+                result = self.atcom.send_at_comm(command)
+
+                desired_response = f"+QMTOPEN: {cid},0"
+                fault_responses = [
+                    f"+QMTOPEN: {cid},-1",
+                    f"+QMTOPEN: {cid},1",
+                    f"+QMTOPEN: {cid},2",
+                    f"+QMTOPEN: {cid},3",
+                    f"+QMTOPEN: {cid},4",
+                    f"+QMTOPEN: {cid},5",
+                ]
+
+                if result["status"] == Status.SUCCESS:
+                    result = self.atcom.get_urc_response(
+                        desired_response, fault_responses, timeout=60, window=self.URC_WINDOW
+                    )
             return result
         return {"status": Status.ERROR, "response": "Missing parameters : host"}
 
@@ -296,11 +325,14 @@ class MQTT:
             Result that includes "status" and "response" keys
         """
         command = f"AT+QMTCLOSE={cid}"
-        result = self.atcom.send_at_comm(command)
+        with self.atcom.transaction():
+            result = self.atcom.send_at_comm(command)
 
-        if result["status"] == Status.SUCCESS:
-            desired_response = f"+QMTCLOSE: {cid},0"
-            result = self.atcom.get_urc_response(desired_response, timeout=60)
+            if result["status"] == Status.SUCCESS:
+                desired_response = f"+QMTCLOSE: {cid},0"
+                result = self.atcom.get_urc_response(
+                    desired_response, timeout=60, window=self.URC_WINDOW
+                )
         return result
 
     def connect_broker(
@@ -339,14 +371,15 @@ class MQTT:
         else:
             command = f'AT+QMTCONN={cid},"{client_id_string}"'
 
-        result = self.atcom.send_at_comm(command)
+        with self.atcom.transaction():
+            result = self.atcom.send_at_comm(command)
 
-        if result["status"] == Status.SUCCESS:
-            desired_response = f"+QMTCONN: {cid},0,0"
-            fault_responses = [f"QMTSTAT: 0,{err_code}" for err_code in range(1, 8)]
-            result = self.atcom.get_urc_response(
-                desired_response, fault_responses, timeout=60
-            )
+            if result["status"] == Status.SUCCESS:
+                desired_response = f"+QMTCONN: {cid},0,0"
+                fault_responses = [f"QMTSTAT: 0,{err_code}" for err_code in range(1, 8)]
+                result = self.atcom.get_urc_response(
+                    desired_response, fault_responses, timeout=60, window=self.URC_WINDOW
+                )
         return result
 
     def is_connected_to_broker(self, cid=0):
@@ -415,11 +448,14 @@ class MQTT:
         if topics:
             prefix = f"AT+QMTSUB={cid},{message_id},"
             command = prefix + ",".join(f'"{topic}",{qos}' for topic, qos in topics)
-            result = self.atcom.send_at_comm(command)
-
-            if result["status"] == Status.SUCCESS:
-                desired_response = f"+QMTSUB: {cid},{message_id},0"
-                result = self.atcom.get_urc_response(desired_response, timeout=60)
+            with self.atcom.transaction():
+                result = self.atcom.send_at_comm(command)
+
+                if result["status"] == Status.SUCCESS:
+                    desired_response = f"+QMTSUB: {cid},{message_id},0"
+                    result = self.atcom.get_urc_response(
+                        desired_response, timeout=60, window=self.URC_WINDOW
+                    )
             return result
         return {"response": "Missing parameter : topics", "status": Status.ERROR}
 
@@ -489,13 +525,14 @@ class MQTT:
 
         if payload and topic:
             command = f'AT+QMTPUB={cid},{message_id},{qos},{retain},"{topic}"'
-            result = self.atcom.send_at_comm(command, ">", urc=True)
-
-            if result["status"] == Status.SUCCESS:
-                self.atcom.send_at_comm_once(payload, line_end=False)  # Send message
-                result = self.atcom.send_at_comm(
-                    self.CTRL_Z
-                )  # Send end char --> CTRL+Z
+            with self.atcom.transaction():
+                result = self.atcom.send_at_comm(command, ">", urc=True)
+
+                if result["status"] == Status.SUCCESS:
+                    self.atcom.send_at_comm_once(payload, line_end=False)  # Send message
+                    result = self.atcom.send_at_comm(
+                        self.CTRL_Z
+                    )  # Send end char --> CTRL+Z
             return result
         return {"response": "Missing parameter", "status": Status.ERROR}
 
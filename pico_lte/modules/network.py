@@ -1,11 +1,10 @@
 """
 Module for including network functions of PicoLTE module.
 """
-import time
 
 from pico_lte.common import config
 from pico_lte.utils.helpers import get_desired_data
-from pico_lte.utils.manager import StateManager, Step
+from pico_lte.utils.manager import DecorrelatedJitterBackoff, Step, Workflow
 from pico_lte.utils.status import Status
 
 
@@ -23,6 +22,12 @@ class Network:
         self.atcom = atcom
         self.base = base
 
+        # steps of the workflows are built once, on their first run
+        self.register_network_workflow = Workflow(
+            self._register_network_steps, "register_network", deadline=300  # 5 minutes
+        )
+        self.get_pdp_ready_workflow = Workflow(self._get_pdp_ready_steps, "get_pdp_ready")
+
     def check_apn(self):
         """
         Function for checking modem APN is correct
@@ -217,7 +222,10 @@ class Network:
         dict
             Result that includes "status" and "response" keys
         """
+        return self.register_network_workflow.run()
 
+    def _register_network_steps(self):
+        """Returns the steps of register_network(), see Workflow."""
         step_network_precheck = Step(
             function=self.check_network_registration,
             name="check_network_registration",
@@ -259,28 +267,18 @@ class Network:
             success="success",
             fail="failure",
             interval=5,
-            retry=60,  # 60 times = 5 minute
+            retry=60,  # until the deadline of the workflow, see __init__()
+            backoff=DecorrelatedJitterBackoff(1, cap=15),
         )
 
-        # Add cache if it is not already existed
-        function_name = "register_network"
-
-        sm = StateManager(first_step=step_network_precheck, function_name=function_name)
-        sm.add_step(step_network_precheck)
-        sm.add_step(step_atcom)
-        sm.add_step(step_sim_ready)
-        sm.add_step(step_check_apn)
-        sm.add_step(step_set_apn)
-        sm.add_step(step_check_network)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_network_precheck,
+            step_atcom,
+            step_sim_ready,
+            step_check_apn,
+            step_set_apn,
+            step_check_network,
+        ]
 
     def get_pdp_ready(self):
         """
@@ -291,7 +289,10 @@ class Network:
         dict
             Result that includes "status" and "response" keys
         """
+        return self.get_pdp_ready_workflow.run()
 
+    def _get_pdp_ready_steps(self):
+        """Returns the steps of get_pdp_ready(), see Workflow."""
         step_precheck_pdp = Step(
             function=self.check_pdp_context_status,
             name="check_pdp_context_status",
@@ -327,24 +328,13 @@ class Network:
             fail="failure",
         )
 
-        # Add cache if it is not already existed
-        function_name = "get_pdp_ready"
-
-        sm = StateManager(first_step=step_precheck_pdp, function_name=function_name)
-        sm.add_step(step_precheck_pdp)
-        sm.add_step(step_configure_pdp)
-        sm.add_step(step_deactivate_pdp)
-        sm.add_step(step_activate_pdp)
-        sm.add_step(step_check_pdp)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+        return [
+            step_precheck_pdp,
+            step_configure_pdp,
+            step_deactivate_pdp,
+            step_activate_pdp,
+            step_check_pdp,
+        ]
 
     def get_signal_strength(self):
         """
@@ -2,11 +2,6 @@
 Module for including functions of ssl operations of PicoLTE module.
 """
 
-import time
-
-from pico_lte.utils.manager import StateManager, Step
-from pico_lte.utils.status import Status
-
 
 class SSL:
     """
@@ -205,79 +200,27 @@ class SSL:
         command = f'AT+QSSLCFG="ignorelocaltime",{ssl_context_id},{ignore_local_time}'
         return self.atcom.send_at_comm(command)
 
-    def configure_for_x509_certification(self):
+    def configure_for_x509_certification(self, ssl_context_id=2):
         """
         Function for configuring the modem for X.509 certification.
 
+        Parameters
+        ----------
+        ssl_context_id : int, default: 2
+            SSL context identifier
+
         Returns
         -------
         dict
-            Result that includes "status" and "response" keys
-        """
-
-        step_set_ca = Step(
-            function=self.set_ca_cert,
-            name="set_ca",
-            success="set_client_cert",
-            fail="failure",
-        )
-
-        step_set_client_cert = Step(
-            function=self.set_client_cert,
-            name="set_client_cert",
-            success="set_client_key",
-            fail="failure",
-        )
-
-        step_set_client_key = Step(
-            function=self.set_client_key,
-            name="set_client_key",
-            success="set_sec_level",
-            fail="failure",
-        )
-
-        step_set_sec_level = Step(
-            function=self.set_sec_level,
-            name="set_sec_level",
-            success="set_ssl_ver",
-            fail="failure",
-        )
-
-        step_set_ssl_ver = Step(
-            function=self.set_version,
-            name="set_ssl_ver",
-            success="set_ssl_ciphers",
-            fail="failure",
-        )
-
-        step_set_ssl_ciphers = Step(
-            function=self.set_cipher_suite,
-            name="set_ssl_ciphers",
-            success="set_ignore_local_time",
-            fail="failure",
-        )
-
-        step_set_ignore_local_time = Step(
-            function=self.set_ignore_local_time,
-            name="set_ignore_local_time",
-            success="success",
-            fail="failure",
-        )
-
-        sm = StateManager(first_step=step_set_ca)
-        sm.add_step(step_set_ca)
-        sm.add_step(step_set_client_cert)
-        sm.add_step(step_set_client_key)
-        sm.add_step(step_set_sec_level)
-        sm.add_step(step_set_ssl_ver)
-        sm.add_step(step_set_ssl_ciphers)
-        sm.add_step(step_set_ignore_local_time)
-
-        while True:
-            result = sm.run()
-
-            if result["status"] == Status.SUCCESS:
-                return result
-            elif result["status"] == Status.ERROR:
-                return result
-            time.sleep(result["interval"])
+            Result that includes "status", "response" and "results" keys
+        """
+        commands = [
+            f'AT+QSSLCFG="cacert",{ssl_context_id},"/security/cacert.pem"',
+            f'AT+QSSLCFG="clientcert",{ssl_context_id},"/security/client.pem"',
+            f'AT+QSSLCFG="clientkey",{ssl_context_id},"/security/user_key.pem"',
+            f'AT+QSSLCFG="seclevel",{ssl_context_id},2',
+            f'AT+QSSLCFG="sslversion",{ssl_context_id},4',
+            f'AT+QSSLCFG="ciphersuite",{ssl_context_id},0xFFFF',
+            f'AT+QSSLCFG="ignorelocaltime",{ssl_context_id},1',
+        ]
+        return self.atcom.send_batch(commands)
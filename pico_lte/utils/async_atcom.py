@@ -0,0 +1,385 @@
+"""
+Module for communicating with cellular modem over UART interface without
+blocking the other asyncio tasks.
+"""
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from machine import Pin
+from pico_lte.common import debug
+from pico_lte.utils.atcom import ATCom, ResponseMatcher
+from pico_lte.utils.status import Status
+from pico_lte.utils.buffer import decode_line
+from pico_lte.utils.helpers import ticks_ms, ticks_diff
+from pico_lte.utils.transcript import READ, WRITTEN
+
+
+class TaskLock:
+    """
+    Class for a re-entrant lock which keeps the modem to a single task during
+    a transaction, see TransactionLock. The task which holds it can acquire it
+    again.
+    """
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.owner = None  # task holding the lock
+        self.count = 0  # number of times the owner acquired the lock
+
+    async def acquire(self):
+        """Waits until the lock is free, unless the current task holds it."""
+        task = asyncio.current_task()
+        if self.owner is not task:
+            await self.lock.acquire()
+            self.owner = task
+        self.count += 1
+
+    def release(self):
+        """Releases the lock once the owner releases it as many times as it acquired."""
+        self.count -= 1
+        if not self.count:
+            self.owner = None
+            self.lock.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *args):
+        self.release()
+
+
+class AsyncATCom(ATCom):
+    """
+    Class for sending AT commands and waiting their responses as coroutines. It
+    uses the same response matching with ATCom, but waits on a stream reader
+    instead of polling UART, so the other tasks run while the modem is busy.
+
+    Only the transport is asynchronous. send_at_comm(), send_at_comm_once(),
+    send_data(), send_batch(), get_response() and get_urc_response() are
+    coroutines. The module methods which return the result of a single command,
+    e.g. MQTT.set_version_config() or HTTP.set_server_url(), return an awaitable
+    and can be the steps of StateManager.run_async(). The module methods which
+    examine the responses, e.g. MQTT.open_connection(), HTTP.get() or
+    Network.register_network(), and the apps need ATCom.
+
+    A command holds the task lock from its write until its response, and a batch
+    holds it until its last response, so the commands of concurrent tasks don't
+    mix. Use transaction() to keep the modem to a task for several commands.
+
+    poll_urc() and start_rx_pump() read UART directly, behind the stream reader,
+    so they raise NotImplementedError. Use get_urc_response() to wait for URCs.
+    """
+
+    READ_SIZE = 256  # maximum number of bytes read from the stream at once
+
+    def __init__(
+        self,
+        uart_number=0,
+        tx_pin=Pin(0),
+        rx_pin=Pin(1),
+        baudrate=115200,
+        timeout=10000,
+        rx_buffer_size=2048,
+        stats_size=32,
+        reader=None,
+        writer=None,
+    ):
+        """
+        Initializes the UART and its streams.
+
+        Parameters
+        ----------
+        reader: StreamReader, default: None
+            Stream to read modem responses from. Created over the UART if None.
+        writer: StreamWriter, default: None
+            Stream to write AT commands to. Created over the UART if None.
+        """
+        super().__init__(
+            uart_number, tx_pin, rx_pin, baudrate, timeout, rx_buffer_size, stats_size
+        )
+        self.reader = reader if reader else asyncio.StreamReader(self.modem_com)
+        self.writer = writer if writer else asyncio.StreamWriter(self.modem_com, {})
+        self.task_lock = TaskLock()
+
+    def transaction(self):
+        """
+        Function for keeping the modem to the current task while several commands
+        are run, e.g. a command which is followed by data mode or a URC.
+
+        Returns
+        -------
+        TaskLock
+            Lock to be used in an async with statement
+        """
+        return self.task_lock
+
+    def _check_ready_urcs(self):
+        """Resets the caches if a ready URC is read already, UART is read by the stream reader."""
+        if self.rx_buffer.contains(self.READY_URC_END):
+            self._on_modem_ready("RDY")
+            return True
+        return False
+
+    def start_rx_pump(self, buffer_size=4096):
+        """The pump would read UART behind the stream reader, so it isn't supported."""
+        raise NotImplementedError("AsyncATCom reads UART through its stream reader")
+
+    def poll_urc(self):
+        """Reading UART directly would steal bytes from the stream reader."""
+        raise NotImplementedError("AsyncATCom doesn't poll URCs, use get_urc_response()")
+
+    async def send_at_comm_once(self, command, line_end=True):
+        """
+        Function for sending AT commmand to modem
+
+        Parameters
+        ----------
+        command: str
+            AT command to send, or a payload of any type accepted by send_data()
+            if line_end is False
+        line_end: bool, default: True
+            If True, send line end
+        """
+        if not line_end:
+            await self.send_data(command)
+            return
+
+        try:
+            await self._write_chunk_async(f"{command}\r".encode())
+        except OSError:
+            debug.error("Error occured while AT command writing to modem")
+
+    async def send_data(self, data, chunk_size=None, interval=0):
+        """
+        Function for sending data-mode payloads in fixed size chunks, see
+        ATCom.send_data().
+
+        Parameters
+        ----------
+        data: str, bytes, bytearray, memoryview, file or iterable
+            Payload to send
+        chunk_size: int, default: None
+            Maximum number of bytes written at once. DATA_CHUNK_SIZE if None.
+        interval: int, default: 0
+            Time to wait in milliseconds after each chunk
+
+        Returns
+        -------
+        int
+            Number of bytes written
+        """
+        written = 0
+        try:
+            for chunk in self._iter_chunks(data, chunk_size or self.DATA_CHUNK_SIZE):
+                written += await self._write_chunk_async(chunk)
+                if interval:
+                    await asyncio.sleep(interval / 1000)
+        except Exception:
+            debug.error("Error occured while data writing to modem")
+        return written
+
+    async def _write_chunk_async(self, chunk):
+        """Writes a chunk of data to the stream, waits until it's sent and returns its length."""
+        self.writer.write(chunk)
+        await self.writer.drain()
+        self.stats.add_written(len(chunk))
+        if self.recorder:  # the streams bypass the recording wrapper of modem_com
+            self.recorder.record(WRITTEN, chunk)
+        return len(chunk)
+
+    async def _receive_async(self, processed, remaining, expected=()):
+        """
+        Waits for characters from the stream and collects the complete lines.
+
+        Parameters
+        ----------
+        processed: list
+            List of lines received so far
+        remaining: int
+            Maximum time to wait in milliseconds
+        expected: tuple, default: ()
+            Matchers of the responses which are waited by the caller
+
+        Returns
+        -------
+        int
+            Number of lines added
+        """
+        count = self._read_lines(processed, expected)  # lines left from the previous call
+        if count:
+            return count
+
+        # An unterminated tail is accepted as a line if nothing follows it for a while.
+        idle = self.rx_buffer.count and self.LINE_IDLE_TIMEOUT < remaining
+        wait = self.LINE_IDLE_TIMEOUT if idle else remaining
+        try:
+            data = await asyncio.wait_for(self.reader.read(self.READ_SIZE), wait / 1000)
+        except asyncio.TimeoutError:
+            if idle:  # e.g. "> " prompt which is never terminated
+                processed.append(decode_line(self.rx_buffer.read_remaining()))
+                return 1
+            return 0
+
+        self.rx_buffer.write(data)
+        self.stats.add_read(len(data))
+        if self.recorder:
+            self.recorder.record(READ, data)
+        return self._read_lines(processed, expected)
+
+    async def _wait_response(self, check, processed, cursor, desired, fault, timeout):
+        """Receives lines until #check decides the result or #timeout passes."""
+        expected = (desired, fault)
+        timer = ticks_ms()
+        while True:
+            remaining = timeout * 1000 - ticks_diff(ticks_ms(), timer)
+            if remaining <= 0:
+                return {"status": Status.TIMEOUT, "response": "timeout"}
+
+            if await self._receive_async(processed, remaining, expected):
+                result = check(processed, cursor, desired, fault)
+                if result:
+                    return result
+
+    async def get_response(self, desired_responses=None, fault_responses=None, timeout=5):
+        """
+        Function for getting modem response
+
+        Parameters
+        ----------
+        desired_response: str, list or ResponseMatcher, default: None
+            Desired response from modem
+        fault_response: str, list or ResponseMatcher, default: None
+            List of fault response from modem
+        timeout: int
+            Timeout for getting response
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        return await self._wait_response(
+            self._check_response,
+            [],
+            [0, 0],
+            ResponseMatcher.build(desired_responses),
+            ResponseMatcher.build(fault_responses),
+            timeout,
+        )
+
+    async def get_urc_response(
+        self, desired_responses=None, fault_responses=None, timeout=5, window=None
+    ):
+        """
+        Function for getting modem urc response
+
+        Parameters
+        ----------
+        desired_response: str, list or ResponseMatcher, default: None
+            List of desired responses
+        fault_response: str, list or ResponseMatcher, default: None
+            List of fault response from modem
+        timeout: int
+            timeout for getting response
+        window: int, default: None
+            If given, only the last #window lines before the desired or fault
+            response are kept, see ATCom.get_urc_response()
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        desired_responses = ResponseMatcher.build(desired_responses)
+        fault_responses = ResponseMatcher.build(fault_responses)
+
+        if not desired_responses and not fault_responses:
+            return {"status": Status.SUCCESS, "response": "No desired or fault responses"}
+
+        measured = self.stats.current is None  # otherwise it's measured as a command
+        if measured:
+            self.stats.begin_urc(desired_responses)
+        result = await self._wait_response(
+            self._urc_checker(window), [], [0], desired_responses, fault_responses, timeout
+        )
+        if measured:
+            self.stats.end(result["status"])
+        return result
+
+    async def send_at_comm(
+        self, command, desired=None, fault=None, timeout=5, line_end=True, urc=False
+    ):
+        """
+        Function for writing AT command to modem and getting modem response
+
+        Parameters
+        ----------
+        command: str
+            AT command to send
+        desired: str, list or ResponseMatcher, default: None
+            List of desired responses
+        fault: str, list or ResponseMatcher, default: None
+            List of fault responses
+        timeout: int
+            Timeout for getting response
+        line_end: bool, default: True
+            If True, send line end
+        urc: bool, default: False
+            If True, get urc response
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        async with self.task_lock:  # no other task writes between the command and its response
+            if line_end:
+                if urc:  # URC responses aren't cached, but the command may change cached ones
+                    self.query_cache.invalidate(command)
+                else:
+                    result = self._get_cached_response(command, desired, fault)
+                    if result:
+                        return result
+
+            self.stats.begin(command)
+            await self.send_at_comm_once(command, line_end=line_end)
+            if urc:
+                result = await self.get_urc_response(desired, fault, timeout)
+            else:
+                result = await self.get_response(desired, fault, timeout)
+                if line_end:
+                    self._store_response(command, result)
+            self.stats.end(result["status"])
+            return result
+
+    async def send_batch(self, commands, timeout=5):
+        """
+        Function for sending several AT commands in as few lines as possible, see
+        ATCom.send_batch().
+
+        Parameters
+        ----------
+        commands: list
+            List of AT commands to send in order
+        timeout: int
+            Timeout for getting the response of each line
+
+        Returns
+        -------
+        dict
+            Result that includes "status", "response" and "results" keys
+        """
+        results = [None] * len(commands)
+        batch = self._batch_lines(commands, results)
+
+        async with self.task_lock:  # the other tasks wait until the last line is answered
+            try:
+                line = next(batch)
+                while True:
+                    line = batch.send(await self.send_at_comm(line, timeout=timeout))
+            except StopIteration as stop:
+                return self._batch_result(stop.value, results)
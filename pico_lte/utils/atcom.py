@@ -2,17 +2,678 @@
 Module for communicating with cellular modem over UART interface.
 """
 
-import time
+import _thread
+
 from machine import UART, Pin
 from pico_lte.common import debug
 from pico_lte.utils.status import Status
+from pico_lte.utils.helpers import ticks_ms, ticks_diff, sleep_ms
+from pico_lte.utils.buffer import RingBuffer, decode_line
+from pico_lte.utils.transcript import RecordingUART, TranscriptRecorder
+from pico_lte.utils.rx_pump import RXPump
+
+
+class ResponseMatcher:
+    """Class for matching modem response lines with precompiled patterns"""
+
+    def __init__(self, contains=None, prefixes=None, codes=None):
+        """
+        Initializes the matcher. A line matches if any of the patterns matches.
+
+        Parameters
+        ----------
+        contains: list, default: None
+            Patterns which the line includes
+        prefixes: list, default: None
+            Patterns which the line starts with
+        codes: dict, default: None
+            Integer codes by their prefixes, e.g. {"+QHTTPGET: 0,": [200, 201]}.
+            The line matches if it starts with the prefix and the integer following
+            the prefix (until a comma or the end of the line) is in the codes.
+        """
+        self.contains = tuple(contains) if contains else ()
+        self.prefixes = tuple(prefixes) if prefixes else ()
+        self.codes = {}
+        if codes:
+            for prefix, prefix_codes in codes.items():
+                self.codes[prefix] = frozenset(prefix_codes)
+
+    @classmethod
+    def build(cls, responses):
+        """
+        Returns a matcher for the responses which are given as the desired or fault
+        parameters of ATCom methods.
+
+        Parameters
+        ----------
+        responses: ResponseMatcher, str or list
+            Patterns to match. A string or a list is matched as "contains" patterns.
+
+        Returns
+        -------
+        ResponseMatcher
+            Matcher of the responses, or None if there is no response given.
+        """
+        if not responses:
+            return None
+        if isinstance(responses, ResponseMatcher):
+            return responses
+        if isinstance(responses, str):
+            return cls(contains=(responses,))
+        return cls(contains=responses)
+
+    def match(self, line):
+        """Returns True if the line matches any of the patterns."""
+        for prefix, codes in self.codes.items():
+            if line.startswith(prefix):
+                start = len(prefix)
+                end = line.find(",", start)
+                try:
+                    if int(line[start:] if end == -1 else line[start:end]) in codes:
+                        return True
+                except ValueError:
+                    pass
+
+        for prefix in self.prefixes:
+            if line.startswith(prefix):
+                return True
+
+        for pattern in self.contains:
+            if pattern in line:
+                return True
+        return False
+
+
+class URCRouter:
+    """Class for routing unsolicited result codes (URC) of modem to queues or callbacks"""
+
+    def __init__(self):
+        """Initializes the router without any routes."""
+        self.routes = {}
+
+    def register(self, prefix, callback=None, maxlen=8):
+        """
+        Registers a route for the URC lines which start with the given prefix.
+
+        Parameters
+        ----------
+        prefix: str
+            URC prefix without the colon, e.g. "+QMTRECV" or "RDY"
+        callback: function, default: None
+            Function which is called with the line. If None, the line is queued.
+        maxlen: int, default: 8
+            Maximum number of lines queued. The oldest line is dropped when it is full.
+        """
+        self.routes[prefix] = [callback, [], maxlen]
+
+    def unregister(self, prefix):
+        """Removes the route of the given prefix with its queued lines."""
+        self.routes.pop(prefix, None)
+
+    def route(self, line):
+        """
+        Moves the line to its route if there is a route for its prefix.
+
+        Parameters
+        ----------
+        line: str
+            Line received from modem
+
+        Returns
+        -------
+        bool
+            True if the line is routed
+        """
+        colon = line.find(":")
+        route = self.routes.get(line[:colon] if colon != -1 else line)
+        if route is None:
+            return False
+
+        callback, queue, maxlen = route
+        if callback:
+            callback(line)
+        else:
+            if len(queue) >= maxlen:
+                dropped = queue.pop(0)
+                debug.warning("URC queue is full, dropped:", dropped)
+            queue.append(line)
+        return True
+
+    def get(self, prefix):
+        """Returns the oldest queued line of the prefix, or None if there is no line."""
+        route = self.routes.get(prefix)
+        if route and route[1]:
+            return route[1].pop(0)
+        return None
+
+    def get_all(self, prefix):
+        """Returns all the queued lines of the prefix and empties its queue."""
+        route = self.routes.get(prefix)
+        if not route:
+            return []
+        lines = route[1]
+        route[1] = []
+        return lines
+
+    def pending(self, prefix):
+        """Returns the number of queued lines of the prefix."""
+        route = self.routes.get(prefix)
+        return len(route[1]) if route else 0
+
+
+def command_verb(command):
+    """Returns the verb of an AT command, e.g. "AT+CGDCONT" for 'AT+CGDCONT=1,"IP"'."""
+    end = len(command)
+    for separator in "=?":
+        index = command.find(separator)
+        if index != -1 and index < end:
+            end = index
+    return command[:end]
+
+
+class QueryCache:
+    """Class for caching the responses of read-only query commands for a while"""
+
+    def __init__(self):
+        """Initializes the cache without any queries."""
+        self.queries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, command, ttl, invalidated_by=()):
+        """
+        Registers a query command whose response is cached.
+
+        Parameters
+        ----------
+        command: str
+            Query command, e.g. "AT+CGDCONT?"
+        ttl: int
+            Time in seconds the response is valid
+        invalidated_by: tuple, default: ()
+            Verbs of the commands which drop the response, in addition to the
+            commands which have the same verb with the query, e.g. "AT+CGDCONT=..."
+        """
+        verbs = (command_verb(command),) + tuple(invalidated_by)
+        self.queries[command] = [ttl * 1000, verbs, None, 0]
+
+    def unregister(self, command):
+        """Removes the query command with its cached response."""
+        self.queries.pop(command, None)
+
+    def get(self, command):
+        """
+        Returns the cached response lines of a query command. Sending any other
+        command drops the responses of the queries which it may change.
+
+        Parameters
+        ----------
+        command: str
+            AT command which is about to be sent
+
+        Returns
+        -------
+        list
+            Cached response lines, or None if they are not cached or expired
+        """
+        query = self.queries.get(command)
+        if query is None:
+            self.invalidate(command)
+            return None
+
+        ttl, _, lines, stored_at = query
+        if lines is not None and ticks_diff(ticks_ms(), stored_at) < ttl:
+            self.hits += 1
+            return lines
+
+        self.misses += 1
+        return None
+
+    def store(self, command, response):
+        """Stores the response lines of a query command if it is completed with OK."""
+        query = self.queries.get(command)
+        if query and isinstance(response, list) and response and response[-1] == "OK":
+            query[2] = response[:]
+            query[3] = ticks_ms()
+
+    def invalidate(self, command):
+        """Drops the cached responses which may be changed by the command."""
+        verbs = [command_verb(part) for part in command.split(";")]
+        for query in self.queries.values():
+            if query[2] is not None:
+                for verb in verbs:
+                    if verb in query[1] or "AT" + verb in query[1]:
+                        query[2] = None
+                        break
+
+    def clear(self):
+        """Drops all the cached responses, e.g. after the modem restarts."""
+        for query in self.queries.values():
+            query[2] = None
+
+
+class ConfigShadow:
+    """Class for remembering the configurations applied to modem, to skip setting them again"""
+
+    def __init__(self):
+        """Initializes the shadow without any settings."""
+        self.settings = {}  # whether the setting has a context, by its name
+        self.values = {}  # applied values by (setting, context)
+        self.skipped = 0
+
+    def register(self, setting, has_context=True):
+        """
+        Registers a setting whose applied values are remembered.
+
+        Parameters
+        ----------
+        setting: str
+            Command with the name of the setting, e.g. 'AT+QMTCFG="version"'
+        has_context: bool, default: True
+            If True, the first parameter after the name is the context of the value,
+            e.g. the client ID of 'AT+QMTCFG="version",0,4'
+        """
+        self.settings[setting] = has_context
+
+    def _parse(self, command):
+        """Returns the (setting, context) key and the value of a command, or None."""
+        if not command.startswith("AT"):
+            command = "AT" + command  # a command chained with ";"
+        setting, _, value = command.partition(",")
+        has_context = self.settings.get(setting)
+        if has_context is None:
+            return None
+
+        context = None
+        if has_context:
+            context, _, value = value.partition(",")
+        if not value:
+            return None  # it reads the setting
+        return (setting, context), value
+
+    def is_applied(self, command):
+        """
+        Returns True if the command only sets registered settings to the values
+        which are already applied.
+
+        Parameters
+        ----------
+        command: str
+            AT command which is about to be sent, may be chained with ";"
+        """
+        for part in command.split(";"):
+            parsed = self._parse(part)
+            if parsed is None or self.values.get(parsed[0]) != parsed[1]:
+                return False
+        self.skipped += 1
+        return True
+
+    def apply(self, command, applied):
+        """Remembers the values set by the command, or forgets them if it failed."""
+        for part in command.split(";"):
+            parsed = self._parse(part)
+            if parsed is None:
+                continue
+            if applied:
+                self.values[parsed[0]] = parsed[1]
+            else:
+                self.values.pop(parsed[0], None)
+
+    def clear(self):
+        """Forgets all the applied values, e.g. after the modem restarts."""
+        self.values = {}
+
+
+class CommandStats:
+    """Class for collecting latency and traffic statistics of AT commands per verb"""
+
+    # Indexes of the columns in a row
+    COUNT = 0
+    TOTAL_MS = 1
+    MIN_MS = 2
+    MAX_MS = 3
+    LAST_MS = 4
+    WRITTEN = 5
+    READ = 6
+    TIMEOUTS = 7
+    ERRORS = 8
+    FIELDS = (
+        "count",
+        "total_ms",
+        "min_ms",
+        "max_ms",
+        "last_ms",
+        "bytes_written",
+        "bytes_read",
+        "timeouts",
+        "errors",
+    )
+    OTHER = "OTHER"  # verb of the last row, which collects verbs that don't fit the table
+
+    def __init__(self, size=32):
+        """
+        Initializes the table with preallocated rows.
+
+        Parameters
+        ----------
+        size: int, default: 32
+            Number of rows, including the row for the other verbs
+        """
+        self.size = size
+        self.rows = [[0] * len(self.FIELDS) for _ in range(size)]
+        self.index = {}
+        self.current = None  # row of the command which is running
+        self.started = 0
+
+    def _row(self, verb):
+        """Returns the row of the verb, adding it to the table if there is room."""
+        row = self.index.get(verb)
+        if row is None:
+            if len(self.index) < self.size - 1:
+                row = len(self.index)
+            else:
+                row = self.size - 1
+                verb = self.OTHER
+            self.index[verb] = row
+        return row
+
+    def begin(self, command):
+        """Starts measuring the command which is about to be sent."""
+        is_command = isinstance(command, str) and command.startswith("AT")
+        self.current = self._row(command_verb(command) if is_command else "DATA")
+        self.started = ticks_ms()
+
+    def begin_urc(self, desired):
+        """
+        Starts measuring a wait for a URC which isn't a part of a command, e.g. the
+        result of AT+QMTOPEN. Its row is "URC" and the prefix, e.g. "URC +QMTOPEN".
+
+        Parameters
+        ----------
+        desired: ResponseMatcher
+            Matcher of the awaited URC
+        """
+        patterns = ()
+        if desired:
+            patterns = desired.prefixes + desired.contains + tuple(desired.codes)
+        prefix = patterns[0].split(":")[0] if patterns else ""
+        self.current = self._row(f"URC {prefix}".rstrip())
+        self.started = ticks_ms()
+
+    def add_written(self, count):
+        """Adds the bytes written to the current command, e.g. its data-mode payload."""
+        if self.current is not None:
+            self.rows[self.current][self.WRITTEN] += count
+
+    def add_read(self, count):
+        """Adds the bytes read to the current command."""
+        if self.current is not None:
+            self.rows[self.current][self.READ] += count
+
+    def end(self, status):
+        """
+        Finishes measuring the current command.
+
+        Parameters
+        ----------
+        status: int
+            Status of the command result
+        """
+        if self.current is None:  # reset while the command was running
+            return
+
+        row = self.rows[self.current]
+        latency = ticks_diff(ticks_ms(), self.started)
+
+        row[self.COUNT] += 1
+        row[self.TOTAL_MS] += latency
+        if row[self.COUNT] == 1 or latency < row[self.MIN_MS]:
+            row[self.MIN_MS] = latency
+        if latency > row[self.MAX_MS]:
+            row[self.MAX_MS] = latency
+        row[self.LAST_MS] = latency
+
+        if status == Status.TIMEOUT:
+            row[self.TIMEOUTS] += 1
+        elif status != Status.SUCCESS:
+            row[self.ERRORS] += 1
+        self.current = None  # bytes read after the command aren't its own
+
+    def snapshot(self):
+        """
+        Returns a copy of the statistics.
+
+        Returns
+        -------
+        dict
+            Statistics of each verb as a dict which has the keys in FIELDS
+        """
+        return {verb: dict(zip(self.FIELDS, self.rows[row])) for verb, row in self.index.items()}
+
+    def reset(self):
+        """Clears all the statistics."""
+        for row in self.rows:
+            for column in range(len(row)):
+                row[column] = 0
+        self.index.clear()
+        self.current = None
+
+
+class TransactionLock:
+    """
+    Class for a re-entrant lock which keeps the modem to a single thread during
+    a transaction, e.g. a command and its response, or a data mode exchange.
+    The thread which holds it can acquire it again.
+    """
+
+    def __init__(self):
+        self.lock = _thread.allocate_lock()
+        self.owner = None  # identity of the thread holding the lock
+        self.count = 0  # number of times the owner acquired the lock
+
+    def acquire(self):
+        """Waits until the lock is free, unless the current thread holds it."""
+        ident = _thread.get_ident()
+        if self.owner != ident:
+            self.lock.acquire()
+            self.owner = ident
+        self.count += 1
+
+    def release(self):
+        """Releases the lock once the owner releases it as many times as it acquired."""
+        self.count -= 1
+        if not self.count:
+            self.owner = None
+            self.lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
 
 
 class ATCom:
     """Class for handling AT communication with modem"""
 
-    def __init__(self, uart_number=0, tx_pin=Pin(0), rx_pin=Pin(1), baudrate=115200, timeout=10000):
+    # Bounds of the adaptive wait (in ms) used while polling UART for new characters.
+    POLL_INTERVAL_MIN = 1
+    POLL_INTERVAL_MAX = 20
+    # Idle time (in ms) after which an unterminated line is accepted as it is.
+    LINE_IDLE_TIMEOUT = 30
+    # Maximum length of a command line accepted by the modem, including "\r".
+    MAX_LINE_LENGTH = 256
+    # Minimum size of the UART driver's own RX buffer, see set_baudrate().
+    UART_RX_BUFFER_MIN = 256
+    # Maximum number of bytes written to UART at once by send_data().
+    DATA_CHUNK_SIZE = 256
+    # Read-only queries cached by default: (command, TTL in seconds, invalidating verbs).
+    # The queries whose results change without a command, e.g. the MQTT connection
+    # state which the broker may drop, mustn't be cached.
+    CACHED_QUERIES = (
+        ("AT+CGMM", 3600, ()),
+        ("AT+QCCID", 3600, ()),
+        ("AT+CGDCONT?", 60, ("AT+QICSGP",)),
+        ('AT+QGPSCFG="priority"', 60, ()),
+    )
+    # Settings kept by modem until it restarts: (setting, whether it has a context).
+    SHADOWED_CONFIGS = (
+        ('AT+QMTCFG="version"', True),
+        ('AT+QMTCFG="SSL"', True),
+        ('AT+QHTTPCFG="contextid"', False),
+        ('AT+QHTTPCFG="requestheader"', False),
+        ('AT+QHTTPCFG="contenttype"', False),
+        ('AT+QHTTPCFG="sslctxid"', False),
+        ('AT+QSSLCFG="cacert"', True),
+        ('AT+QSSLCFG="clientcert"', True),
+        ('AT+QSSLCFG="clientkey"', True),
+        ('AT+QSSLCFG="seclevel"', True),
+        ('AT+QSSLCFG="sslversion"', True),
+        ('AT+QSSLCFG="ciphersuite"', True),
+        ('AT+QSSLCFG="ignorelocaltime"', True),
+    )
+    # URCs which modem sends when it has restarted. They reset the caches before
+    # they are routed, so a route registered for them doesn't replace the reset.
+    READY_URCS = ("RDY", "APP RDY")
+    READY_URC_END = b"RDY\r\n"  # end of all the ready URCs, searched in the waiting bytes
+
+    def __init__(
+        self,
+        uart_number=0,
+        tx_pin=Pin(0),
+        rx_pin=Pin(1),
+        baudrate=115200,
+        timeout=10000,
+        rx_buffer_size=2048,
+        stats_size=32,
+    ):
         self.modem_com = UART(uart_number, tx=tx_pin, rx=rx_pin, baudrate=baudrate, timeout=timeout)
+        self.baudrate = baudrate
+        self.rx_buffer = RingBuffer(rx_buffer_size)
+        self.urc = URCRouter()
+        self.query_cache = QueryCache()
+        self.config_shadow = ConfigShadow()
+        self.stats = CommandStats(stats_size)
+        self.recorder = None
+        self.rx_pump = None
+        self.lock = TransactionLock()
+        for command, ttl, invalidated_by in self.CACHED_QUERIES:
+            self.query_cache.register(command, ttl, invalidated_by)
+        for setting, has_context in self.SHADOWED_CONFIGS:
+            self.config_shadow.register(setting, has_context)
+
+    def _on_modem_ready(self, line):
+        """Drops the cached responses and the applied configurations when modem restarts."""
+        debug.info("Modem has restarted:", line)
+        self.reset_caches()
+
+    def _check_ready_urcs(self):
+        """
+        Resets the caches if a ready URC is waiting, i.e. modem has restarted while
+        no command was running. The waiting bytes are kept for the next response.
+        It's checked only before a cache answers, not to read UART before each command.
+
+        Returns
+        -------
+        bool
+            True if the caches are reset
+        """
+        self.rx_buffer.fill(self.modem_com)
+        if self.rx_buffer.contains(self.READY_URC_END):
+            self._on_modem_ready("RDY")
+            return True
+        return False
+
+    def reset_caches(self):
+        """Drops the cached responses and the applied configurations, e.g. after power cycle."""
+        self.query_cache.clear()
+        self.config_shadow.clear()
+
+    def set_baudrate(self, baudrate):
+        """
+        Function for changing the baudrate of UART. The modem has to be switched to
+        the same baudrate with AT+IPR before, see Base.set_baudrate().
+
+        Parameters
+        ----------
+        baudrate: int
+            New baudrate
+        """
+        # The driver buffer has to hold the bytes arriving during the longest poll interval.
+        rxbuf = max(self.UART_RX_BUFFER_MIN, baudrate * self.POLL_INTERVAL_MAX // 10000)
+        self.modem_com.init(baudrate=baudrate, rxbuf=rxbuf)
+        self.baudrate = baudrate
+        self.rx_buffer.clear()  # bytes received at the previous baudrate are garbage
+
+    def transaction(self):
+        """
+        Function for keeping the modem to the current thread while several commands
+        are run, e.g. a command which is followed by data mode or a URC.
+
+        Returns
+        -------
+        TransactionLock
+            Lock to be used in a with statement
+        """
+        return self.lock
+
+    def start_recording(self, file_path, buffer_size=512):
+        """
+        Function for recording every byte written to and read from the modem into
+        a transcript file, which can be replayed by TranscriptPlayer later.
+
+        Parameters
+        ----------
+        file_path: str
+            Path of the transcript file
+        buffer_size: int, default: 512
+            Size of the records kept in memory before writing them to the file
+        """
+        self.stop_recording()
+        self.recorder = TranscriptRecorder(file_path, buffer_size)
+        self.modem_com = RecordingUART(self.modem_com, self.recorder)
+
+    def stop_recording(self):
+        """Function for stopping the recording and closing the transcript file."""
+        if self.recorder:
+            self.modem_com = self.modem_com.uart
+            self.recorder.close()
+            self.recorder = None
+
+    def start_rx_pump(self, buffer_size=4096):
+        """
+        Function for reading UART continuously in a background thread, which runs
+        on the second core of RP2040. The bytes arriving while no response is
+        awaited are kept in the pump's buffer instead of overflowing the UART FIFO.
+
+        Parameters
+        ----------
+        buffer_size: int, default: 4096
+            Size of the pump's ring buffer in bytes
+        """
+        if self.rx_pump:
+            return
+        # The pump reads UART directly, a recording wrapper stays above it.
+        holder = self.modem_com if self.recorder else None
+        self.rx_pump = RXPump(holder.uart if holder else self.modem_com, buffer_size)
+        if holder:
+            holder.uart = self.rx_pump
+        else:
+            self.modem_com = self.rx_pump
+        self.rx_pump.start()
+
+    def stop_rx_pump(self):
+        """Function for stopping the background reading of UART."""
+        if not self.rx_pump:
+            return
+        self.rx_pump.stop()
+        self.rx_buffer.fill(self.rx_pump)  # keep the bytes already pumped
+        if self.recorder:
+            self.modem_com.uart = self.rx_pump.uart
+        else:
+            self.modem_com = self.rx_pump.uart
+        self.rx_pump = None
 
     def send_at_comm_once(self, command, line_end=True):
         """
@@ -25,24 +686,349 @@ class ATCom:
         line_end: bool, default: True
             If True, send line end
         """
-        if line_end:
-            compose = f"{command}\r".encode()
-        else:
-            compose = command.encode()
-            debug.focus(compose)
+        if not line_end:
+            self.send_data(command)
+            return
 
+        compose = f"{command}\r".encode()
         try:
-            self.modem_com.write(compose)
+            with self.lock:
+                self.modem_com.write(compose)
+                self.stats.add_written(len(compose))
         except:
             debug.error("Error occured while AT command writing to modem")
 
+    def send_data(self, data, chunk_size=None, interval=0):
+        """
+        Function for sending data-mode payloads (MQTT messages, HTTP bodies, files
+        etc.) in fixed size chunks, so the payload is never copied as a whole.
+
+        Parameters
+        ----------
+        data: str, bytes, bytearray, memoryview, file or iterable
+            Payload to send. Files are read with readinto() into a single chunk
+            buffer, and iterables (e.g. generators) may yield any of these types.
+        chunk_size: int, default: None
+            Maximum number of bytes written at once. DATA_CHUNK_SIZE if None.
+        interval: int, default: 0
+            Time to wait in milliseconds after each chunk, for pacing the modem
+            when hardware flow control isn't enabled, see set_flow_control().
+
+        Returns
+        -------
+        int
+            Number of bytes written
+        """
+        written = 0
+        try:
+            with self.lock:
+                for chunk in self._iter_chunks(data, chunk_size or self.DATA_CHUNK_SIZE):
+                    written += self._write_chunk(chunk)
+                    sleep_ms(interval)
+        except:
+            debug.error("Error occured while data writing to modem")
+        return written
+
+    @classmethod
+    def _iter_chunks(cls, data, chunk_size):
+        """
+        Generator which yields the chunks of a payload of any type accepted by
+        send_data(). The chunk read from a file is only valid until the next one.
+        """
+        if isinstance(data, str):
+            debug.focus(data)
+            for start in range(0, len(data), chunk_size):
+                yield data[start : start + chunk_size].encode()
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            view = memoryview(data)
+            for start in range(0, len(view), chunk_size):
+                yield view[start : start + chunk_size]
+        elif hasattr(data, "readinto"):
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            count = data.readinto(buffer)
+            while count:
+                yield view[:count]
+                count = data.readinto(buffer)
+        else:
+            for part in data:
+                for chunk in cls._iter_chunks(part, chunk_size):
+                    yield chunk
+
+    def _write_chunk(self, chunk):
+        """Writes a chunk of data to UART and returns its length."""
+        self.modem_com.write(chunk)
+        self.stats.add_written(len(chunk))
+        return len(chunk)
+
+    def set_flow_control(self, cts_pin=None, rts_pin=None):
+        """
+        Function for enabling hardware (RTS/CTS) flow control of UART, so the writes
+        wait while the modem can't accept more data. The modem has to be switched
+        to the same mode with AT+IFC before, see Base.set_flow_control().
+
+        Parameters
+        ----------
+        cts_pin: Pin, default: None
+            Pin connected to the CTS output of the modem
+        rts_pin: Pin, default: None
+            Pin connected to the RTS input of the modem. Flow control is disabled
+            if any of the pins is None.
+        """
+        if cts_pin is None or rts_pin is None:
+            self.modem_com.init(baudrate=self.baudrate, flow=0)
+        else:
+            flow = UART.CTS | UART.RTS
+            self.modem_com.init(baudrate=self.baudrate, cts=cts_pin, rts=rts_pin, flow=flow)
+
+    def _wait_for_data(self, wait):
+        """
+        Sleeps while no characters are waiting in the UART and returns the next wait
+        interval. The interval starts short to catch fast replies, and doubles on each
+        idle turn so long waits don't busy-loop the CPU.
+
+        Parameters
+        ----------
+        wait: int
+            Current wait interval in milliseconds
+
+        Returns
+        -------
+        int
+            Next wait interval in milliseconds
+        """
+        sleep_ms(wait)
+        return min(wait * 2, self.POLL_INTERVAL_MAX)
+
+    @staticmethod
+    def _is_expected(line, expected):
+        """Returns True if the line matches any of the #expected matchers."""
+        for matcher in expected:
+            if matcher and matcher.match(line):
+                return True
+        return False
+
+    def _read_lines(self, processed, expected=()):
+        """
+        Moves the complete lines waiting in the RX buffer to the given list. The lines
+        which have a URC route are moved to their routes instead, unless they are expected.
+
+        Parameters
+        ----------
+        processed: list
+            List of lines received so far
+        expected: tuple, default: ()
+            Matchers of the responses which are waited by the caller
+
+        Returns
+        -------
+        int
+            Number of lines added
+        """
+        count = 0
+        line = self.rx_buffer.readline()
+        while line is not None:
+            line = decode_line(line)
+            if line in self.READY_URCS:
+                self._on_modem_ready(line)
+            routed = self.urc.routes and not self._is_expected(line, expected)
+            if not (routed and self.urc.route(line)):
+                processed.append(line)
+                count += 1
+            line = self.rx_buffer.readline()
+        return count
+
+    def _receive(self, processed, last_received, expected=()):
+        """
+        Reads the characters waiting in UART and collects the complete lines.
+
+        Parameters
+        ----------
+        processed: list
+            List of lines received so far
+        last_received: int
+            ticks_ms() value of the last time a character was received
+        expected: tuple, default: ()
+            Matchers of the responses which are waited by the caller
+
+        Returns
+        -------
+        tuple
+            Number of lines added and the updated last_received value
+        """
+        received = self.rx_buffer.fill(self.modem_com)
+        if received:
+            last_received = ticks_ms()
+            self.stats.add_read(received)
+
+        count = self._read_lines(processed, expected)
+        if not count and self.rx_buffer.count:
+            if ticks_diff(ticks_ms(), last_received) >= self.LINE_IDLE_TIMEOUT:
+                # e.g. "> " prompt which is never terminated
+                processed.append(decode_line(self.rx_buffer.read_remaining()))
+                count = 1
+        return count, last_received
+
+    @staticmethod
+    def _finish(status, processed, index):
+        """
+        Builds the result of a response which is decided at the line #index. The lines
+        after it are dropped.
+
+        Parameters
+        ----------
+        status: int
+            Status of the result
+        processed: list
+            List of lines received
+        index: int
+            Index of the line which decided the result
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        del processed[index + 1 :]
+        return {"status": status, "response": processed}
+
+    def _check_response(self, processed, cursor, desired_responses, fault_responses):
+        """
+        Examines the lines which arrived after the previous call for a final response.
+
+        Parameters
+        ----------
+        processed: list
+            List of lines received so far
+        cursor: list
+            Index of the first line which isn't examined yet and index of the first
+            line which isn't scanned for desired/fault responses yet. It is updated.
+        desired_responses: ResponseMatcher
+            Matcher of the desired responses, or None
+        fault_responses: ResponseMatcher
+            Matcher of the fault responses, or None
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys, or None if the
+            response isn't completed yet
+        """
+        debug.debug("Processed:", processed)
+
+        # Only the lines arrived after the previous turn are examined.
+        for index in range(cursor[0], len(processed)):
+            value = processed[index]
+
+            if value == "OK":
+                if not desired_responses:  # if we don't look for specific responses
+                    return self._finish(Status.SUCCESS, processed, index)
+                else:
+                    if index < 1:  # we haven't got an informative response here
+                        return self._finish(Status.ERROR, processed, index)
+
+                    # Scan lines before 'OK' which aren't scanned at a previous 'OK'.
+                    for focus_index in range(cursor[1], index):
+                        focus_line = processed[focus_index]
+                        if desired_responses.match(focus_line):
+                            debug.debug("Desired:", focus_line)
+                            return self._finish(Status.SUCCESS, processed, index)
+                        if fault_responses and fault_responses.match(focus_line):
+                            debug.debug("Fault:", focus_line)
+                            return self._finish(Status.ERROR, processed, index)
+                    cursor[1] = index
+
+            elif "+CME ERROR:" in value or value == "ERROR":  # error
+                return self._finish(Status.ERROR, processed, index)
+        cursor[0] = len(processed)
+        return None
+
+    def _check_urc_response(self, processed, cursor, desired_responses, fault_responses):
+        """
+        Examines the lines which arrived after the previous call for a desired or
+        fault URC. Parameters are the same with _check_response(), except #cursor
+        only holds the index of the first line which isn't examined yet.
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys, or None if no
+            desired or fault response is received yet
+        """
+        debug.debug("Processed:", processed)
+
+        for index in range(cursor[0], len(processed)):
+            value = processed[index]
+
+            if desired_responses and desired_responses.match(value):
+                return self._finish(Status.SUCCESS, processed, index)
+            if fault_responses and fault_responses.match(value):
+                return self._finish(Status.ERROR, processed, index)
+        cursor[0] = len(processed)
+        return None
+
+    def _trim_urc_window(self, lines, keep):
+        """
+        Removes the lines except the last #keep ones, passing them to the URC router.
+        The lines which have no route are dropped.
+
+        Returns
+        -------
+        int
+            Number of lines removed
+        """
+        excess = len(lines) - keep
+        if excess <= 0:
+            return 0
+        for index in range(excess):
+            self.urc.route(lines[index])
+        del lines[:excess]
+        return excess
+
+    def _urc_checker(self, window):
+        """Returns the check function of get_urc_response() for the given #window."""
+        if window is None:
+            return self._check_urc_response
+
+        def check(processed, cursor, desired_responses, fault_responses):
+            result = self._check_urc_response(
+                processed, cursor, desired_responses, fault_responses
+            )
+            if result is None:
+                cursor[0] -= self._trim_urc_window(processed, window)
+            else:  # lines received together with the deciding one
+                self._trim_urc_window(result["response"], window + 1)
+            return result
+
+        return check
+
+    def _wait_response(self, check, processed, cursor, desired, fault, timeout):
+        """Receives lines until #check decides the result or #timeout passes."""
+        expected = (desired, fault)
+        with self.lock:
+            timer = last_received = ticks_ms()
+            wait = self.POLL_INTERVAL_MIN
+            while True:
+                if ticks_diff(ticks_ms(), timer) >= timeout * 1000:
+                    return {"status": Status.TIMEOUT, "response": "timeout"}
+
+                count, last_received = self._receive(processed, last_received, expected)
+                if not count:  # nothing new to process
+                    wait = self._wait_for_data(wait)
+                    continue
+                wait = self.POLL_INTERVAL_MIN
+
+                result = check(processed, cursor, desired, fault)
+                if result:
+                    return result
+
     def get_response(self, desired_responses=None, fault_responses=None, timeout=5):
         """
                 Function for getting modem response
 
         Parameters
         ----------
-        desired_response: str, default: None
+        desired_response: str, list or ResponseMatcher, default: None
             Desired response from modem
         timeout: int
             Timeout for getting response
@@ -52,122 +1038,110 @@ class ATCom:
         dict
             Result that includes "status" and "response" keys
         """
-        response = ""
-        processed = []
+        return self._wait_response(
+            self._check_response,
+            [],
+            [0, 0],
+            ResponseMatcher.build(desired_responses),
+            ResponseMatcher.build(fault_responses),
+            timeout,
+        )
 
-        if desired_responses:
-            if isinstance(desired_responses, str):  # if desired response is string
-                desired_responses = [desired_responses]  # make it list
-        if fault_responses:
-            if isinstance(fault_responses, str):  # if desired response is string
-                fault_responses = [fault_responses]  # make it list
-
-        timer = time.time()
-        while True:
-            time.sleep(0.1)  # wait for new chars
-
-            if time.time() - timer < timeout:
-                while self.modem_com.any():
-                    try:
-                        response += self.modem_com.read(self.modem_com.any()).decode("utf-8")
-                        debug.debug("Response:", [response])
-                    except:
-                        pass
-            else:
-                return {"status": Status.TIMEOUT, "response": "timeout"}
-
-            if response != "":
-                responses = response.split("\r\n")
-                processed.extend([x for x in responses if x != ""])
-                debug.debug("Processed:", processed)
-                response = ""
-
-            head = 0
-            for index, value in enumerate(processed):
-                processed_part = processed[head : index + 1]
-
-                if value == "OK":
-                    if not desired_responses:  # if we don't look for specific responses
-                        return {"status": Status.SUCCESS, "response": processed_part}
-                    else:
-                        if index - head < 1:  # we haven't got an informative response here
-                            return {"status": Status.ERROR, "response": processed_part}
-
-                        for focus_line in processed[head:index]:  # scan lines before 'OK'
-                            if desired_responses:
-                                if any(desired in focus_line for desired in desired_responses):
-                                    debug.debug("Desired:", focus_line)
-                                    return {"status": Status.SUCCESS, "response": processed_part}
-                            if fault_responses:
-                                if any(fault in focus_line for fault in fault_responses):
-                                    debug.debug("Fault:", focus_line)
-                                    return {"status": Status.ERROR, "response": processed_part}
-
-                elif "+CME ERROR:" in value or value == "ERROR":  # error
-                    return {"status": Status.ERROR, "response": processed_part}
-
-    def get_urc_response(self, desired_responses=None, fault_responses=None, timeout=5):
+    def get_urc_response(
+        self, desired_responses=None, fault_responses=None, timeout=5, window=None
+    ):
         """
                 Function for getting modem urc response
 
         Parameters
         ----------
-        desired_response: str or list, default: None
+        desired_response: str, list or ResponseMatcher, default: None
             List of desired responses
-        fault_response: str or list, default: None
+        fault_response: str, list or ResponseMatcher, default: None
             List of fault response from modem
         timeout: int
             timeout for getting response
+        window: int, default: None
+            If given, only the last #window lines before the desired or fault
+            response are kept, so long waits use constant memory. Older lines are
+            passed to the URC router. If None, all the lines are kept.
 
         Returns
         -------
         dict
             Result that includes "status" and "response" keys
         """
-        response = ""
         processed = []
 
-        if desired_responses:
-            if isinstance(desired_responses, str):  # if desired response is string
-                desired_responses = [desired_responses]  # make it list
-        if fault_responses:
-            if isinstance(fault_responses, str):  # if desired response is string
-                fault_responses = [fault_responses]  # make it list
+        desired_responses = ResponseMatcher.build(desired_responses)
+        fault_responses = ResponseMatcher.build(fault_responses)
 
         if not desired_responses and not fault_responses:
             return {"status": Status.SUCCESS, "response": "No desired or fault responses"}
 
-        timer = time.time()
-        while True:
-            time.sleep(0.1)  # wait for new chars
+        measured = self.stats.current is None  # otherwise it's measured as a command
+        if measured:
+            self.stats.begin_urc(desired_responses)
+        result = self._wait_response(
+            self._urc_checker(window), [], [0], desired_responses, fault_responses, timeout
+        )
+        if measured:
+            self.stats.end(result["status"])
+        return result
 
-            if time.time() - timer < timeout:
-                while self.modem_com.any():
-                    try:
-                        response += self.modem_com.read(self.modem_com.any()).decode("utf-8")
-                    except:
-                        pass
-            else:
-                return {"status": Status.TIMEOUT, "response": "timeout"}
-
-            if response != "":
-                responses = response.split("\r\n")
-                processed.extend([x for x in responses if x != ""])
-                debug.debug("Processed:", processed)
-                response = ""
-
-            head = 0
-            for index, value in enumerate(processed):
-                processed_part = processed[head : index + 1]
-
-                if desired_responses:
-                    for desired in desired_responses:
-                        if desired in value:
-                            return {"status": Status.SUCCESS, "response": processed_part}
-                if fault_responses:
-                    for fault in fault_responses:
-                        if fault in value:
-                            return {"status": Status.ERROR, "response": processed_part}
+    def poll_urc(self):
+        """
+        Function for routing the URC lines received while no command is running.
+        Lines which have no route are dropped.
+
+        Returns
+        -------
+        int
+            Number of lines routed
+        """
+        routed = 0
+        with self.lock:
+            self.rx_buffer.fill(self.modem_com)
+
+            line = self.rx_buffer.readline()
+            while line is not None:
+                line = decode_line(line)
+                if line in self.READY_URCS:
+                    self._on_modem_ready(line)
+                if self.urc.route(line):
+                    routed += 1
+                line = self.rx_buffer.readline()
+        return routed
+
+    def _get_cached_response(self, command, desired=None, fault=None):
+        """
+        Replays the cached response of a query command through the given matchers,
+        or returns OK for a configuration command which is already applied.
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys, or None if the
+            command has to be sent to modem
+        """
+        applied = self.config_shadow.is_applied(command)
+        lines = None if applied else self.query_cache.get(command)
+        if (not applied and lines is None) or self._check_ready_urcs():
+            return None
+
+        if applied:
+            debug.debug("Already applied:", command)
+            return {"status": Status.SUCCESS, "response": ["OK"]}
+
+        debug.debug("Cached:", command)
+        return self._check_response(
+            lines[:], [0, 0], ResponseMatcher.build(desired), ResponseMatcher.build(fault)
+        )
+
+    def _store_response(self, command, result):
+        """Caches the response of a query command, or the values set by a command."""
+        self.query_cache.store(command, result["response"])
+        self.config_shadow.apply(command, result["status"] == Status.SUCCESS)
 
     def send_at_comm(self, command, desired=None, fault=None, timeout=5, line_end=True, urc=False):
         """
@@ -176,10 +1150,11 @@ class ATCom:
         Parameters
         ----------
         command: str
-            AT command to send
-        desired: str or list, default: None
+            AT command to send, or a payload of any type accepted by send_data()
+            if line_end is False
+        desired: str, list or ResponseMatcher, default: None
             List of desired responses
-        fault: str or list, default: None
+        fault: str, list or ResponseMatcher, default: None
             List of fault responses
         timeout: int
             Timeout for getting response
@@ -193,8 +1168,125 @@ class ATCom:
         dict
             Result that includes "status" and "response" keys
         """
-        self.send_at_comm_once(command, line_end=line_end)
-        time.sleep(0.1)
-        if urc:
-            return self.get_urc_response(desired, fault, timeout)
-        return self.get_response(desired, fault, timeout)
+        with self.lock:  # no other thread writes between the command and its response
+            if line_end:
+                if urc:  # URC responses aren't cached, but the command may change cached ones
+                    self.query_cache.invalidate(command)
+                else:
+                    result = self._get_cached_response(command, desired, fault)
+                    if result:
+                        return result
+
+            self.stats.begin(command)
+            self.send_at_comm_once(command, line_end=line_end)
+            if urc:
+                result = self.get_urc_response(desired, fault, timeout)
+            else:
+                result = self.get_response(desired, fault, timeout)
+                if line_end:
+                    self._store_response(command, result)
+            self.stats.end(result["status"])
+            return result
+
+    def _chain_commands(self, commands):
+        """
+        Groups the commands into lines by chaining the extended ones with ";", e.g.
+        'AT+QMTCFG="version",0,4;+QMTCFG="SSL",0,1,2'.
+
+        Parameters
+        ----------
+        commands: list
+            List of AT commands
+
+        Returns
+        -------
+        list
+            List of [line, indexes of the commands in the line, chainable] items
+        """
+        chains = []
+        for index, command in enumerate(commands):
+            chainable = command.startswith("AT+")
+            if chains and chainable and chains[-1][2]:
+                chain = chains[-1]
+                if len(chain[0]) + len(command) - 1 < self.MAX_LINE_LENGTH:
+                    chain[0] += ";" + command[2:]
+                    chain[1].append(index)
+                    continue
+            chains.append([command, [index], chainable])
+        return chains
+
+    def send_batch(self, commands, timeout=5):
+        """
+        Function for sending several AT commands in as few lines as possible. The
+        modem runs chained commands one by one and stops at the first failing one,
+        so the batch is meant for configuration commands which can be repeated. The
+        configurations which are already applied aren't sent, see ConfigShadow.
+
+        Parameters
+        ----------
+        commands: list
+            List of AT commands to send in order
+        timeout: int
+            Timeout for getting the response of each line
+
+        Returns
+        -------
+        dict
+            Result that includes "status", "response" and "results" keys. "results"
+            holds the status of each command, or None for the commands which aren't
+            sent because a previous one failed.
+        """
+        results = [None] * len(commands)
+        batch = self._batch_lines(commands, results)
+
+        with self.lock:
+            try:
+                line = next(batch)
+                while True:
+                    line = batch.send(self.send_at_comm(line, timeout=timeout))
+            except StopIteration as stop:
+                return self._batch_result(stop.value, results)
+
+    def _batch_lines(self, commands, results):
+        """
+        Generator which yields the lines to send for send_batch(), and receives their
+        results. A failing chained line is split into its commands. It fills #results
+        with the status of each command, and returns the result of the last line.
+        """
+        # as a skipped command, if all are skipped
+        result = {"status": Status.SUCCESS, "response": ["OK"]}
+
+        pending = []  # indexes of the commands which aren't applied already
+        for index, command in enumerate(commands):
+            if self.config_shadow.is_applied(command):
+                results[index] = Status.SUCCESS
+            else:
+                pending.append(index)
+        if len(pending) < len(commands) and self._check_ready_urcs():
+            pending = list(range(len(commands)))
+            results[:] = [None] * len(commands)
+
+        for line, chained, _ in self._chain_commands([commands[i] for i in pending]):
+            indexes = [pending[i] for i in chained]
+            result = yield line
+
+            if result["status"] == Status.ERROR and len(indexes) > 1:
+                # The modem doesn't tell which command failed, so they are sent one by one.
+                for index in indexes:
+                    result = yield commands[index]
+                    results[index] = result["status"]
+                    if result["status"] != Status.SUCCESS:
+                        break
+            else:
+                for index in indexes:
+                    results[index] = result["status"]
+
+            if result["status"] != Status.SUCCESS:
+                break
+
+        return result
+
+    @staticmethod
+    def _batch_result(result, results):
+        """Returns the result of send_batch() from the last result and the statuses."""
+        return {"status": result["status"], "response": result["response"], "results": results}
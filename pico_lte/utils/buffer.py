@@ -0,0 +1,244 @@
+"""
+Module for buffering the bytes received from the modem without allocating
+new objects for every chunk read from UART.
+"""
+
+from pico_lte.common import debug
+
+CARRIAGE_RETURN = 13
+# bytearray.find() isn't available on every MicroPython port.
+BYTEARRAY_FIND = hasattr(bytearray, "find")
+
+
+def decode_line(line):
+    """
+    Function for converting a received line to text.
+
+    Parameters
+    ----------
+    line: bytes or memoryview
+        Line received from modem
+
+    Returns
+    -------
+    str
+        Decoded line. Bytes which are not valid UTF-8 are dropped.
+    """
+    try:
+        return str(line, "utf-8")
+    except UnicodeError:
+        return "".join(chr(byte) for byte in bytes(line) if byte < 128)
+
+
+class RingBuffer:
+    """Class for storing received bytes in a preallocated circular buffer"""
+
+    def __init__(self, size=2048):
+        """
+        Initializes the ring buffer.
+
+        Parameters
+        ----------
+        size: int, default: 2048
+            Capacity of the buffer in bytes
+        """
+        self.size = size
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.head = 0  # index of the oldest byte
+        self.count = 0  # number of bytes stored
+        self.scanned = 0  # number of bytes from head already known to have no line feed
+
+    def clear(self):
+        """Drops all the bytes stored."""
+        self.head = 0
+        self.count = 0
+        self.scanned = 0
+
+    def fill(self, stream):
+        """
+        Reads all the bytes waiting in the stream into the buffer.
+
+        Parameters
+        ----------
+        stream: UART
+            Any object which has any() and readinto() methods
+
+        Returns
+        -------
+        int
+            Number of bytes read
+        """
+        total = 0
+        while self.count < self.size:
+            available = stream.any()
+            if not available:
+                break
+
+            tail = self.head + self.count
+            if tail >= self.size:  # free space is between tail and head
+                tail -= self.size
+                end = self.head
+            else:  # free space is between tail and the end of the buffer
+                end = self.size
+
+            received = stream.readinto(self.view[tail : min(end, tail + available)])
+            if not received:
+                break
+            self.count += received
+            total += received
+        return total
+
+    def write(self, data):
+        """
+        Stores the given bytes into the buffer. Bytes which don't fit are dropped.
+
+        Parameters
+        ----------
+        data: bytes
+            Bytes received, e.g. from a stream reader
+
+        Returns
+        -------
+        int
+            Number of bytes stored
+        """
+        total = 0
+        length = min(len(data), self.size - self.count)
+        while total < length:
+            tail = self.head + self.count
+            if tail >= self.size:  # free space is between tail and head
+                tail -= self.size
+                end = self.head
+            else:  # free space is between tail and the end of the buffer
+                end = self.size
+
+            size = min(end - tail, length - total)
+            self.view[tail : tail + size] = data[total : total + size]
+            self.count += size
+            total += size
+
+        if total < len(data):
+            debug.warning("RX buffer is full, dropping received bytes.")
+        return total
+
+    def readinto(self, buf):
+        """
+        Moves the oldest bytes stored into the given buffer.
+
+        Parameters
+        ----------
+        buf: bytearray or memoryview
+            Buffer to copy the bytes into
+
+        Returns
+        -------
+        int
+            Number of bytes copied
+        """
+        total = min(len(buf), self.count)
+        first = min(total, self.size - self.head)  # bytes before the end of the buffer
+        buf[:first] = self.view[self.head : self.head + first]
+        if total > first:
+            buf[first:total] = self.view[: total - first]
+
+        self.count -= total
+        self.head = (self.head + total) % self.size if self.count else 0
+        self.scanned = 0
+        return total
+
+    def _find_in(self, start, end):
+        """Returns the index of the first line feed in buffer[start:end], or -1."""
+        if BYTEARRAY_FIND:
+            return self.buffer.find(b"\n", start, end)
+        index = bytes(self.view[start:end]).find(b"\n")  # copies only the unscanned bytes
+        return index if index == -1 else start + index
+
+    def _find_line_feed(self):
+        """Returns the offset of the first line feed from head, or -1 if there is none."""
+        start = self.head + self.scanned
+        end = self.head + self.count
+
+        if start < self.size:  # bytes before the end of the buffer
+            index = self._find_in(start, min(end, self.size))
+            if index != -1:
+                return index - self.head
+        if end > self.size:  # bytes wrapped around to the beginning of the buffer
+            index = self._find_in(max(start - self.size, 0), end - self.size)
+            if index != -1:
+                return index + self.size - self.head
+
+        self.scanned = self.count  # next scan continues from here
+        return -1
+
+    def contains(self, pattern):
+        """
+        Returns True if the stored bytes include the pattern. The bytes aren't removed.
+
+        Parameters
+        ----------
+        pattern: bytes
+            Bytes to search
+        """
+        if not self.count:
+            return False
+        end = self.head + self.count
+        if end > self.size:  # bytes wrap around the end of the buffer
+            return pattern in bytes(self.view[self.head :]) + bytes(self.view[: end - self.size])
+        if BYTEARRAY_FIND:
+            return self.buffer.find(pattern, self.head, end) != -1
+        return pattern in bytes(self.view[self.head : end])
+
+    def _take(self, length, skip=0):
+        """Removes #length bytes (plus #skip more) from head and returns the first #length."""
+        start = self.head
+        end = start + length
+        if end <= self.size:
+            data = self.view[start:end]
+        else:  # line wraps around the end of the buffer
+            data = bytes(self.view[start:]) + bytes(self.view[: end - self.size])
+
+        self.count -= length + skip
+        self.head = (start + length + skip) % self.size if self.count else 0
+        self.scanned = 0
+        return data
+
+    def readline(self):
+        """
+        Returns the next non-empty line without its line ending. If the line is stored
+        contiguously, it is a memoryview into the buffer which is valid until the next
+        fill(), otherwise it is a bytes copy.
+
+        Returns
+        -------
+        memoryview or bytes
+            Line received, or None if there is no complete line yet.
+        """
+        while True:
+            offset = self._find_line_feed()
+            if offset == -1:
+                if self.count == self.size:  # a line longer than the buffer
+                    debug.warning("RX buffer is full, splitting a long line.")
+                    return self._take(self.count)
+                return None
+
+            length = offset
+            if length and self.buffer[(self.head + length - 1) % self.size] == CARRIAGE_RETURN:
+                length -= 1
+
+            if length == 0:  # skip empty lines
+                self._take(0, offset + 1)
+                continue
+            return self._take(length, offset + 1 - length)
+
+    def read_remaining(self):
+        """
+        Removes and returns the unterminated bytes stored, e.g. a prompt which is
+        never followed by a line ending.
+
+        Returns
+        -------
+        memoryview or bytes
+            Bytes stored.
+        """
+        return self._take(self.count)
@@ -3,9 +3,26 @@ Module for storing helper functions
 """
 
 import json
+import time
 from pico_lte.common import config
 from pico_lte.utils.status import Status
 
+try:
+    from time import ticks_ms, ticks_diff, sleep_ms
+except ImportError:
+    # Fallbacks for running the SDK on CPython (e.g. host-side tests).
+    def ticks_ms():
+        """Returns a millisecond counter with an arbitrary reference point."""
+        return int(time.monotonic() * 1000)
+
+    def ticks_diff(ticks1, ticks2):
+        """Returns the signed difference between two ticks_ms() values."""
+        return ticks1 - ticks2
+
+    def sleep_ms(milliseconds):
+        """Sleeps for the given number of milliseconds."""
+        time.sleep(milliseconds / 1000)
+
 
 def read_json_file(file_path):
     """
@@ -64,9 +81,12 @@ def get_desired_data(result, prefix, separator=",", data_index=0):
 
     response = result_to_return.get("response")
 
+    last_ok = 0
     for index, value in enumerate(response):
-        if value == "OK" and index > 0:
-            valuable_lines = [response[i] for i in range(0, index)]
+        if value == "OK":
+            last_ok = index
+    if last_ok:
+        valuable_lines = response[:last_ok]
 
     if valuable_lines:
         for line in valuable_lines:
@@ -2,15 +2,67 @@
 Module for managing processes on modem step by step.
 """
 
+import time
+import random
+
 from pico_lte.common import config, debug
 from pico_lte.utils.status import Status
+from pico_lte.utils.helpers import ticks_diff, ticks_ms
 
 
-class Step:
-    """Data class for storing step data"""
+class Param:
+    """Placeholder for a step parameter which is bound to a value on each run"""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class FixedBackoff:
+    """Backoff policy which waits the same interval before each retry"""
+
+    def __init__(self, interval):
+        self.interval = interval
+
+    def delay(self, attempt, previous):
+        """Returns the seconds to wait before the #attempt th retry"""
+        return self.interval
+
+
+class ExponentialBackoff:
+    """Backoff policy which multiplies the interval by #factor on each retry, up to #cap"""
+
+    def __init__(self, base, factor=2, cap=60):
+        self.base = base
+        self.factor = factor
+        self.cap = cap
+
+    def delay(self, attempt, previous):
+        """Returns the seconds to wait before the #attempt th retry"""
+        return min(self.cap, self.base * self.factor ** (attempt - 1))
+
+
+class DecorrelatedJitterBackoff:
+    """
+    Backoff policy which waits a random interval between #base and three times the
+    previous one, up to #cap. The devices which fail together don't retry in lock-step.
+    """
 
-    is_ok = False
-    final_step = False
+    def __init__(self, base, cap=60):
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt, previous):
+        """Returns the seconds to wait before the #attempt th retry"""
+        return min(self.cap, random.uniform(self.base, (previous or self.base) * 3))
+
+
+class Step:
+    """
+    Data class for storing step data. The state of a run isn't stored in steps, so a
+    step may be shared by many runs, see Workflow.
+    """
 
     def __init__(
         self,
@@ -23,6 +75,7 @@ class Step:
         retry=0,
         final_step=False,
         cachable=False,
+        backoff=None,
     ):
         self.function = function
         self.name = name
@@ -33,23 +86,79 @@ class Step:
         self.function_params = function_params
         self.final_step = final_step
         self.cachable = cachable
+        self.backoff = backoff  # policy for the intervals between retries, see FixedBackoff
+        # steps of the success and fail transitions, resolved by Workflow.compile()
+        self.success_step = None
+        self.fail_step = None
+        self.bound = self._has_placeholders()
+
+    def _has_placeholders(self):
+        """Returns whether the params include Param placeholders, to check once per step"""
+        params = self.function_params
+        return bool(params) and any(isinstance(value, Param) for value in params.values())
 
     def update_function_params(self, **args):
         """Method for updating function_params key of the step."""
         for key, value in args.items():
             self.function_params[key] = value
+        self.bound = self._has_placeholders()
 
 
 class StateManager:
-    """Class for managing states"""
+    """
+    Class for managing states. It runs the steps added to it, or the steps of a
+    Workflow, and holds the state of the run.
+    """
 
     NO_WAIT_INTERVAL = 0
-    retry_counter = 0
-    steps = {}
     cache = config["cache"]
+    tracer = None  # StepTracer which records the runs if set, see pico_lte.utils.tracer
+
+    # Default steps run the method with the same name, so they are shared by managers.
+    organizer_step = Step("organizer", None, "organizer", "organizer")
+    success_step = Step("success", None, "success", "success", final_step=True)
+    failure_step = Step("failure", None, "failure", "failure", final_step=True)
+
+    def __init__(self, first_step, function_name=None, params=None, deadline=None):
+        """
+        Initializes state manager
+
+        Parameters
+        ----------
+        first_step : Step or Workflow
+            Step to begin with, or the workflow to run
+        function_name : str, default: None
+            Name of the function for caching the state, default of the workflow if None
+        params : dict, default: None
+            Values of the Param placeholders in the step parameters
+        deadline : int, default: None
+            Seconds for the whole run, counted from the first step. The run fails
+            when it's exceeded. Default of the workflow if None.
+        """
+        self.workflow = None
+        self.params = params
+        self.retry_counter = 0
+        self.is_ok = False  # whether current step has succeeded
+        self.end = None  # name of the step which ends the run, see run()
+        self.interval = None  # interval replacing the interval of current step
+        self.backoff_delay = None  # last delay of the backoff policy of current step
+        self.deadline = deadline
+        self.started = None
+        self.trace = None  # trace of the run if there is a tracer
+
+        if isinstance(first_step, Workflow):
+            self.workflow = first_step
+            self.steps = first_step.get_steps()  # shared, copied by add_step() if needed
+            function_name = function_name or first_step.function_name
+            if deadline is None:
+                self.deadline = first_step.deadline
+            first_step = first_step.first_step
+        else:
+            self.steps = {}
+            self.add_step(self.organizer_step)
+            self.add_step(self.success_step)
+            self.add_step(self.failure_step)
 
-    def __init__(self, first_step, function_name=None):
-        """Initializes state manager"""
         self.first_step = first_step
         self.function_name = function_name
 
@@ -57,52 +166,17 @@ class StateManager:
             if not self.cache.states.get(function_name):
                 self.cache.add_cache(function_name)
 
-        self.organizer_step = Step(
-            function=self.organizer,
-            name="organizer",
-            success="organizer",
-            fail="organizer",
-            function_params=None,
-            interval=0,
-            retry=0,
-        )
-
-        self.success_step = Step(
-            function=self.success,
-            name="success",
-            success="success",
-            fail="success",
-            function_params=None,
-            interval=0,
-            retry=0,
-            final_step=True,
-        )
-
-        self.failure_step = Step(
-            function=self.failure,
-            name="failure",
-            success="failure",
-            fail="failure",
-            function_params=None,
-            interval=0,
-            retry=0,
-            final_step=True,
-        )
-
         self.current = self.organizer_step
 
-        # Add default steps to steps dictionary
-        self.add_step(self.organizer_step)
-        self.add_step(self.success_step)
-        self.add_step(self.failure_step)
-
     def add_step(self, step):
         """Adds step to steps dictionary"""
+        if self.workflow and self.steps is self.workflow.steps:
+            self.steps = dict(self.steps)  # not to change the steps of the workflow
         self.steps[step.name] = step
 
     def update_step(self, step):
         """Updates step in steps dictionary"""
-        self.steps[step.name] = step
+        self.add_step(step)
 
     def get_step(self, name):
         """Returns step with name"""
@@ -116,8 +190,13 @@ class StateManager:
         """Increments retry counter"""
         self.retry_counter += 1
 
+    def _is_compiled(self):
+        """Returns whether the steps are of a workflow, so their transitions are resolved"""
+        return self.workflow is not None and self.steps is self.workflow.steps
+
     def organizer(self):
         """Organizer step function"""
+        previous = self.current.name
         if self.current.name == "organizer":
             self.current = self.first_step
 
@@ -126,96 +205,402 @@ class StateManager:
                 self.current = self.get_step(cached_step)
 
         else:
-            if self.current.is_ok:  # step succieded
+            self.interval = None
+            if self.is_ok:  # step succieded
+                self.backoff_delay = None
                 if self.current.cachable:  # Assign new cache if step cachable
                     self.cache.set_state(self.function_name, self.current.name)
 
-                self.current.is_ok = False
+                self.is_ok = False
 
-                if self.current.final_step:
+                if self.current.final_step or self.current.name == self.end:
                     self.current = self.get_step("success")
+                elif self._is_compiled():
+                    self.current = self.current.success_step
                 else:
                     self.current = self.get_step(self.current.success)
             else:
                 if self.retry_counter >= self.current.retry:
                     # step failed and retry counter is exceeded
-                    self.current = self.get_step(self.current.fail)
+                    if self._is_compiled():
+                        self.current = self.current.fail_step
+                    else:
+                        self.current = self.get_step(self.current.fail)
                     # clear cache
                     self.cache.set_state(self.function_name, None)
 
                     self.clear_counter()
-                    self.current.interval = self.NO_WAIT_INTERVAL
+                    self.backoff_delay = None
+                    self.interval = self.NO_WAIT_INTERVAL
                 else:
                     # step failed and retry counter is not exceeded, retrying...
                     self.current = self.get_step(self.current.name)
                     self.counter_tick()
+                    if self.trace:
+                        self.trace.retries += 1
+
+        if self.trace:
+            self.trace.transition(previous, self.current.name)
         return {"status": Status.SUCCESS}
 
     def success(self):
         """Success step function"""
         return {
             "status": Status.SUCCESS,
-            "response": self.cache.get_last_response(),
+            "response": self.cache.get_last_response(self.function_name),
         }
 
     def failure(self):
         """Fail step function"""
         return {
             "status": Status.ERROR,
-            "response": self.cache.get_last_response(),
+            "response": self.cache.get_last_response(self.function_name),
         }
 
     def execute_organizer_step(self):
         """Executes organizer step"""
         self.organizer()
 
-    def execute_current_step(self):
-        """Executes current step"""
-        params = self.current.function_params
+    def _call_current_step(self):
+        """Calls the function of current step and returns what it returns"""
+        step = self.current
+        function = step.function or getattr(self, step.name)
+        params = step.function_params
 
-        if params:
-            result = self.current.function(**params)
-        else:
-            result = self.current.function()
+        if step.bound:
+            params = {
+                key: self.params[value.name] if isinstance(value, Param) else value
+                for key, value in params.items()
+            }
 
-        debug.debug(f"{self.current.function.__name__:<25} : {result}")
-        self.cache.set_last_response(result.get("response"))
+        if params:
+            return function(**params)
+        return function()
 
-        if result["status"] == Status.SUCCESS:
-            self.current.is_ok = True
-        else:
-            self.current.is_ok = False
+    def _save_step_result(self, result):
+        """Saves the result of current step"""
+        debug.debug(f"{self.current.name:<25} : {result}")
+        self.cache.set_last_response(result.get("response"), self.function_name)
+        self.is_ok = result["status"] == Status.SUCCESS
 
         return result
 
-    def run(self, begin=None, end=None):
-        """Runs state manager."""
-        result = {}
+    def _trace_step(self, started, result):
+        """Records current step to the trace of the run, except the default steps"""
+        if self.current.function:
+            duration = ticks_diff(ticks_ms(), started)
+            self.trace.step(self.current.name, duration, result.get("status"))
 
+    def execute_current_step(self):
+        """Executes current step"""
+        if not self.trace:
+            return self._save_step_result(self._call_current_step())
+
+        started = ticks_ms()
+        result = self._call_current_step()
+        self._trace_step(started, result)
+        return self._save_step_result(result)
+
+    async def execute_current_step_async(self):
+        """Executes current step, awaiting its function if it is a coroutine"""
+        started = ticks_ms()
+        result = self._call_current_step()
+        if hasattr(result, "send"):  # coroutine, e.g. a method using AsyncATCom
+            result = await result
+        if self.trace:
+            self._trace_step(started, result)
+        return self._save_step_result(result)
+
+    def _begin_trace(self):
+        """Begins the trace of the run if there is a tracer and it's not begun"""
+        if self.tracer and not self.trace:
+            self.trace = self.tracer.begin(self.function_name)
+
+    def _finish_trace(self, result):
+        """Stores the trace of the run if the run has finished"""
+        if self.trace and result.get("status") in (Status.SUCCESS, Status.ERROR):
+            self.tracer.finish(self.trace, result["status"])
+            self.trace = None
+        return result
+
+    def _begin_step(self, begin):
+        """Moves to the #begin step if given, otherwise runs organizer step"""
         if begin:
             self.current = self.get_step(begin)
-            begin = None  # to run above line only once at the beginning
         else:
             self.execute_organizer_step()
 
+    def _build_result(self, step_result, end):
+        """Builds the result of a run from the result of current step"""
+        if end:
+            self.end = self.get_step(end).name
+
+        if not (self.current.final_step or self.current.name == self.end):
+            return {
+                "status": Status.ONGOING,
+                "interval": self._next_interval(),
+                "response": step_result.get("response"),
+            }
+
+        if self.current.name == "success":
+            status = Status.SUCCESS
+        elif self.current.name == "failure":
+            status = Status.ERROR
+        else:  # the #end step, which is neither success nor failure
+            return {"interval": self.NO_WAIT_INTERVAL}
+
+        return {
+            "status": status,
+            "interval": self.NO_WAIT_INTERVAL,
+            "response": step_result.get("response"),
+        }
+
+    def _next_interval(self):
+        """Returns the interval before the next run, backing off if current step is retried"""
+        if self.interval is not None:
+            return self.interval
+
+        step = self.current
+        if step.backoff and not self.is_ok and self.retry_counter < step.retry:
+            self.backoff_delay = step.backoff.delay(self.retry_counter + 1, self.backoff_delay)
+            return self.backoff_delay
+        return step.interval
+
+    def _remaining_time(self):
+        """Returns the seconds until the deadline, or None if there is no deadline"""
+        if self.deadline is None:
+            return None
+        if self.started is None:
+            self.started = ticks_ms()
+        return self.deadline - ticks_diff(ticks_ms(), self.started) / 1000
+
+    def _expire(self):
+        """Fails the run since its deadline is exceeded"""
+        debug.warning(f"{self.function_name} exceeded its deadline of {self.deadline} s.")
+        self.current = self.failure_step
+        self.cache.set_state(self.function_name, None)
+        self.clear_counter()
+
+        return {
+            "status": Status.ERROR,
+            "interval": self.NO_WAIT_INTERVAL,
+            "response": "Deadline exceeded",
+        }
+
+    def _limit_interval(self, result):
+        """Shortens the interval of the result not to sleep after the deadline"""
+        remaining = self._remaining_time()
+        if remaining is not None and result.get("interval"):
+            result["interval"] = min(result["interval"], max(remaining, 0))
+        return result
+
+    def run(self, begin=None, end=None):
+        """Runs state manager."""
+        self._begin_trace()
+        remaining = self._remaining_time()
+        if remaining is not None and remaining <= 0:
+            return self._finish_trace(self._expire())
+
+        self._begin_step(begin)
         step_result = self.execute_current_step()
+        return self._finish_trace(self._limit_interval(self._build_result(step_result, end)))
+
+    async def run_async(self, begin=None, end=None):
+        """
+        Runs state manager until it succeeds or fails. Step functions may be
+        coroutines, and the step intervals are awaited without blocking other tasks.
+        See AsyncATCom for the module methods which can be the steps.
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        try:
+            import uasyncio as asyncio
+        except ImportError:
+            import asyncio
+
+        while True:
+            self._begin_trace()
+            remaining = self._remaining_time()
+            if remaining is not None and remaining <= 0:
+                return self._finish_trace(self._expire())
+
+            self._begin_step(begin)
+            begin = None  # to run above line only once at the beginning
+            step_result = await self.execute_current_step_async()
+            result = self._finish_trace(self._limit_interval(self._build_result(step_result, end)))
+
+            if result.get("status") in (Status.SUCCESS, Status.ERROR):
+                return result
+            await asyncio.sleep(result["interval"])
+
+
+class Workflow:
+    """
+    Class for storing a graph of steps which is built once and run many times. Its
+    steps are shared by the runs, so the values changing on each run are given as
+    Param placeholders and bound by the params of the run, see run().
+    """
+
+    def __init__(self, steps, function_name=None, deadline=None):
+        """
+        Parameters
+        ----------
+        steps : list or function
+            Steps of the workflow beginning with the first step, or a function which
+            returns them. The function is called on the first run, so the steps of the
+            unused workflows aren't built.
+        function_name : str, default: None
+            Name of the function for caching the state
+        deadline : int, default: None
+            Seconds for each run, see StateManager
+        """
+        self.function_name = function_name
+        self.deadline = deadline
+        self.builder = None
+        self.steps = None
+        self.first_step = None
 
-        if end:
-            if self.current.name == self.get_step(end).name:
-                self.current.final_step = True
-
-        if not self.current.final_step:
-            result["status"] = Status.ONGOING
-            result["interval"] = self.current.interval
-            result["response"] = step_result.get("response")
-            return result
+        if callable(steps):
+            self.builder = steps
         else:
-            if self.current.name == "success":
-                result["status"] = Status.SUCCESS
-                result["response"] = step_result.get("response")
-            elif self.current.name == "failure":
-                result["status"] = Status.ERROR
-                result["response"] = step_result.get("response")
-
-            result["interval"] = self.NO_WAIT_INTERVAL
-            return result
+            self.compile(steps)
+
+    def _add_steps(self, steps):
+        """Builds the steps dictionary, including the default steps"""
+        self.steps = {
+            "organizer": StateManager.organizer_step,
+            "success": StateManager.success_step,
+            "failure": StateManager.failure_step,
+        }
+        for step in steps:
+            self.steps[step.name] = step
+        self.first_step = steps[0]
+
+    def get_steps(self):
+        """Returns the steps dictionary, building the steps if not built yet"""
+        if self.steps is None:
+            self.compile()
+        return self.steps
+
+    def _next_steps(self, step):
+        """Returns the steps which #step goes to, except itself and the default steps"""
+        targets = []
+        for target in (step.success_step, step.fail_step):
+            if target is not step and target.function and target not in targets:
+                targets.append(target)
+        return targets
+
+    def _find_cycle(self):
+        """Returns the names of the steps in a cycle reachable from the first step, or None"""
+        visiting = []  # path of the depth-first search
+        done = set()
+        stack = [(self.first_step, self._next_steps(self.first_step))]
+        visiting.append(self.first_step)
+
+        while stack:
+            step, targets = stack[-1]
+            if not targets:
+                stack.pop()
+                visiting.pop()
+                done.add(id(step))
+                continue
+
+            target = targets.pop()
+            if target in visiting:
+                return [cycle_step.name for cycle_step in visiting[visiting.index(target) :]]
+            if id(target) not in done:
+                stack.append((target, self._next_steps(target)))
+                visiting.append(target)
+        return None
+
+    def compile(self, steps=None):
+        """
+        Builds the steps if not built yet, checks the graph of the steps, and resolves
+        the transitions to step references, so the runs don't look them up by name.
+        Unreachable steps, and the cycles which may run forever without a deadline
+        are warned about.
+
+        Parameters
+        ----------
+        steps : list, default: None
+            Steps of the workflow, built by the function given to the constructor if None
+
+        Returns
+        -------
+        dict
+            Report that includes "unreachable" (list of step names) and "cycle" (step
+            names in a cycle, or None) keys
+
+        Raises
+        ------
+        ValueError
+            If a step goes to a step which doesn't exist
+        """
+        if steps is None:
+            if self.steps is not None:
+                steps = [self.first_step] + list(self.steps.values())
+            else:
+                steps = self.builder()
+                self.builder = None
+        self._add_steps(steps)
+
+        graph = list(self.steps.values())
+        if self.first_step not in graph:  # the first step is replaced by a same named one
+            graph.append(self.first_step)
+
+        for step in graph:
+            for name in (step.success, step.fail):
+                if name not in self.steps:
+                    raise ValueError(
+                        f"Step {step.name} of {self.function_name} goes to unknown step: {name}"
+                    )
+
+        for step in graph:
+            step.success_step = self.steps[step.success]
+            step.fail_step = self.steps[step.fail]
+            if step.final_step:
+                step.success_step = StateManager.success_step
+
+        reached = [self.first_step]
+        for step in reached:  # grows while iterating, breadth-first
+            for target in self._next_steps(step):
+                if target not in reached:
+                    reached.append(target)
+
+        unreachable = [step.name for step in graph if step.function and step not in reached]
+        cycle = self._find_cycle()
+
+        if unreachable:
+            debug.warning(f"{self.function_name} has unreachable steps: {unreachable}")
+        if cycle and self.deadline is None:
+            debug.warning(f"{self.function_name} may run forever in the cycle: {cycle}")
+
+        return {"unreachable": unreachable, "cycle": cycle}
+
+    def run(self, params=None):
+        """
+        Runs the workflow until it succeeds or fails.
+
+        Parameters
+        ----------
+        params : dict, default: None
+            Values of the Param placeholders in the step parameters
+
+        Returns
+        -------
+        dict
+            Result that includes "status" and "response" keys
+        """
+        manager = StateManager(self, params=params)
+
+        while True:
+            result = manager.run()
+
+            if result["status"] == Status.SUCCESS:
+                return result
+            elif result["status"] == Status.ERROR:
+                return result
+            time.sleep(result["interval"])
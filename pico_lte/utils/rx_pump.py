@@ -0,0 +1,82 @@
+"""
+Module for draining UART continuously on the second core of RP2040, so the bytes
+arriving between commands don't overflow the UART FIFO.
+"""
+
+import _thread
+
+from pico_lte.utils.buffer import RingBuffer
+from pico_lte.utils.helpers import sleep_ms
+
+
+class RXPump:
+    """
+    Class for reading UART in a background thread into a lock-protected ring buffer.
+    It has the any(), readinto(), write() and init() methods of UART, so it is used
+    in place of the UART it wraps, see ATCom.start_rx_pump().
+    """
+
+    def __init__(self, uart, buffer_size=4096, interval=1):
+        """
+        Parameters
+        ----------
+        uart: UART
+            UART connected to the modem
+        buffer_size: int, default: 4096
+            Size of the ring buffer in bytes
+        interval: int, default: 1
+            Time to sleep in milliseconds when UART is idle
+        """
+        self.uart = uart
+        self.buffer = RingBuffer(buffer_size)
+        self.lock = _thread.allocate_lock()
+        self.interval = interval
+        self.running = False
+        self.stopped = True
+
+    def start(self):
+        """Starts the background thread. RP2040 runs it on the second core."""
+        if self.running:
+            return
+        self.running = True
+        self.stopped = False
+        _thread.start_new_thread(self._run, ())
+
+    def stop(self):
+        """Stops the background thread and waits until it exits."""
+        self.running = False
+        while not self.stopped:
+            sleep_ms(self.interval)
+
+    def _run(self):
+        """Moves the bytes waiting in UART to the ring buffer until stopped."""
+        try:
+            while self.running:
+                with self.lock:
+                    received = self.buffer.fill(self.uart)
+                if not received:
+                    sleep_ms(self.interval)
+        finally:
+            self.stopped = True
+
+    def init(self, *args, **kwargs):
+        """Changes the UART configuration, dropping the bytes in the ring buffer."""
+        with self.lock:
+            self.uart.init(*args, **kwargs)
+            self.buffer.clear()
+
+    def any(self):
+        """Returns the number of bytes waiting in the ring buffer."""
+        return self.buffer.count
+
+    def readinto(self, buf, nbytes=None):
+        """Moves the bytes waiting in the ring buffer into the given buffer."""
+        if nbytes is not None:
+            buf = memoryview(buf)[:nbytes]
+        with self.lock:
+            count = self.buffer.readinto(buf)
+        return count or None
+
+    def write(self, data):
+        """Writes the bytes to UART."""
+        return self.uart.write(data)
@@ -0,0 +1,123 @@
+"""
+Module for running many state managers together, without blocking on the
+intervals between their steps.
+"""
+
+from pico_lte.utils.helpers import sleep_ms, ticks_diff, ticks_ms
+from pico_lte.utils.manager import StateManager, Workflow
+from pico_lte.utils.status import Status
+
+
+class Job:
+    """Data class for storing a state manager and when its next step is due"""
+
+    __slots__ = ("manager", "callback", "started", "delay", "result")
+
+    def __init__(self, manager, callback=None):
+        self.manager = manager
+        self.callback = callback
+        self.started = ticks_ms()
+        self.delay = 0  # milliseconds after #started to run the next step
+        self.result = None  # final result of the manager
+
+    @property
+    def finished(self):
+        """Returns whether the manager has succeeded or failed"""
+        return self.result is not None
+
+    def remaining(self, now):
+        """Returns the milliseconds until the next step is due"""
+        return self.delay - ticks_diff(now, self.started)
+
+
+class Scheduler:
+    """
+    Class for running many state managers together, e.g. a GPS fix, an MQTT publish
+    and an HTTP upload. Instead of sleeping the interval of each step, it runs the
+    steps of the managers which are due, and sleeps until the next one is due.
+    A step still blocks while it runs, including the workflows called by the step,
+    e.g. Network.register_network().
+    """
+
+    def __init__(self):
+        self.jobs = []
+
+    def add(self, manager, params=None, callback=None):
+        """
+        Adds a state manager, or a new run of a workflow to the scheduler.
+
+        Parameters
+        ----------
+        manager : StateManager or Workflow
+            State manager or the workflow to run
+        params : dict, default: None
+            Values of the Param placeholders if a workflow is given
+        callback : function, default: None
+            Function called with the final result when the manager finishes
+
+        Returns
+        -------
+        Job
+            Job which stores the final result of the manager as "result"
+        """
+        if isinstance(manager, Workflow):
+            manager = StateManager(manager, params=params)
+
+        job = Job(manager, callback)
+        self.jobs.append(job)
+        return job
+
+    def _run_step(self, job):
+        """Runs the next step of the job, and finishes or reschedules it"""
+        result = job.manager.run()
+
+        if result.get("status") in (Status.SUCCESS, Status.ERROR):
+            job.result = result
+            if job.callback:
+                job.callback(result)
+        else:
+            job.started = ticks_ms()
+            job.delay = int(result["interval"] * 1000)
+
+    def run_once(self):
+        """
+        Runs the next step of each state manager which is due. It can be called in
+        the main loop of an application which has other work to do.
+
+        Returns
+        -------
+        int
+            Milliseconds until the next step is due, or None if all managers finished
+        """
+        next_due = None
+
+        for job in self.jobs:
+            if job.remaining(ticks_ms()) <= 0:
+                self._run_step(job)
+                if job.finished:
+                    continue
+
+            remaining = max(job.remaining(ticks_ms()), 0)
+            if next_due is None or remaining < next_due:
+                next_due = remaining
+
+        self.jobs = [job for job in self.jobs if not job.finished]
+        return next_due
+
+    def run(self):
+        """
+        Runs all state managers until each of them succeeds or fails.
+
+        Returns
+        -------
+        list
+            Final results of the managers in the order they were added
+        """
+        jobs = list(self.jobs)
+
+        while True:
+            next_due = self.run_once()
+            if next_due is None:
+                return [job.result for job in jobs]
+            if next_due:
+                sleep_ms(next_due)
@@ -0,0 +1,87 @@
+"""
+Module for saving the states of StateCache to flash, so the steps which are already
+done (e.g. SSL configuration) can be skipped after a reboot or deep sleep.
+"""
+
+from pico_lte.utils.helpers import read_json_file, ticks_diff, ticks_ms, write_json_file
+
+
+class StateStore:
+    """
+    Class for saving the states of StateCache to a file. The writes are coalesced, so
+    the states changing in a burst are written once, and the states are discarded
+    if they were saved for another modem.
+
+    The file has the format {"v": VERSION, "id": device_id, "s": {function: step}},
+    and the functions which have no state are left out.
+    """
+
+    VERSION = 1
+
+    def __init__(self, file_path="state_cache.json", device_id=None, flush_interval=5000):
+        """
+        Parameters
+        ----------
+        file_path : str, default: "state_cache.json"
+            Path of the file which stores the states
+        device_id : str, default: None
+            ID of the modem, e.g. IMEI, to validate the saved states with
+        flush_interval : int, default: 5000
+            Minimum milliseconds between two writes. The states changing in between
+            are written by the next change after it, or by flush().
+        """
+        self.file_path = file_path
+        self.device_id = device_id
+        self.flush_interval = flush_interval
+        self.pending = None  # states waiting to be written
+        self.written = None  # states in the file
+        self.last_write = None
+
+    def load(self):
+        """
+        Reads the saved states.
+
+        Returns
+        -------
+        dict
+            States saved for the modem, or an empty dict if the file is missing,
+            has another version, or is saved for another modem
+        """
+        data = read_json_file(self.file_path)
+        if (
+            not isinstance(data, dict)
+            or data.get("v") != self.VERSION
+            or data.get("id") != self.device_id
+            or not isinstance(data.get("s"), dict)
+        ):
+            return {}
+
+        self.written = data["s"]
+        return dict(self.written)
+
+    def save(self, states):
+        """Saves the states, writing them now if the last write is old enough."""
+        self.pending = {name: step for name, step in states.items() if step}
+
+        if self.last_write is None or (
+            ticks_diff(ticks_ms(), self.last_write) >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Writes the states waiting, e.g. before deep sleep."""
+        if self.pending is None:
+            return
+
+        if self.pending != self.written:
+            write_json_file(
+                self.file_path, {"v": self.VERSION, "id": self.device_id, "s": self.pending}
+            )
+            self.written = self.pending
+            self.last_write = ticks_ms()
+        self.pending = None
+
+    def clear(self):
+        """Discards the saved states, e.g. when the modem has rebooted."""
+        self.pending = {}
+        self.flush()
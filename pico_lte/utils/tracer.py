@@ -0,0 +1,144 @@
+"""
+Module for tracing the steps of the state manager runs, to find where the time
+of a workflow is spent.
+"""
+
+from pico_lte.common import debug
+from pico_lte.utils.helpers import ticks_diff, ticks_ms
+from pico_lte.utils.status import Status
+
+
+class RunTrace:
+    """
+    Data class for storing the trace of a state manager run. Steps are stored as
+    (name, milliseconds, status) and transitions as (source, target) tuples.
+    """
+
+    __slots__ = (
+        "function_name",
+        "started",
+        "total",
+        "steps",
+        "transitions",
+        "retries",
+        "status",
+        "dropped",
+        "max_events",
+    )
+
+    def __init__(self, function_name, max_events=32):
+        self.function_name = function_name
+        self.started = ticks_ms()
+        self.total = None  # milliseconds of the whole run, set when it finishes
+        self.steps = []
+        self.transitions = []
+        self.retries = 0
+        self.status = None
+        self.dropped = 0  # number of the events which didn't fit
+        self.max_events = max_events
+
+    def step(self, name, duration, status):
+        """Records a step which ran for #duration milliseconds"""
+        if len(self.steps) < self.max_events:
+            self.steps.append((name, duration, status))
+        else:
+            self.dropped += 1
+
+    def transition(self, source, target):
+        """Records a transition from the #source step to the #target step"""
+        if len(self.transitions) < self.max_events:
+            self.transitions.append((source, target))
+        else:
+            self.dropped += 1
+
+
+class StepTracer:
+    """
+    Class for tracing state manager runs into a bounded buffer, which keeps the
+    last #capacity runs. It is enabled by setting StateManager.tracer.
+    """
+
+    def __init__(self, capacity=16, max_events=32):
+        """
+        Parameters
+        ----------
+        capacity : int, default: 16
+            Number of the last runs to keep
+        max_events : int, default: 32
+            Number of the steps and transitions to keep for each run
+        """
+        self.capacity = capacity
+        self.max_events = max_events
+        self.runs = []  # finished runs, the oldest first
+
+    def begin(self, function_name):
+        """Returns a new trace for a run of #function_name"""
+        return RunTrace(function_name, self.max_events)
+
+    def finish(self, trace, status):
+        """Stores the trace of a finished run, dropping the oldest if the buffer is full"""
+        trace.total = ticks_diff(ticks_ms(), trace.started)
+        trace.status = status
+        self.runs.append(trace)
+        if len(self.runs) > self.capacity:
+            self.runs.pop(0)
+
+    def clear(self):
+        """Drops the stored runs"""
+        self.runs = []
+
+    def summary(self, function_name=None):
+        """
+        Summarizes the stored runs for each function.
+
+        Parameters
+        ----------
+        function_name : str, default: None
+            Function to summarize, all functions if None
+
+        Returns
+        -------
+        dict
+            Summary of each function, including "runs", "total" (ms), "retries" and
+            "steps" keys. "steps" has "count", "total" (ms), "max" (ms) and "failures"
+            of each step. Only the summary of #function_name if it's given.
+        """
+        functions = {}
+        for trace in self.runs:
+            summary = functions.get(trace.function_name)
+            if summary is None:
+                summary = {"runs": 0, "total": 0, "retries": 0, "steps": {}}
+                functions[trace.function_name] = summary
+
+            summary["runs"] += 1
+            summary["total"] += trace.total
+            summary["retries"] += trace.retries
+
+            for name, duration, status in trace.steps:
+                step = summary["steps"].get(name)
+                if step is None:
+                    step = {"count": 0, "total": 0, "max": 0, "failures": 0}
+                    summary["steps"][name] = step
+                step["count"] += 1
+                step["total"] += duration
+                step["max"] = max(step["max"], duration)
+                if status != Status.SUCCESS:
+                    step["failures"] += 1
+
+        if function_name is not None:
+            return functions.get(function_name)
+        return functions
+
+    def report(self):
+        """Prints the summary, the slowest steps of each function first"""
+        for function_name, summary in self.summary().items():
+            debug.info(
+                f"{function_name}: {summary['runs']} runs, {summary['total']} ms, "
+                f"{summary['retries']} retries"
+            )
+            steps = sorted(summary["steps"].items(), key=lambda item: -item[1]["total"])
+            for name, step in steps:
+                debug.info(
+                    f"  {name:<25} : {step['total']} ms in {step['count']} calls, "
+                    f"max {step['max']} ms, {step['failures']} failures"
+                )
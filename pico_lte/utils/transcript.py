@@ -0,0 +1,231 @@
+"""
+Module for recording the bytes exchanged with the modem into a compact binary log,
+and replaying such a log in place of UART.
+
+A transcript starts with the MAGIC header, followed by records of
+RECORD_HEADER (direction, milliseconds since the start, length) and the bytes.
+"""
+
+import struct
+
+from pico_lte.common import debug
+from pico_lte.utils.helpers import ticks_ms, ticks_diff
+
+MAGIC = b"PLTR\x01"
+RECORD_HEADER = "<BIH"
+RECORD_HEADER_SIZE = struct.calcsize(RECORD_HEADER)
+WRITTEN = 0x57  # "W", bytes written to the modem
+READ = 0x52  # "R", bytes read from the modem
+
+
+def parse_transcript(data):
+    """
+    Function for parsing a transcript.
+
+    Parameters
+    ----------
+    data: bytes
+        Content of a transcript file
+
+    Returns
+    -------
+    list
+        List of (direction, timestamp in ms, bytes) records
+    """
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError("Not a transcript, or an unsupported version.")
+
+    records = []
+    position = len(MAGIC)
+    while position + RECORD_HEADER_SIZE <= len(data):
+        direction, timestamp, length = struct.unpack_from(RECORD_HEADER, data, position)
+        position += RECORD_HEADER_SIZE
+        records.append((direction, timestamp, bytes(data[position : position + length])))
+        position += length
+    return records
+
+
+class TranscriptRecorder:
+    """Class for writing the exchanged bytes into a transcript file"""
+
+    def __init__(self, file_path, buffer_size=512):
+        """
+        Creates the transcript file.
+
+        Parameters
+        ----------
+        file_path: str
+            Path of the transcript file
+        buffer_size: int, default: 512
+            Records are kept in memory until they exceed this size, so flash is
+            written in blocks instead of once for every record.
+        """
+        self.file = open(file_path, "wb")
+        self.buffer = bytearray(MAGIC)
+        self.buffer_size = buffer_size
+        self.started = ticks_ms()
+
+    def record(self, direction, data):
+        """Adds a record of the bytes written to or read from the modem."""
+        timestamp = ticks_diff(ticks_ms(), self.started)
+        for start in range(0, len(data), 0xFFFF):  # length field is 16-bit
+            chunk = data[start : start + 0xFFFF]
+            self.buffer += struct.pack(RECORD_HEADER, direction, timestamp, len(chunk))
+            self.buffer += chunk
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered records to the file."""
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.buffer = bytearray()
+
+    def close(self):
+        """Writes the buffered records and closes the file."""
+        self.flush()
+        self.file.close()
+
+
+class RecordingUART:
+    """Class for wrapping a UART to record the bytes passing through it"""
+
+    def __init__(self, uart, recorder):
+        self.uart = uart
+        self.recorder = recorder
+
+    def init(self, *args, **kwargs):
+        """Changes the UART configuration."""
+        return self.uart.init(*args, **kwargs)
+
+    def any(self):
+        """Returns the number of bytes waiting in UART."""
+        return self.uart.any()
+
+    def readinto(self, buf, nbytes=None):
+        """Reads bytes into the buffer and records them."""
+        count = self.uart.readinto(buf) if nbytes is None else self.uart.readinto(buf, nbytes)
+        if count:
+            self.recorder.record(READ, bytes(buf[:count]))
+        return count
+
+    def read(self, nbytes=None):
+        """Reads bytes and records them."""
+        data = self.uart.read() if nbytes is None else self.uart.read(nbytes)
+        if data:
+            self.recorder.record(READ, data)
+        return data
+
+    def write(self, data):
+        """Writes the bytes and records them."""
+        self.recorder.record(WRITTEN, data)
+        return self.uart.write(data)
+
+
+class TranscriptPlayer:
+    """
+    Class for replaying a transcript in place of UART. The recorded reads are
+    released after the recorded writes which precede them are written, so the
+    replay is deterministic whatever the speed is. Every recorded read is given
+    as a separate burst, as it was received while recording.
+    """
+
+    def __init__(self, transcript, speed=None):
+        """
+        Parameters
+        ----------
+        transcript: str or bytes
+            Path of a transcript file, or its content
+        speed: float, default: None
+            1.0 replays the reads with the original timing, 2.0 twice as fast etc.
+            If None, the reads are released as soon as they are polled.
+        """
+        if isinstance(transcript, str):
+            with open(transcript, "rb") as file:
+                transcript = file.read()
+
+        self.records = parse_transcript(transcript)
+        self.speed = speed
+        self.index = 0
+        self.pending = bytearray()  # bytes released and waiting to be read
+        self.drained = False  # True if pending is emptied since the last release
+        self.anchor = (ticks_ms(), 0)  # real and recorded time of the last write
+        self.mismatches = []  # (expected, written) items of the unexpected writes
+
+    @property
+    def finished(self):
+        """True if all the records are replayed."""
+        return self.index >= len(self.records) and not self.pending
+
+    def _release(self):
+        """Moves the next recorded read to pending if it is due."""
+        if self.drained:  # the next read is given to the next poll, not to this one
+            self.drained = False
+            return
+        if self.pending or self.index >= len(self.records):
+            return
+
+        direction, timestamp, data = self.records[self.index]
+        if direction != READ:
+            return
+        if self.speed:
+            due = (timestamp - self.anchor[1]) / self.speed
+            if ticks_diff(ticks_ms(), self.anchor[0]) < due:
+                return
+        self.pending += data
+        self.index += 1
+
+    def init(self, *args, **kwargs):
+        """Changing the baudrate has no effect on the replay."""
+
+    def any(self):
+        """Returns the number of bytes which are ready to be read."""
+        self._release()
+        return len(self.pending)
+
+    def readinto(self, buf, nbytes=None):
+        """Moves the bytes which are ready into the buffer."""
+        if not self.pending:
+            self._release()
+        size = min(len(buf), len(self.pending))
+        if nbytes is not None:
+            size = min(size, nbytes)
+        if not size:
+            return None
+        buf[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        self.drained = not self.pending
+        return size
+
+    def read(self, nbytes=None):
+        """Returns the bytes which are ready, or None if there is no byte."""
+        if not self.pending:
+            self._release()
+        size = len(self.pending) if nbytes is None else min(nbytes, len(self.pending))
+        if not size:
+            return None
+        data = bytes(self.pending[:size])
+        self.pending = self.pending[size:]
+        self.drained = not self.pending
+        return data
+
+    def write(self, data):
+        """Checks the written bytes against the next recorded write."""
+        # The host has moved on, so the reads recorded before the write are due.
+        while self.index < len(self.records) and self.records[self.index][0] == READ:
+            self.pending += self.records[self.index][2]
+            self.index += 1
+        self.drained = False
+
+        if self.index < len(self.records):
+            _, timestamp, expected = self.records[self.index]
+            self.index += 1
+            self.anchor = (ticks_ms(), timestamp)
+        else:
+            expected = b""
+
+        if bytes(data) != expected:
+            debug.warning("Transcript mismatch:", expected, bytes(data))
+            self.mismatches.append((expected, bytes(data)))
+        return len(data)
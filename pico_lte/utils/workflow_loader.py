@@ -0,0 +1,226 @@
+"""
+Module for loading workflows from declarative definitions, e.g. JSON files or dicts
+frozen into the firmware, instead of building their steps in code.
+"""
+
+from pico_lte.utils.helpers import read_json_file
+from pico_lte.utils.manager import (
+    DecorrelatedJitterBackoff,
+    ExponentialBackoff,
+    FixedBackoff,
+    Param,
+    Step,
+    Workflow,
+)
+
+WORKFLOW_KEYS = ("name", "deadline", "steps")
+STEP_KEYS = (
+    "name",
+    "call",
+    "success",
+    "fail",
+    "params",
+    "interval",
+    "retry",
+    "cachable",
+    "final",
+    "backoff",
+)
+DEFAULT_STEPS = ("organizer", "success", "failure")
+# Backoff policies by their types: (class, parameters)
+BACKOFFS = {
+    "fixed": (FixedBackoff, ("interval",)),
+    "exponential": (ExponentialBackoff, ("base", "factor", "cap")),
+    "jitter": (DecorrelatedJitterBackoff, ("base", "cap")),
+}
+
+
+def _check_step(definition, index, targets):
+    """Raises ValueError if the step definition is invalid"""
+    if not isinstance(definition, dict):
+        raise ValueError(f"Step {index} is not an object")
+
+    for key in definition:
+        if key not in STEP_KEYS:
+            raise ValueError(f"Step {index} has unknown key: {key}")
+
+    name = definition.get("name")
+    call = definition.get("call")
+    if not isinstance(name, str) or not isinstance(call, str):
+        raise ValueError(f"Step {index} needs the name and call strings")
+
+    target, _, method = call.partition(".")
+    if target not in targets or not callable(getattr(targets[target], method, None)):
+        raise ValueError(f"Step {name} calls unknown function: {call}")
+
+    params = definition.get("params")
+    if params is not None and not isinstance(params, dict):
+        raise ValueError(f"Step {name} has params which aren't an object")
+
+
+def _compile_backoff(definition, name):
+    """Returns the backoff policy of the definition, e.g. {"type": "jitter", "base": 1}"""
+    if definition is None:
+        return None
+    if not isinstance(definition, dict) or definition.get("type") not in BACKOFFS:
+        raise ValueError(f"Step {name} has backoff without a known type: {definition}")
+
+    policy, parameters = BACKOFFS[definition["type"]]
+    kwargs = {}
+    for key, value in definition.items():
+        if key == "type":
+            continue
+        if key not in parameters or not isinstance(value, (int, float)):
+            raise ValueError(f"Step {name} has invalid backoff parameter: {key}")
+        kwargs[key] = value
+
+    try:
+        return policy(**kwargs)
+    except TypeError:
+        raise ValueError(f"Step {name} has backoff without {parameters[0]}")
+
+
+def _compile_params(params):
+    """Replaces the "$name" values with Param placeholders"""
+    if not params:
+        return None
+
+    compiled = {}
+    for key, value in params.items():
+        if isinstance(value, str) and value.startswith("$"):
+            value = Param(value[1:])
+        compiled[key] = value
+    return compiled
+
+
+def _transitions(definitions):
+    """
+    Returns the (success, fail) step names of each step. Success is the next step
+    by default, or the success step for the last one, and fail is the failure step.
+    """
+    transitions = []
+    for index, definition in enumerate(definitions):
+        if index + 1 < len(definitions):
+            success = definitions[index + 1]["name"]
+        else:
+            success = "success"
+        transitions.append(
+            (definition.get("success", success), definition.get("fail", "failure"))
+        )
+    return transitions
+
+
+def load_workflow(definition, targets):
+    """
+    Function for compiling a workflow definition into a Workflow. The definition is
+    validated here, and the steps are built on the first run of the workflow.
+
+    Example definition:
+        {
+            "name": "telegram.send_message",
+            "steps": [
+                {"name": "register_network", "call": "network.register_network"},
+                {"name": "set_server_url", "call": "http.set_server_url",
+                 "params": {"url": "$url"}, "interval": 2},
+                {"name": "read_response", "call": "http.read_response", "retry": 5,
+                 "backoff": {"type": "exponential", "base": 1, "cap": 8}},
+            ],
+        }
+
+    Parameters
+    ----------
+    definition : dict
+        Definition which has the "steps" list, and optional "name" (function name
+        for caching the state) and "deadline" (seconds for each run) keys. Each step
+        has the "name" and "call" ("target.method") keys, and optional "success"
+        (next step by default), "fail" ("failure" by default), "params", "interval",
+        "retry", "cachable", "final" and "backoff" keys. Param values like "$url"
+        are bound by the params of each run. "backoff" has the "type" of the policy
+        and its parameters: "fixed" (interval), "exponential" (base, factor, cap)
+        or "jitter" (base, cap), see the backoff classes of utils.manager.
+    targets : dict
+        Objects which have the called methods, by their names in "call"
+
+    Returns
+    -------
+    Workflow
+        Workflow which runs the steps of the definition
+
+    Raises
+    ------
+    ValueError
+        If the definition is invalid
+    """
+    definitions = definition.get("steps") if isinstance(definition, dict) else None
+    if not definitions or not isinstance(definitions, list):
+        raise ValueError("Workflow definition needs a list of steps")
+
+    for key in definition:
+        if key not in WORKFLOW_KEYS:
+            raise ValueError(f"Workflow definition has unknown key: {key}")
+    deadline = definition.get("deadline")
+    if deadline is not None and not isinstance(deadline, (int, float)):
+        raise ValueError("Workflow deadline isn't a number of seconds")
+
+    names = set(DEFAULT_STEPS)
+    for index, step in enumerate(definitions):
+        _check_step(step, index, targets)
+        if step["name"] in names:
+            raise ValueError(f"Step name is used more than once: {step['name']}")
+        names.add(step["name"])
+
+    transitions = _transitions(definitions)
+    backoffs = [_compile_backoff(step.get("backoff"), step["name"]) for step in definitions]
+    for step, (success, fail) in zip(definitions, transitions):
+        for target in (success, fail):
+            if target not in names:
+                raise ValueError(f"Step {step['name']} goes to unknown step: {target}")
+
+    def build():
+        steps = []
+        for step, (success, fail), backoff in zip(definitions, transitions, backoffs):
+            target, _, method = step["call"].partition(".")
+            steps.append(
+                Step(
+                    name=step["name"],
+                    function=getattr(targets[target], method),
+                    success=success,
+                    fail=fail,
+                    function_params=_compile_params(step.get("params")),
+                    interval=step.get("interval", 0),
+                    retry=step.get("retry", 0),
+                    final_step=step.get("final", False),
+                    cachable=step.get("cachable", False),
+                    backoff=backoff,
+                )
+            )
+        return steps
+
+    return Workflow(build, definition.get("name"), deadline)
+
+
+def read_workflow(file_path, targets):
+    """
+    Function for loading a workflow from a JSON file, see load_workflow().
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the JSON file which has the definition
+    targets : dict
+        Objects which have the called methods, by their names in "call"
+
+    Returns
+    -------
+    Workflow
+        Workflow which runs the steps of the definition
+
+    Raises
+    ------
+    ValueError
+        If the file can't be read or the definition is invalid
+    """
+    definition = read_json_file(file_path)
+    if definition is None:
+        raise ValueError(f"Workflow definition can't be read: {file_path}")
+    return load_workflow(definition, targets)
@@ -1,5 +1,6 @@
 import os
 import errno
+import importlib
 import pytest
 
 
@@ -23,11 +24,34 @@ def remove_file(file_path):
             raise error
 
 
+@pytest.fixture
+def clock(request, mocker):
+    """
+    This fixture replaces ticks_ms() and sleep_ms() of the modules given by indirect
+    parametrization with a clock which is set by the test, and sleeps instantly.
+    """
+    modules = (request.param,) if isinstance(request.param, str) else request.param
+    clock = {"now": 0, "sleeps": []}
+
+    def sleep_ms(milliseconds):
+        clock["sleeps"].append(milliseconds)
+        clock["now"] += milliseconds
+
+    for module in modules:
+        mocker.patch(f"{module}.ticks_ms", side_effect=lambda: clock["now"])
+        if hasattr(importlib.import_module(module), "sleep_ms"):
+            mocker.patch(f"{module}.sleep_ms", side_effect=sleep_ms)
+    return clock
+
+
 MOCK_MACHINE_PY = """
 class UART:
     def __init__(self, *args, **kwargs):
         pass
 
+    def init(self, *args, **kwargs):
+        pass
+
     def write(self):
         pass
 
@@ -37,6 +61,9 @@ class UART:
     def read(self):
         pass
 
+    def readinto(self, buf, nbytes=None):
+        pass
+
 
 class Pin:
 
@@ -0,0 +1,482 @@
+"""
+Virtual Quectel BG95 modem for running the SDK on a host computer. An instance
+can be used in place of machine.UART, e.g. `atcom.modem_com = BG95Simulator()`.
+"""
+
+import random
+import time
+
+CTRL_Z = b"\x1a"
+
+
+def split_outside_quotes(text, separator):
+    """Splits the text by the separator which isn't inside double quotes."""
+    parts = []
+    start = 0
+    quoted = False
+    for index, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif char == separator and not quoted:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parse_command(command):
+    """
+    Splits an AT command into its verb, kind and arguments, e.g.
+    'AT+QMTOPEN=0,"host",8883' -> ("AT+QMTOPEN", "=", ["0", "host", "8883"]).
+    """
+    for kind in "=?":
+        index = command.find(kind)
+        if index != -1:
+            verb = command[:index]
+            rest = command[index + 1 :]
+            args = [arg.strip('"') for arg in split_outside_quotes(rest, ",")] if rest else []
+            return verb.upper(), kind, args
+    return command.upper(), "", []
+
+
+class BG95Simulator:
+    """
+    Scriptable virtual BG95 modem which implements the AT command subset used by
+    the SDK. It has the any(), readinto(), read(), write() and init() methods of UART.
+
+    Handlers return a list of information lines for an "OK" result, a string for an
+    error result (e.g. "+CME ERROR: 703"), or None if they answer by themselves,
+    e.g. with a "> " prompt followed by data mode.
+    """
+
+    GPS_LOCATION = "+QGPSLOC: 061951.000,41.02146,28.97811,0.7,62.2,2,0.00,0.0,0.0,110513,09"
+
+    def __init__(
+        self,
+        latency=0.0,
+        urc_latency=0.01,
+        chunk_size=None,
+        chunk_interval=0.0,
+        error_rate=0.0,
+        echo=True,
+        seed=0,
+    ):
+        """
+        Parameters
+        ----------
+        latency : float, default: 0.0
+            Seconds between receiving a command and starting its response.
+        urc_latency : float, default: 0.01
+            Seconds between a response and the URC which follows it.
+        chunk_size : int, default: None
+            If given, the output is fragmented into chunks of this many bytes.
+        chunk_interval : float, default: 0.0
+            Seconds between the chunks of the output.
+        error_rate : float, default: 0.0
+            Probability of a command line being answered with "ERROR".
+        echo : bool, default: True
+            Initial echo mode, which is changed with ATE0/ATE1.
+        seed : int, default: 0
+            Seed of the random generator used for errors.
+        """
+        self.latency = latency
+        self.urc_latency = urc_latency
+        self.chunk_size = chunk_size
+        self.chunk_interval = chunk_interval
+        self.error_rate = error_rate
+        self.echo = echo
+        self.random = random.Random(seed)
+
+        self.output = []  # [ready time, bytes] items waiting to be read by the host
+        self.input = bytearray()
+        self.data_mode = None  # [handler, expected length or None for CTRL+Z, bytes]
+        self.commands = []  # command lines received
+
+        # Modem state
+        self.sim_ready = True
+        self.registration = 1  # +CREG <stat>
+        self.apn = "super"
+        self.active_contexts = set()
+        self.mqtt_opened = {}
+        self.mqtt_connected = set()
+        self.published = []  # (topic, payload) items
+        self.http_url = None
+        self.http_requests = []  # (method, url, data) items
+        self.http_status = 200
+        self.http_body = "Hello from the simulator"
+        self.files = {}
+        self.gps_fix = True
+
+        self.handlers = {
+            "AT": self._ok,
+            "ATE0": self._echo_off,
+            "ATE1": self._echo_on,
+            "AT+IPR": self._ok,
+            "AT+CMEE": self._ok,
+            "AT+CPIN": self._cpin,
+            "AT+QCCID": lambda kind, args: ["+QCCID: 8990011916180280000"],
+            "AT+CSQ": lambda kind, args: ["+CSQ: 20,99"],
+            "AT+COPS": lambda kind, args: ['+COPS: 0,0,"Simulator",8'],
+            "AT+CREG": lambda kind, args: [f"+CREG: 0,{self.registration}"],
+            "AT+CGDCONT": self._cgdcont,
+            "AT+QICSGP": self._ok,
+            "AT+CGACT": self._cgact,
+            "AT+QIACT": self._qiact,
+            "AT+QIDEACT": self._qideact,
+            "AT+QCFG": self._ok,
+            "AT+QSSLCFG": self._ok,
+            "AT+QMTCFG": self._ok,
+            "AT+QMTOPEN": self._qmtopen,
+            "AT+QMTCLOSE": self._qmtclose,
+            "AT+QMTCONN": self._qmtconn,
+            "AT+QMTDISC": self._qmtdisc,
+            "AT+QMTSUB": self._qmtsub,
+            "AT+QMTPUB": self._qmtpub,
+            "AT+QMTRECV": self._qmtrecv,
+            "AT+QHTTPCFG": self._ok,
+            "AT+QHTTPURL": self._qhttpurl,
+            "AT+QHTTPGET": self._qhttpget,
+            "AT+QHTTPPOST": self._qhttppost,
+            "AT+QHTTPREAD": self._qhttpread,
+            "AT+QFUPL": self._qfupl,
+            "AT+QFDEL": self._qfdel,
+            "AT+QFLST": self._qflst,
+            "AT+QGPS": self._ok,
+            "AT+QGPSEND": self._ok,
+            "AT+QGPSCFG": self._qgpscfg,
+            "AT+QGPSLOC": self._qgpsloc,
+        }
+
+    ####################
+    ### UART methods ###
+    ####################
+    def init(self, *args, **kwargs):
+        """Changing the baudrate has no effect on the simulator."""
+
+    def write(self, data):
+        """Receives bytes from the host."""
+        self.input += data
+        self._process_input()
+        return len(data)
+
+    def any(self):
+        """Returns the number of bytes which are ready to be read."""
+        now = time.monotonic()
+        count = 0
+        for ready, chunk in self.output:
+            if ready > now:
+                break
+            count += len(chunk)
+        return count
+
+    def readinto(self, buf, nbytes=None):
+        """Moves the bytes which are ready into the buffer."""
+        size = len(buf) if nbytes is None else min(nbytes, len(buf))
+        data = self.read(size)
+        if not data:
+            return None
+        buf[: len(data)] = data
+        return len(data)
+
+    def read(self, nbytes=None):
+        """Returns the bytes which are ready, or None if there is no byte."""
+        now = time.monotonic()
+        data = bytearray()
+        while self.output and self.output[0][0] <= now:
+            if nbytes is not None and len(data) >= nbytes:
+                break
+            chunk = self.output[0][1]
+            take = len(chunk) if nbytes is None else min(len(chunk), nbytes - len(data))
+            data += chunk[:take]
+            if take == len(chunk):
+                self.output.pop(0)
+            else:
+                self.output[0][1] = chunk[take:]
+        return bytes(data) if data else None
+
+    #########################
+    ### Scripting methods ###
+    #########################
+    def script(self, verb, handler):
+        """Sets the handler of a verb, e.g. script("AT+CSQ", lambda kind, args: ["+CSQ: 5,99"])."""
+        self.handlers[verb.upper()] = handler
+
+    def inject(self, line, delay=0.0):
+        """Sends an unsolicited result code after the given delay in seconds."""
+        self._send(f"\r\n{line}\r\n", delay)
+
+    def deliver_mqtt_message(self, topic, payload, cid=0, message_id=1, delay=0.0):
+        """Sends a +QMTRECV URC as if a message is received from the broker."""
+        self.inject(f'+QMTRECV: {cid},{message_id},"{topic}","{payload}"', delay)
+
+    def drop_mqtt_connection(self, cid=0, err_code=1, delay=0.0):
+        """Closes the MQTT connection and sends a +QMTSTAT URC as if the broker dropped it."""
+        self.mqtt_opened.pop(cid, None)
+        self.mqtt_connected.discard(cid)
+        self.inject(f"+QMTSTAT: {cid},{err_code}", delay)
+
+    ######################
+    ### Input handling ###
+    ######################
+    def _send(self, text, delay=0.0):
+        """Queues the text to be read by the host, fragmented into chunks if configured."""
+        data = text.encode() if isinstance(text, str) else bytes(text)
+        ready = time.monotonic()
+        if self.output:  # the delay follows the output which is still queued
+            ready = max(ready, self.output[-1][0])
+        ready += delay
+
+        size = self.chunk_size or len(data) or 1
+        for start in range(0, len(data), size):
+            self.output.append([ready, data[start : start + size]])
+            ready += self.chunk_interval
+
+    def _result(self, lines, final="OK", delay=None):
+        """Sends the information lines and the final result code."""
+        text = "".join(f"\r\n{line}\r\n" for line in lines) + f"\r\n{final}\r\n"
+        self._send(text, self.latency if delay is None else delay)
+
+    def _enter_data_mode(self, prompt, handler, length=None):
+        """Sends the prompt and passes the next #length bytes (or until CTRL+Z) to handler."""
+        self._send(prompt, self.latency)
+        self.data_mode = [handler, length, bytearray()]
+
+    def _process_input(self):
+        """Executes the complete command lines and feeds the data-mode bytes."""
+        while self.input:
+            if self.data_mode:
+                if not self._process_data():
+                    return
+                continue
+
+            end = self.input.find(b"\r")
+            if end == -1:
+                return
+            line = bytes(self.input[:end]).decode("utf-8", "ignore")
+            del self.input[: end + 1]
+
+            line = line.strip("\n" + CTRL_Z.decode())
+            if not line:  # e.g. the line end after CTRL+Z of data mode
+                continue
+            if self.echo:
+                self._send(f"{line}\r")
+            self._execute_line(line)
+
+    def _process_data(self):
+        """Collects data-mode bytes. Returns True if data mode is completed."""
+        handler, length, collected = self.data_mode
+        if length is None:
+            end = self.input.find(CTRL_Z)
+            if end == -1:
+                collected += self.input
+                self.input.clear()
+                return False
+            collected += self.input[:end]
+            del self.input[: end + 1]
+        else:
+            take = length - len(collected)
+            collected += self.input[:take]
+            del self.input[:take]
+            if len(collected) < length:
+                return False
+
+        self.data_mode = None
+        handler(bytes(collected))
+        return True
+
+    def _execute_line(self, line):
+        """Executes a command line, which may include several commands chained with ';'."""
+        self.commands.append(line)
+        if not line.upper().startswith("AT"):
+            self._result([], "ERROR")
+            return
+        if self.error_rate and self.random.random() < self.error_rate:
+            self._result([], "ERROR")
+            return
+
+        bodies = split_outside_quotes(line[2:], ";")
+        lines = []
+        for body in bodies:
+            verb, kind, args = parse_command("AT" + body)
+            handler = self.handlers.get(verb)
+            result = handler(kind, args) if handler else "ERROR"
+
+            if result is None:  # the handler answers by itself
+                if len(bodies) > 1:
+                    raise ValueError(f"{verb} can't be chained in the simulator")
+                return
+            if isinstance(result, str):  # error result code
+                self._result(lines, result)
+                return
+            lines += result
+        self._result(lines)
+
+    ################
+    ### Handlers ###
+    ################
+    def _ok(self, kind, args):
+        return []
+
+    def _echo_off(self, kind, args):
+        self.echo = False
+        return []
+
+    def _echo_on(self, kind, args):
+        self.echo = True
+        return []
+
+    def _cpin(self, kind, args):
+        if kind == "?":
+            return ["+CPIN: READY"] if self.sim_ready else "+CME ERROR: 10"
+        self.sim_ready = True
+        return []
+
+    def _cgdcont(self, kind, args):
+        if kind == "?":
+            return [f'+CGDCONT: 1,"IPV4V6","{self.apn}","0.0.0.0,0.0.0.0",0,0,0']
+        self.apn = args[2]
+        return []
+
+    def _cgact(self, kind, args):
+        return [f"+CGACT: {cid},1" for cid in sorted(self.active_contexts)]
+
+    def _qiact(self, kind, args):
+        if kind == "?":
+            return [f'+QIACT: {cid},1,1,"10.0.0.2"' for cid in sorted(self.active_contexts)]
+        if self.registration not in (1, 5):
+            return "ERROR"
+        self.active_contexts.add(int(args[0]))
+        return []
+
+    def _qideact(self, kind, args):
+        self.active_contexts.discard(int(args[0]))
+        return []
+
+    def _urc_after_ok(self, urc):
+        """Answers OK, and sends the URC after urc_latency."""
+        self._result([])
+        self._send(f"\r\n{urc}\r\n", self.urc_latency)
+
+    def _qmtopen(self, kind, args):
+        if kind == "?":
+            opened = self.mqtt_opened.items()
+            return [f'+QMTOPEN: {cid},"{host}",{port}' for cid, (host, port) in opened]
+        cid = int(args[0])
+        result = 0 if self.active_contexts else 3  # 3: failed to activate PDP context
+        if result == 0:
+            self.mqtt_opened[cid] = (args[1], int(args[2]))
+        self._urc_after_ok(f"+QMTOPEN: {cid},{result}")
+        return None
+
+    def _qmtclose(self, kind, args):
+        cid = int(args[0])
+        self.mqtt_opened.pop(cid, None)
+        self.mqtt_connected.discard(cid)
+        self._urc_after_ok(f"+QMTCLOSE: {cid},0")
+        return None
+
+    def _qmtconn(self, kind, args):
+        if kind == "?":
+            return [f"+QMTCONN: {cid},3" for cid in sorted(self.mqtt_connected)]
+        cid = int(args[0])
+        if cid not in self.mqtt_opened:
+            return "ERROR"
+        self.mqtt_connected.add(cid)
+        self._urc_after_ok(f"+QMTCONN: {cid},0,0")
+        return None
+
+    def _qmtdisc(self, kind, args):
+        cid = int(args[0])
+        self.mqtt_connected.discard(cid)
+        self._urc_after_ok(f"+QMTDISC: {cid},0")
+        return None
+
+    def _qmtsub(self, kind, args):
+        cid, message_id = int(args[0]), int(args[1])
+        if cid not in self.mqtt_connected:
+            return "ERROR"
+        self._urc_after_ok(f"+QMTSUB: {cid},{message_id},0,{args[-1]}")
+        return None
+
+    def _qmtpub(self, kind, args):
+        cid, message_id, topic = int(args[0]), int(args[1]), args[4]
+        if cid not in self.mqtt_connected:
+            return "ERROR"
+
+        def publish(payload):
+            self.published.append((topic, payload.decode()))
+            self._urc_after_ok(f"+QMTPUB: {cid},{message_id},0")
+
+        self._enter_data_mode("\r\n> ", publish)
+        return None
+
+    def _qmtrecv(self, kind, args):
+        return [f"+QMTRECV: {cid},0,0,0,0,0,0" for cid in sorted(self.mqtt_connected)]
+
+    def _qhttpurl(self, kind, args):
+        def set_url(url):
+            self.http_url = url.decode()
+            self._result([])
+
+        self._enter_data_mode("\r\nCONNECT\r\n", set_url, int(args[0]))
+        return None
+
+    def _http_request(self, method, data=None):
+        """Records the request and answers with OK and the result URC."""
+        if self.http_url is None:
+            return "+CME ERROR: 703"
+        self.http_requests.append((method, self.http_url, data))
+        self._urc_after_ok(
+            f"+QHTTP{method}: 0,{self.http_status},{len(self.http_body.encode())}"
+        )
+        return None
+
+    def _qhttpget(self, kind, args):
+        if len(args) > 1:  # request header is sent in data mode
+
+            def get(data):
+                self._http_request("GET", data.decode())
+
+            self._enter_data_mode("\r\nCONNECT\r\n", get, int(args[1]))
+            return None
+        return self._http_request("GET")
+
+    def _qhttppost(self, kind, args):
+        def post(data):
+            self._http_request("POST", data.decode())
+
+        self._enter_data_mode("\r\nCONNECT\r\n", post, int(args[0]))
+        return None
+
+    def _qhttpread(self, kind, args):
+        self._send(f"\r\nCONNECT\r\n{self.http_body}\r\nOK\r\n", self.latency)
+        self._send("\r\n+QHTTPREAD: 0\r\n", self.urc_latency)
+        return None
+
+    def _qfupl(self, kind, args):
+        name = args[0]
+
+        def upload(data):
+            self.files[name] = data
+            self._result([f"+QFUPL: {len(data)},{sum(data) & 0xFFFF:x}"])
+
+        self._enter_data_mode("\r\nCONNECT\r\n", upload, int(args[1]))
+        return None
+
+    def _qfdel(self, kind, args):
+        if args[0] == "*":
+            self.files.clear()
+        elif self.files.pop(args[0], None) is None:
+            return "+CME ERROR: 405"  # file not found
+        return []
+
+    def _qflst(self, kind, args):
+        return [f'+QFLST: "{name}",{len(data)}' for name, data in self.files.items()]
+
+    def _qgpscfg(self, kind, args):
+        if len(args) == 1:
+            return [f'+QGPSCFG: "{args[0]}",0']
+        return []
+
+    def _qgpsloc(self, kind, args):
+        return [self.GPS_LOCATION] if self.gps_fix else "+CME ERROR: 516"
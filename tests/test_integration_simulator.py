@@ -0,0 +1,220 @@
+"""
+Test module for running the SDK modules over the virtual BG95 modem.
+"""
+
+import time
+
+import pytest
+
+from pico_lte.modules.base import Base
+from pico_lte.modules.file import File
+from pico_lte.modules.gps import GPS
+from pico_lte.modules.http import HTTP
+from pico_lte.modules.mqtt import MQTT
+from pico_lte.modules.network import Network
+from pico_lte.modules.ssl import SSL
+from pico_lte.utils.atcom import ATCom
+from pico_lte.utils.status import Status
+from tests.simulator import BG95Simulator, parse_command
+
+
+def create_atcom(simulator):
+    """Returns an ATCom instance which talks to the simulator."""
+    atcom = ATCom()
+    atcom.modem_com = simulator
+    return atcom
+
+
+@pytest.fixture(params=[None, 3], ids=["whole", "fragmented"])
+def simulator(request):
+    """It returns a simulator which sends its output whole or in 3-byte chunks."""
+    return BG95Simulator(latency=0.002, chunk_size=request.param, chunk_interval=0.001)
+
+
+@pytest.mark.parametrize(
+    "command, expected",
+    [
+        ("AT", ("AT", "", [])),
+        ("AT+CREG?", ("AT+CREG", "?", [])),
+        ('AT+QMTOPEN=0,"host,1",8883', ("AT+QMTOPEN", "=", ["0", "host,1", "8883"])),
+    ],
+)
+def test_parse_command(command, expected):
+    """Test the parse_command() function of the simulator."""
+    assert parse_command(command) == expected
+
+
+class TestSimulator:
+    """Test class for the SDK modules running over BG95Simulator."""
+
+    def test_echo_and_basic_commands(self, simulator):
+        """Test the echo mode and the basic commands."""
+        base = Base(create_atcom(simulator))
+
+        assert base.check_communication()["response"][-1] == "OK"
+        assert base.set_echo_off()["status"] == Status.SUCCESS
+        assert base.check_sim_ready() == {
+            "status": Status.SUCCESS,
+            "response": ["+CPIN: READY", "OK"],
+        }
+
+    def test_network_registration_and_pdp(self, simulator):
+        """Test register_network() and get_pdp_ready() workflows."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        network = Network(atcom, Base(atcom))
+
+        assert network.register_network()["status"] == Status.SUCCESS
+        assert network.get_pdp_ready()["status"] == Status.SUCCESS
+        assert simulator.active_contexts == {1}
+
+    def test_mqtt_publish_and_receive(self, simulator):
+        """Test opening an MQTT connection, publishing and receiving a message."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        simulator.active_contexts.add(1)
+        mqtt = MQTT(atcom)
+
+        assert mqtt.open_connection("broker.example.com", 1883)["status"] == Status.SUCCESS
+        assert mqtt.connect_broker("client")["status"] == Status.SUCCESS
+        assert mqtt.is_connected_to_broker()["status"] == Status.SUCCESS
+
+        result = mqtt.publish_message("hello", "sensors/1")
+        assert result["status"] == Status.SUCCESS
+        assert simulator.published == [("sensors/1", "hello")]
+
+        atcom.urc.register("+QMTRECV")
+        simulator.deliver_mqtt_message("commands", "reboot")
+        assert atcom.get_urc_response("+QMTSTAT", timeout=0.1)["status"] == Status.TIMEOUT
+        assert atcom.urc.get("+QMTRECV") == '+QMTRECV: 0,1,"commands","reboot"'
+
+    def test_mqtt_dropped_connection(self, simulator):
+        """Test the connection state isn't answered from a cache after the broker drops it."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        simulator.active_contexts.add(1)
+        mqtt = MQTT(atcom)
+
+        mqtt.open_connection("broker.example.com", 1883)
+        mqtt.connect_broker("client")
+        assert mqtt.has_opened_connection()["status"] == Status.SUCCESS
+        assert mqtt.is_connected_to_broker()["status"] == Status.SUCCESS
+
+        simulator.drop_mqtt_connection()
+
+        # The same queries as has_opened_connection() and is_connected_to_broker().
+        opened = atcom.send_at_comm("AT+QMTOPEN?", "+QMTOPEN: 0", timeout=0.2)
+        connected = atcom.send_at_comm("AT+QMTCONN?", "+QMTCONN: 0,3", timeout=0.2)
+        assert opened["status"] != Status.SUCCESS
+        assert connected["status"] != Status.SUCCESS
+        assert mqtt.open_connection("broker.example.com", 1883)["status"] == Status.SUCCESS
+        assert mqtt.connect_broker("client")["status"] == Status.SUCCESS
+        assert mqtt.publish_message("hello", "sensors/1")["status"] == Status.SUCCESS
+
+    def test_configs_resent_after_reboot(self, simulator):
+        """Test the configurations are sent again if modem restarts between two calls."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        mqtt = MQTT(atcom)
+        sent = []
+        simulator.script("AT+QMTCFG", lambda kind, args: sent.append(args) or [])
+
+        assert mqtt.set_ssl_connection_configs()["status"] == Status.SUCCESS
+        assert mqtt.set_ssl_connection_configs() == {
+            "status": Status.SUCCESS,
+            "response": ["OK"],
+            "results": [Status.SUCCESS, Status.SUCCESS],
+        }
+        assert len(sent) == 2
+
+        simulator.inject("RDY")  # unread until the next call
+        time.sleep(0.05)
+        assert mqtt.set_ssl_connection_configs()["status"] == Status.SUCCESS
+        assert len(sent) == 4
+
+    def test_http_get_and_read(self, simulator):
+        """Test sending an HTTP GET request and reading its response."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        http = HTTP(atcom)
+
+        assert http.set_server_url("https://example.com")["status"] == Status.SUCCESS
+        assert http.get()["status"] == Status.SUCCESS
+        assert atcom.get_urc_response(HTTP.GET_DESIRED)["response"][-1] == "+QHTTPGET: 0,200,24"
+
+        result = http.read_response()
+        assert result["status"] == Status.SUCCESS
+        assert simulator.http_body in result["response"]
+        assert simulator.http_requests == [("GET", "https://example.com", None)]
+
+    def test_http_post_with_server_error(self, simulator):
+        """Test a failing HTTP POST request is reported as an error."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        simulator.http_status = 404
+        http = HTTP(atcom)
+
+        http.set_server_url("https://example.com")
+        result = http.post('{"temperature": 21}')
+
+        assert result["status"] == Status.ERROR
+        assert simulator.http_requests == [("POST", "https://example.com", '{"temperature": 21}')]
+
+    def test_file_upload(self, simulator):
+        """Test uploading a file to the modem."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        file = File(atcom)
+
+        result = file.upload_file_to_modem("/security/cacert.pem", "-----CERT-----")
+
+        assert result["status"] == Status.SUCCESS
+        assert simulator.files == {"/security/cacert.pem": b"-----CERT-----"}
+
+    def test_file_upload_streamed(self, simulator):
+        """Test uploading a large file from a generator without building it in memory."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        block = b"0123456789abcdef" * 64
+
+        def content():
+            for _ in range(200):
+                yield block
+
+        file = File(atcom)
+        result = file.upload_file_to_modem("/data/log.bin", content(), length=len(block) * 200)
+
+        assert result["status"] == Status.SUCCESS
+        assert simulator.files["/data/log.bin"] == block * 200
+
+    def test_chained_ssl_configuration(self, simulator):
+        """Test the chained SSL configuration is answered in one round trip."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+
+        result = SSL(atcom).configure_for_x509_certification()
+
+        assert result["status"] == Status.SUCCESS
+        assert len(simulator.commands) == 1
+
+    def test_gps_location(self, simulator):
+        """Test getting the GPS location with and without a fix."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        gps = GPS(atcom)
+
+        assert gps.get_location()["value"] == ["41.02146", "28.97811"]
+
+        simulator.gps_fix = False
+        assert gps.get_location()["status"] == Status.ERROR
+
+    def test_scripted_handler_and_errors(self, simulator):
+        """Test overriding a handler and injecting errors."""
+        atcom = create_atcom(simulator)
+        simulator.echo = False
+        simulator.script("AT+CSQ", lambda kind, args: ["+CSQ: 5,99"])
+
+        assert atcom.send_at_comm("AT+CSQ")["response"] == ["+CSQ: 5,99", "OK"]
+
+        simulator.error_rate = 1.0
+        assert atcom.send_at_comm("AT")["response"] == ["ERROR"]
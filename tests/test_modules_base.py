@@ -8,6 +8,7 @@ from machine import Pin
 from pico_lte.modules.base import Base
 from pico_lte.utils.atcom import ATCom
 from pico_lte.utils.status import Status
+from pico_lte.utils.helpers import read_json_file, write_json_file
 
 
 class TestBase:
@@ -30,22 +31,28 @@ class TestBase:
         mocker.patch("time.sleep")
         mocking = mocker.patch("machine.Pin.value")
 
+        reset = mocker.patch.object(base.atcom, "reset_caches")
+
         base.power_on()
 
         assert mocking.call_count == 2
         mocking.assert_any_call(1)
         mocking.assert_any_call(0)
+        reset.assert_called_once_with()
 
     def test_power_off(self, mocker, base):
         """This method tests power_off() method."""
         mocker.patch("time.sleep")
         mocking = mocker.patch("machine.Pin.value")
 
+        reset = mocker.patch.object(base.atcom, "reset_caches")
+
         base.power_off()
 
         assert mocking.call_count == 2
         mocking.assert_any_call(1)
         mocking.assert_any_call(0)
+        reset.assert_called_once_with()
 
     @pytest.mark.parametrize("status_pin_value", [0, 1])
     def test_power_status_response(self, mocker, base, status_pin_value):
@@ -198,6 +205,23 @@ class TestBase:
         assert result["response"] == mocked_result["response"]
         assert result["value"] in ["12345678910111213140", None]
 
+    @pytest.mark.parametrize(
+        "mocked_result, expected_value",
+        [
+            ({"status": Status.SUCCESS, "response": ["866123456789012", "OK"]}, "866123456789012"),
+            ({"status": Status.TIMEOUT, "response": "timeout"}, None),
+        ],
+    )
+    def test_get_imei(self, mocker, base, mocked_result, expected_value):
+        """This method tests the get_imei() method with mocked ATCom."""
+        mocking = mocker.patch("pico_lte.utils.atcom.ATCom.send_at_comm", return_value=mocked_result)
+
+        result = base.get_imei()
+
+        mocking.assert_called_once_with("AT+GSN")
+        assert result["status"] == mocked_result["status"]
+        assert result["value"] == expected_value
+
     @pytest.mark.parametrize("scan_mode", [0, 1, 3])
     def test_config_network_scan_mode(self, mocker, base, scan_mode):
         """This method tests the config_network_scan_mode() method with mocked ATCom."""
@@ -230,3 +254,84 @@ class TestBase:
 
         mocking.assert_called_once_with(f'AT+QCFG="iotopmode",{iotopmode}')
         assert result == mocked_result
+
+    def test_set_baudrate_success(self, mocker, base):
+        """This method tests the set_baudrate() method when the modem answers."""
+        ok = {"status": Status.SUCCESS, "response": ["OK"]}
+        mocking = mocker.patch("pico_lte.utils.atcom.ATCom.send_at_comm", return_value=ok)
+        uart_init = mocker.patch.object(base.atcom.modem_com, "init")
+
+        result = base.set_baudrate(921600)
+
+        assert result == ok
+        mocking.assert_any_call("AT+IPR=921600")
+        mocking.assert_called_with("AT", timeout=1)
+        uart_init.assert_called_once_with(baudrate=921600, rxbuf=1843)
+        assert base.atcom.baudrate == 921600
+
+    @pytest.mark.parametrize(
+        "pins, command", [(("cts", "rts"), "AT+IFC=2,2"), ((None, None), "AT+IFC=0,0")]
+    )
+    def test_set_flow_control(self, mocker, base, pins, command):
+        """This method tests the set_flow_control() method switches both sides."""
+        ok = {"status": Status.SUCCESS, "response": ["OK"]}
+        mocking = mocker.patch("pico_lte.utils.atcom.ATCom.send_at_comm", return_value=ok)
+        uart = mocker.patch("pico_lte.utils.atcom.ATCom.set_flow_control")
+
+        assert base.set_flow_control(*pins) == ok
+        mocking.assert_called_once_with(command)
+        uart.assert_called_once_with(*pins)
+
+    def test_set_baudrate_reverts_on_failure(self, mocker, base):
+        """This method tests the set_baudrate() method reverts when AT isn't answered."""
+        ok = {"status": Status.SUCCESS, "response": ["OK"]}
+        timeout = {"status": Status.TIMEOUT, "response": "timeout"}
+        mocking = mocker.patch(
+            "pico_lte.utils.atcom.ATCom.send_at_comm",
+            side_effect=[ok, timeout, timeout, timeout, timeout, ok],
+        )
+        mocker.patch.object(base.atcom.modem_com, "init")
+
+        result = base.set_baudrate(921600)
+
+        assert result == {"status": Status.ERROR, "response": "timeout"}
+        mocking.assert_any_call("AT+IPR=115200", timeout=1)
+        assert base.atcom.baudrate == 115200
+
+    def test_negotiate_baudrate(self, mocker, base, tmp_path):
+        """This method tests negotiate_baudrate() saves the first working baudrate."""
+        file_path = f"{tmp_path}/baudrate.json"
+        error = {"status": Status.ERROR, "response": "timeout"}
+        ok = {"status": Status.SUCCESS, "response": ["OK"]}
+        mocking = mocker.patch("pico_lte.modules.base.Base.set_baudrate", side_effect=[error, ok])
+
+        result = base.negotiate_baudrate(file_path=file_path)
+
+        assert result == ok
+        assert mocking.call_args_list == [mocker.call(921600), mocker.call(460800)]
+        assert read_json_file(file_path) == {"baudrate": 460800}
+
+    def test_restore_baudrate_without_saved_baudrate(self, mocker, base, tmp_path):
+        """This method tests restore_baudrate() doesn't touch UART without a saved file."""
+        mocking = mocker.patch("pico_lte.utils.atcom.ATCom.send_at_comm")
+
+        result = base.restore_baudrate(file_path=f"{tmp_path}/baudrate.json")
+
+        assert result["status"] == Status.SUCCESS
+        mocking.assert_not_called()
+
+    def test_restore_baudrate_after_modem_power_cycle(self, mocker, base, tmp_path):
+        """This method tests restore_baudrate() switches the modem back from its default."""
+        file_path = f"{tmp_path}/baudrate.json"
+        write_json_file(file_path, {"baudrate": 921600})
+        ok = {"status": Status.SUCCESS, "response": ["OK"]}
+        timeout = {"status": Status.TIMEOUT, "response": "timeout"}
+        mocker.patch("pico_lte.utils.atcom.ATCom.send_at_comm", side_effect=[timeout, ok])
+        mocking = mocker.patch("pico_lte.modules.base.Base.set_baudrate", return_value=ok)
+        uart_init = mocker.patch.object(base.atcom.modem_com, "init")
+
+        result = base.restore_baudrate(file_path=file_path)
+
+        assert result == ok
+        mocking.assert_called_once_with(921600)
+        assert uart_init.call_args_list[-1] == mocker.call(baudrate=115200, rxbuf=256)
@@ -401,6 +401,43 @@ class TestHTTP:
             timeout=params[2],
         )
 
+    def test_get_default_matchers(self, mocker, http):
+        """This method tests get() uses the prebuilt matchers if no desired and
+        fault responses are given.
+        """
+        response_sequence = [
+            {"status": Status.SUCCESS, "response": ["OK"]},
+            {"status": Status.SUCCESS, "response": ["CONNECT"]},
+            {"status": Status.SUCCESS, "response": ["OK", "+QHTTPGET: 0,200,0"]},
+        ]
+        mocking = TestHTTP.mock_send_at_comm(mocker, response_sequence, True)
+        http.get(data="header", header_mode=1)
+
+        mocking.assert_any_call(
+            "header",
+            desired=HTTP.GET_DESIRED,
+            fault=HTTP.GET_FAULT,
+            urc=True,
+            line_end=False,
+            timeout=60,
+        )
+
+    @pytest.mark.parametrize(
+        "line, is_desired, is_fault",
+        [
+            ("+QHTTPPOST: 0,200,12", True, False),
+            ("+QHTTPPOST: 0,226", True, False),
+            ("+QHTTPPOST: 0,404,0", False, True),
+            ("+QHTTPPOST: 0,2000,0", False, False),
+            ("+CME ERROR: 703", False, True),
+            ("+QHTTPGET: 0,200,12", False, False),
+        ],
+    )
+    def test_post_default_matchers(self, line, is_desired, is_fault):
+        """This method tests the prebuilt matchers of post()."""
+        assert HTTP.POST_DESIRED.match(line) == is_desired
+        assert HTTP.POST_FAULT.match(line) == is_fault
+
     def test_post_default_parameters(self, mocker, http):
         """This method tests post() with a mocked response from
         send_at_comm().
@@ -654,9 +691,7 @@ class TestHTTP:
         mocking.assert_called_once_with(
             "AT+QHTTPREAD=5",
             desired="+QHTTPREAD: 0",
-            fault=[
-                f"+QHTTPREAD: {str(error_code)}" for error_code in range(701, 731, 1)
-            ],
+            fault=HTTP.READ_FAULT,
             urc=True,
             timeout=5,
         )
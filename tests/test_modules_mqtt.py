@@ -93,6 +93,16 @@ class TestMQTT:
 
         mocking.assert_called_once_with(f'AT+QMTCFG="SSL",{params[0]},{params[1]},{params[2]}')
 
+    def test_set_ssl_connection_configs(self, mocker, mqtt):
+        """This method tests set_ssl_connection_configs() sends both configs in a line."""
+        mocked_response = {"status": Status.SUCCESS, "response": ["OK"]}
+        mocking = TestMQTT.mock_send_at_comm(mocker, mocked_response)
+        result = mqtt.set_ssl_connection_configs(cid=1, ssl_ctx_index=3)
+
+        mocking.assert_called_once_with('AT+QMTCFG="version",1,4;+QMTCFG="SSL",1,1,3', timeout=5)
+        assert result["status"] == Status.SUCCESS
+        assert result["results"] == [Status.SUCCESS, Status.SUCCESS]
+
     @pytest.mark.parametrize("mocked_response", default_response_types())
     def test_set_keep_alive_time_config_default(self, mocker, mqtt, mocked_response):
         """This method tests set_keep_alive_time_config() with its default parameters."""
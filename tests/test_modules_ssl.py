@@ -160,30 +160,34 @@ class TestSSL:
         assert result == mocked_response
 
     def test_configure_for_x509_certification_all_success_case(self, mocker, ssl):
-        """This method tests the state manager with mocking ATCom, and checks if
-        they all called.
-        """
-        mocked_response = {"status": Status.SUCCESS, "response": "not important"}
+        """This method tests if all the configurations are sent in a chained line."""
+        mocked_response = {"status": Status.SUCCESS, "response": ["OK"]}
         mocking = TestSSL.mock_send_at_comm(mocker, mocked_response)
         result = ssl.configure_for_x509_certification()
 
-        mocking.assert_any_call('AT+QSSLCFG="cacert",2,"/security/cacert.pem"')
-        mocking.assert_any_call('AT+QSSLCFG="clientcert",2,"/security/client.pem"')
-        mocking.assert_any_call('AT+QSSLCFG="clientkey",2,"/security/user_key.pem"')
-        mocking.assert_any_call('AT+QSSLCFG="seclevel",2,2')
-        mocking.assert_any_call('AT+QSSLCFG="sslversion",2,4')
-        mocking.assert_any_call('AT+QSSLCFG="ciphersuite",2,0xFFFF')
-        mocking.assert_any_call('AT+QSSLCFG="ignorelocaltime",2,1')
-        assert result["status"] == mocked_response["status"]
+        mocking.assert_called_once_with(
+            'AT+QSSLCFG="cacert",2,"/security/cacert.pem";'
+            '+QSSLCFG="clientcert",2,"/security/client.pem";'
+            '+QSSLCFG="clientkey",2,"/security/user_key.pem";'
+            '+QSSLCFG="seclevel",2,2;'
+            '+QSSLCFG="sslversion",2,4;'
+            '+QSSLCFG="ciphersuite",2,0xFFFF;'
+            '+QSSLCFG="ignorelocaltime",2,1',
+            timeout=5,
+        )
+        assert result["status"] == Status.SUCCESS
         assert result["response"] == mocked_response["response"]
+        assert result["results"] == [Status.SUCCESS] * 7
 
     def test_configure_for_x509_certification_fail(self, mocker, ssl):
-        """This method tests the state manager with mocking ATCom as failed response.
-        Hence, we can understand if failed responses also returned.
+        """This method tests if the failing command is found by sending the commands
+        one by one after the chained line fails.
         """
         mocked_response = {"status": Status.ERROR, "response": "not important"}
-        TestSSL.mock_send_at_comm(mocker, mocked_response)
+        mocking = TestSSL.mock_send_at_comm(mocker, mocked_response)
         result = ssl.configure_for_x509_certification()
 
+        mocking.assert_called_with('AT+QSSLCFG="cacert",2,"/security/cacert.pem"', timeout=5)
         assert result["status"] == mocked_response["status"]
         assert result["response"] == mocked_response["response"]
+        assert result["results"] == [Status.ERROR] + [None] * 6
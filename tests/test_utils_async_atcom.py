@@ -0,0 +1,278 @@
+"""
+Test module for the utils.async_atcom module.
+"""
+
+import asyncio
+import io
+
+import pytest
+
+from pico_lte.modules.mqtt import MQTT
+from pico_lte.utils.async_atcom import AsyncATCom
+from pico_lte.utils.manager import StateManager, Step, Workflow
+from pico_lte.utils.status import Status
+
+
+class FakeModem:
+    """
+    A fake UART stream which answers the written commands with the given replies.
+    Replies are lists of chunks, and a number in the list delays the next chunk.
+    """
+
+    def __init__(self, replies=None):
+        self.replies = replies or {}
+        self.written = []
+        self.chunks = asyncio.Queue()
+
+    def write(self, data):
+        data = bytes(data)  # the streams copy the written chunks
+        self.written.append(data)
+        for chunk in self.replies.get(data, []):
+            self.chunks.put_nowait(chunk)
+
+    async def drain(self):
+        pass
+
+    async def read(self, size):
+        chunk = await self.chunks.get()
+        while not isinstance(chunk, bytes):
+            await asyncio.sleep(chunk)
+            chunk = await self.chunks.get()
+        return chunk[:size]
+
+
+def run(coroutine):
+    """Runs the coroutine in a new event loop and returns its result."""
+    return asyncio.run(coroutine)
+
+
+def create_atcom(replies=None):
+    """Returns an AsyncATCom instance over a FakeModem."""
+    modem = FakeModem(replies)
+    return AsyncATCom(reader=modem, writer=modem), modem
+
+
+class TestAsyncATCom:
+    """Test class for the AsyncATCom class."""
+
+    def test_send_at_comm_ordinary(self):
+        """Test if the response is returned when OK arrives."""
+
+        async def scenario():
+            atcom, modem = create_atcom({b"AT\r": [b"AT\r\n", b"OK\r\n"]})
+            result = await atcom.send_at_comm("AT")
+            return result, modem.written
+
+        result, written = run(scenario())
+
+        assert written == [b"AT\r"]
+        assert result == {"status": Status.SUCCESS, "response": ["AT", "OK"]}
+
+    def test_send_at_comm_desired_and_fault(self):
+        """Test if the desired and fault responses are matched like ATCom."""
+
+        async def scenario():
+            atcom, _ = create_atcom(
+                {
+                    b"AT+CREG?\r": [b"+CREG: 0,", b"1\r\nOK\r\n"],
+                    b"AT+CGATT?\r": [b"+CGATT: 0\r\n\r\nOK\r\n"],
+                }
+            )
+            desired = await atcom.send_at_comm("AT+CREG?", "+CREG: 0,1")
+            fault = await atcom.send_at_comm("AT+CGATT?", "+CGATT: 1", "+CGATT: 0")
+            return desired, fault
+
+        desired, fault = run(scenario())
+
+        assert desired == {"status": Status.SUCCESS, "response": ["+CREG: 0,1", "OK"]}
+        assert fault == {"status": Status.ERROR, "response": ["+CGATT: 0", "OK"]}
+
+    def test_send_at_comm_timeout(self):
+        """Test if the timeout status is returned when no response arrives."""
+        atcom, _ = create_atcom()
+
+        result = run(atcom.send_at_comm("AT", timeout=0.05))
+
+        assert result == {"status": Status.TIMEOUT, "response": "timeout"}
+
+    def test_unterminated_prompt(self):
+        """Test if a prompt which isn't terminated is accepted after the line idle time."""
+        atcom, _ = create_atcom({b"AT+QMTPUBEX=0,1,1,0,topic,5\r": [b"> "]})
+
+        result = run(atcom.send_at_comm("AT+QMTPUBEX=0,1,1,0,topic,5", ">", timeout=1, urc=True))
+
+        assert result == {"status": Status.SUCCESS, "response": ["> "]}
+
+    def test_get_urc_response(self):
+        """Test if the URC is waited without blocking the other tasks."""
+
+        async def ticker(ticks):
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            atcom, _ = create_atcom(
+                {b"AT+QMTOPEN=0\r": [b"OK\r\n", 0.1, b"+QMTOPEN: 0,0\r\n"]}
+            )
+            ticks = []
+            task = asyncio.create_task(ticker(ticks))
+            result = await atcom.send_at_comm("AT+QMTOPEN=0", "+QMTOPEN: 0,0", urc=True)
+            task.cancel()
+            return result, ticks
+
+        result, ticks = run(scenario())
+
+        assert result == {"status": Status.SUCCESS, "response": ["OK", "+QMTOPEN: 0,0"]}
+        assert len(ticks) >= 5
+
+    def test_get_urc_response_without_desired_and_fault(self):
+        """Test if get_urc_response() returns immediately without responses to wait."""
+        atcom, _ = create_atcom()
+
+        result = run(atcom.get_urc_response())
+
+        assert result["status"] == Status.SUCCESS
+
+    def test_urc_routing(self):
+        """Test if the routed URCs are kept out of the command response."""
+
+        async def scenario():
+            atcom, _ = create_atcom({b"AT\r": [b"+QIURC: \"pdpdeact\",1\r\nOK\r\n"]})
+            atcom.urc.register("+QIURC")
+            result = await atcom.send_at_comm("AT")
+            return result, atcom.urc.get("+QIURC")
+
+        result, urc = run(scenario())
+
+        assert result == {"status": Status.SUCCESS, "response": ["OK"]}
+        assert urc == '+QIURC: "pdpdeact",1'
+
+    def test_send_batch(self):
+        """Test if send_batch() awaits the chained line, and splits it when it fails."""
+        version = b'AT+QMTCFG="version",0,4'
+        ssl = b'AT+QMTCFG="SSL",0,1,2'
+
+        async def scenario():
+            atcom, modem = create_atcom(
+                {
+                    version + b";" + ssl[2:] + b"\r": [b"ERROR\r\n"],
+                    version + b"\r": [b"OK\r\n"],
+                    ssl + b"\r": [b"+CME ERROR: 50\r\n"],
+                }
+            )
+            result = await atcom.send_batch([version.decode(), ssl.decode()], timeout=1)
+            return result, modem.written
+
+        result, written = run(scenario())
+
+        assert written == [version + b";" + ssl[2:] + b"\r", version + b"\r", ssl + b"\r"]
+        assert result == {
+            "status": Status.ERROR,
+            "response": ["+CME ERROR: 50"],
+            "results": [Status.SUCCESS, Status.ERROR],
+        }
+
+    def test_concurrent_commands(self):
+        """Test if a command waits until the response of the other task's command."""
+
+        async def scenario():
+            atcom, modem = create_atcom(
+                {
+                    b"AT+CSQ\r": [0.05, b"+CSQ: 20,99\r\n", b"OK\r\n"],
+                    b"AT+QCCID\r": [b"+QCCID: 8990\r\n", b"OK\r\n"],
+                }
+            )
+            results = await asyncio.gather(
+                atcom.send_at_comm("AT+CSQ"), atcom.send_at_comm("AT+QCCID")
+            )
+            return results, modem.written
+
+        (csq, qccid), written = run(scenario())
+
+        assert written == [b"AT+CSQ\r", b"AT+QCCID\r"]
+        assert csq == {"status": Status.SUCCESS, "response": ["+CSQ: 20,99", "OK"]}
+        assert qccid == {"status": Status.SUCCESS, "response": ["+QCCID: 8990", "OK"]}
+
+    def test_transaction(self):
+        """Test if the other tasks wait until the transaction ends, and it's re-entrant."""
+        prompt = b'AT+QMTPUB=0,1,1,0,"topic"\r'
+
+        async def publish(atcom):
+            async with atcom.transaction():
+                await atcom.send_at_comm(prompt.decode()[:-1], ">", urc=True)
+                await asyncio.sleep(0.05)
+                await atcom.send_at_comm_once("hello", line_end=False)
+                return await atcom.send_at_comm(MQTT.CTRL_Z)
+
+        async def scenario():
+            atcom, modem = create_atcom(
+                {
+                    prompt: [b"> "],
+                    MQTT.CTRL_Z.encode() + b"\r": [b"OK\r\n"],
+                    b"AT+CSQ\r": [b"+CSQ: 20,99\r\n", b"OK\r\n"],
+                }
+            )
+            results = await asyncio.gather(publish(atcom), atcom.send_at_comm("AT+CSQ"))
+            return results, modem.written
+
+        (published, csq), written = run(scenario())
+
+        assert written == [prompt, b"hello", MQTT.CTRL_Z.encode() + b"\r", b"AT+CSQ\r"]
+        assert published["status"] == Status.SUCCESS
+        assert csq == {"status": Status.SUCCESS, "response": ["+CSQ: 20,99", "OK"]}
+
+    def test_sync_uart_readers_raise(self):
+        """Test if the methods which read UART behind the stream reader raise a clear error."""
+        atcom, _ = create_atcom()
+
+        with pytest.raises(NotImplementedError):
+            atcom.poll_urc()
+        with pytest.raises(NotImplementedError):
+            atcom.start_rx_pump()
+        assert atcom.rx_pump is None
+
+    def test_module_method_as_async_step(self):
+        """Test if a module method returning a single command result runs in run_async()."""
+        atcom, modem = create_atcom({b'AT+QMTCFG="version",0,4\r': [b"OK\r\n"]})
+        mqtt = MQTT(atcom)
+        manager = StateManager(
+            Workflow([Step("set_version", mqtt.set_version_config, "success", "failure")])
+        )
+
+        result = run(manager.run_async())
+
+        assert result["status"] == Status.SUCCESS
+        assert modem.written == [b'AT+QMTCFG="version",0,4\r']
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "0123456789",
+        b"0123456789",
+        memoryview(bytearray(b"0123456789")),
+        io.BytesIO(b"0123456789"),
+        (part for part in ["0123", b"456789"]),
+    ],
+    ids=["str", "bytes", "memoryview", "file", "generator"],
+)
+def test_send_payload_in_chunks(data):
+    """Test if a payload of any type is written to the stream in chunks."""
+    atcom, modem = create_atcom()
+    atcom.DATA_CHUNK_SIZE = 4
+
+    run(atcom.send_at_comm_once(data, line_end=False))
+
+    assert b"".join(modem.written) == b"0123456789"
+    assert max(len(chunk) for chunk in modem.written) <= 4
+
+
+@pytest.mark.parametrize("chunks", [[b"OK\r\n"], [b"O", b"K", b"\r", b"\n"]])
+def test_get_response_chunks(chunks):
+    """Test if a response is collected regardless of the chunk boundaries."""
+    atcom, _ = create_atcom({b"AT\r": chunks})
+
+    result = run(atcom.send_at_comm("AT", timeout=1))
+
+    assert result == {"status": Status.SUCCESS, "response": ["OK"]}
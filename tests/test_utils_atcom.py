@@ -2,13 +2,52 @@
 Test module for the utils.atcom module.
 """
 
+import io
+import threading
+import time
+
 import pytest
 from machine import UART
 
-from pico_lte.utils.atcom import ATCom
+from pico_lte.utils.atcom import (
+    ATCom,
+    CommandStats,
+    ConfigShadow,
+    QueryCache,
+    ResponseMatcher,
+    TransactionLock,
+    URCRouter,
+    command_verb,
+)
 from pico_lte.utils.status import Status
 
 
+def mock_uart_rx(mocker, chunks):
+    """Mocks the UART of ATCom to receive the given chunks one after another.
+    A None chunk simulates a turn in which nothing is received.
+    """
+    pending = [chunk.encode() if isinstance(chunk, str) else chunk for chunk in chunks if chunk != ""]
+
+    def fake_any():
+        if pending and pending[0] is None:
+            pending.pop(0)
+            return 0
+        return len(pending[0]) if pending else 0
+
+    def fake_readinto(buf, nbytes=None):
+        chunk = pending[0]
+        size = min(len(buf), len(chunk))
+        buf[:size] = chunk[:size]
+        if size == len(chunk):
+            pending.pop(0)
+        else:
+            pending[0] = chunk[size:]
+        return size
+
+    mocker.patch("machine.UART.any", side_effect=fake_any)
+    mocker.patch("machine.UART.readinto", side_effect=fake_readinto)
+
+
 class TestATCom:
     """The test class for ATCom module which lets us to communicate
     with the PicoLTE.
@@ -79,18 +118,54 @@ class TestATCom:
         encoded_message = message.encode()
         mocking.assert_called_once_with(encoded_message)
 
+    @pytest.mark.parametrize(
+        "data",
+        [
+            "0123456789",
+            b"0123456789",
+            memoryview(bytearray(b"0123456789")),
+            io.BytesIO(b"0123456789"),
+            (part for part in ["0123", b"456789"]),
+        ],
+        ids=["str", "bytes", "memoryview", "file", "generator"],
+    )
+    def test_send_data_in_chunks(self, mocker, atcom, data):
+        """Test the send_data() method writes any payload type in chunks."""
+        written = []
+        write = lambda chunk: written.append(bytes(chunk))
+        mocker.patch.object(atcom.modem_com, "write", side_effect=write)
+
+        assert atcom.send_data(data, chunk_size=4) == 10
+        assert b"".join(written) == b"0123456789"
+        assert max(len(chunk) for chunk in written) <= 4
+
+    def test_send_data_records_stats(self, mocker, atcom):
+        """Test the payload written by send_data() is counted for the current command."""
+        mocker.patch.object(atcom.modem_com, "write")
+        atcom.stats.begin('AT+QMTPUB=0,1,1,0,"topic"')
+
+        atcom.send_at_comm_once(b"x" * 600, line_end=False)
+        atcom.stats.end(Status.SUCCESS)
+
+        assert atcom.stats.snapshot()["AT+QMTPUB"]["bytes_written"] == 600
+
+    def test_set_flow_control(self, mocker, atcom):
+        """Test the set_flow_control() method configures RTS/CTS of UART."""
+        mocker.patch("machine.UART.CTS", 1, create=True)
+        mocker.patch("machine.UART.RTS", 2, create=True)
+        uart_init = mocker.patch.object(atcom.modem_com, "init")
+
+        atcom.set_flow_control("cts", "rts")
+        uart_init.assert_called_with(baudrate=115200, cts="cts", rts="rts", flow=3)
+
+        atcom.set_flow_control()
+        uart_init.assert_called_with(baudrate=115200, flow=0)
+
     def test_get_response_default_parameters(self, mocker, atcom, example_response):
         """Test the get_response() method with default parameters."""
         mocker.patch("time.sleep", return_value=None)  # Mock to not wait.
-        # Mock the any() method to have dynamic return values.
-        # Note that, in each UART read() turn, it is called twice if it's True.
-        returns_any = [True for _ in range(len(example_response) * 2)] + [False]
-        mocker.patch("machine.UART.any", side_effect=returns_any)
-
-        # Mock the read() method to have dynamic and realistic
-        # return values.
-        returns_read = [fake.encode() for fake in example_response]
-        mocker.patch("machine.UART.read", side_effect=returns_read)
+        # Mock the UART to receive the chunks one after another.
+        mock_uart_rx(mocker, example_response)
 
         result = atcom.get_response()
         assert result == {
@@ -100,8 +175,7 @@ class TestATCom:
 
     def test_get_response_timeout_condition(self, mocker, atcom):
         """Test the get_response() method's timeout condition."""
-        mocker.patch("machine.UART.any", return_value=False)
-        mocker.patch("machine.UART.read", return_value=None)
+        mock_uart_rx(mocker, [])
 
         result = atcom.get_response(timeout=0.01)
         assert result["status"] == Status.TIMEOUT
@@ -109,20 +183,42 @@ class TestATCom:
 
     def test_get_response_no_informative_response(self, mocker, atcom):
         """Test the get_response() method with no informative response from PicoLTE."""
-        mocker.patch("machine.UART.any", side_effect=[True, True, False])
-        mocker.patch("machine.UART.read", return_value="OK".encode())
+        mock_uart_rx(mocker, ["OK"])
 
         # No informative response.
         result = atcom.get_response(desired_responses="OK")
         assert result["status"] == Status.ERROR
 
+    def test_get_response_line_split_between_reads(self, mocker, atcom):
+        """Test the get_response() method joins a line which arrives in two separate reads."""
+        mock_uart_rx(mocker, ["+QHTTPGET: 0,2", None, "00\r\nOK\r\n"])
+
+        result = atcom.get_response(desired_responses="+QHTTPGET: 0,200")
+        assert result["status"] == Status.SUCCESS
+        assert result["response"] == ["+QHTTPGET: 0,200", "OK"]
+
+    def test_get_response_multibyte_character_split_between_reads(self, mocker, atcom):
+        """Test the get_response() method decodes a character which arrives in two reads."""
+        encoded = '+QMTRECV: 0,1,"topic","é"\r\nOK\r\n'.encode()
+        split_at = encoded.index(b"\xa9")
+        mock_uart_rx(mocker, [encoded[:split_at], None, encoded[split_at:]])
+
+        result = atcom.get_response()
+        assert result["status"] == Status.SUCCESS
+        assert result["response"] == ['+QMTRECV: 0,1,"topic","é"', "OK"]
+
+    def test_get_response_returns_without_fixed_delay(self, mocker, atcom):
+        """Test the get_response() method doesn't sleep when the response is ready."""
+        sleep = mocker.patch("time.sleep", return_value=None)
+        mock_uart_rx(mocker, ["\r\nOK\r\n"])
+
+        result = atcom.get_response()
+        assert result == {"status": Status.SUCCESS, "response": ["OK"]}
+        sleep.assert_not_called()
+
     def test_get_response_found_desired_response(self, mocker, atcom, example_response):
         """Tests the get_response() method with given desired_response and finds it."""
-        returns_any = [True for _ in range(len(example_response) * 2)] + [False]
-        mocker.patch("machine.UART.any", side_effect=returns_any)
-
-        returns_read = [fake.encode() for fake in example_response]
-        mocker.patch("machine.UART.read", side_effect=returns_read)
+        mock_uart_rx(mocker, example_response)
 
         result = atcom.get_response(desired_responses="AT&V")
         assert result["status"] == Status.SUCCESS
@@ -130,25 +226,30 @@ class TestATCom:
 
     def test_get_response_not_found_desired_response(self, mocker, atcom):
         """Tests the get_response() method with given desired_responses but couldn't find it."""
-        mocker.patch(
-            "machine.UART.any",
-            side_effect=[True, True, True, True, False] + [False for _ in range(50)],
-        )
-        mocker.patch(
-            "machine.UART.read",
-            side_effect=["+QHTTP\r\n".encode(), "\r\nOK\r\n".encode()],
-        )
+        mock_uart_rx(mocker, ["+QHTTP\r\n", "\r\nOK\r\n"])
 
         result = atcom.get_response(desired_responses="+GPSLOC:", timeout=0.5)
         assert result == {"status": Status.TIMEOUT, "response": "timeout"}
 
+    def test_get_response_desired_after_many_turns(self, mocker, atcom):
+        """Tests the get_response() method finds the desired line arrived after
+        many turns and intermediate 'OK' lines.
+        """
+        mocker.patch("time.sleep", return_value=None)
+        chunks = []
+        for index in range(200):
+            chunks.extend([f"+QCELLSCAN: {index}\r\n", "OK\r\n", None])
+        chunks.append("+QHTTPREAD: 0\r\nOK\r\n")
+        mock_uart_rx(mocker, chunks)
+
+        result = atcom.get_response(desired_responses="+QHTTPREAD: 0")
+        assert result["status"] == Status.SUCCESS
+        assert len(result["response"]) == 402
+        assert result["response"][-2:] == ["+QHTTPREAD: 0", "OK"]
+
     def test_get_response_found_fault_response(self, mocker, atcom, example_response):
         """Tests the get_response() method with given fault_responses and finds it."""
-        returns_any = [True for _ in range(len(example_response) * 2)] + [False]
-        mocker.patch("machine.UART.any", side_effect=returns_any)
-
-        returns_read = [fake.encode() for fake in example_response]
-        mocker.patch("machine.UART.read", side_effect=returns_read)
+        mock_uart_rx(mocker, example_response)
 
         desired = ["+GPSLOC:", "SOME", "COMMMAND"]
         fault = ["+QHTTPGET: 200", "+QHTTPPOST: 200"]
@@ -161,11 +262,7 @@ class TestATCom:
         """Tests the get_response() method and founds an error message."""
         example_response = ["CONNECT\r\n", "+CME ERROR: 703\r\n", "\r\nOK\r\n"]
 
-        returns_any = [True for _ in range(len(example_response) * 2)] + [False]
-        mocker.patch("machine.UART.any", side_effect=returns_any)
-
-        returns_read = [fake.encode() for fake in example_response]
-        mocker.patch("machine.UART.read", side_effect=returns_read)
+        mock_uart_rx(mocker, example_response)
 
         result = atcom.get_response()
         assert result["status"] == Status.ERROR
@@ -175,11 +272,7 @@ class TestATCom:
         """Tests the get_response() method and founds an error message."""
         example_response = ["CONNECT\r\n", "\r\nOK\r\n", "ERROR\r\n"]
 
-        returns_any = [True for _ in range(len(example_response) * 2)] + [False]
-        mocker.patch("machine.UART.any", side_effect=returns_any)
-
-        returns_read = [fake.encode() for fake in example_response]
-        mocker.patch("machine.UART.read", side_effect=returns_read)
+        mock_uart_rx(mocker, example_response)
 
         result = atcom.get_response(desired_responses="wanted response")
         assert result["status"] == Status.ERROR
@@ -195,8 +288,7 @@ class TestATCom:
 
     def test_get_urc_response_timeout_condition(self, mocker, atcom):
         """Test the get_response() method's timeout condition."""
-        mocker.patch("machine.UART.any", return_value=False)
-        mocker.patch("machine.UART.read", return_value=None)
+        mock_uart_rx(mocker, [])
 
         result = atcom.get_response(timeout=0.01)
         assert result["status"] == Status.TIMEOUT
@@ -204,11 +296,7 @@ class TestATCom:
 
     def test_get_urc_response_with_desired_response(self, mocker, atcom, example_urc_response):
         """Test the get_urc_response() method with desired_responses parameter."""
-        returns_any = [True for _ in range(len(example_urc_response) * 2)] + [False]
-        mocker.patch("machine.UART.any", side_effect=returns_any)
-
-        returns_read = [fake.encode() for fake in example_urc_response]
-        mocker.patch("machine.UART.read", side_effect=returns_read)
+        mock_uart_rx(mocker, example_urc_response)
 
         desired = "CONNECT"
         result = atcom.get_urc_response(desired_responses=desired)
@@ -218,11 +306,7 @@ class TestATCom:
 
     def test_get_urc_response_with_fault_response(self, mocker, atcom, example_urc_response):
         """Test the get_urc_response() method with fault_responses parameter."""
-        returns_any = [True for _ in range(len(example_urc_response) * 2)] + [False]
-        mocker.patch("machine.UART.any", side_effect=returns_any)
-
-        returns_read = [fake.encode() for fake in example_urc_response]
-        mocker.patch("machine.UART.read", side_effect=returns_read)
+        mock_uart_rx(mocker, example_urc_response)
 
         fault = "CONNECT"
         result = atcom.get_urc_response(fault_responses=fault)
@@ -232,11 +316,7 @@ class TestATCom:
 
     def test_get_urc_response_ordinary_case(self, mocker, atcom, example_urc_response):
         """Test the get_urc_response() method in ordinary case."""
-        returns_any = [True for _ in range(len(example_urc_response) * 2)] + [False]
-        mocker.patch("machine.UART.any", side_effect=returns_any)
-
-        returns_read = [fake.encode() for fake in example_urc_response]
-        mocker.patch("machine.UART.read", side_effect=returns_read)
+        mock_uart_rx(mocker, example_urc_response)
 
         desired = "+QHTTPPOST: 200"
         fault = ["ERROR", "+CME ERROR"]
@@ -265,3 +345,566 @@ class TestATCom:
 
         result_sec = atcom.send_at_comm("example", urc=False)
         assert result_sec["status"] == return_dict["status"]
+
+    def test_get_response_routes_urc(self, mocker, atcom):
+        """Test the get_response() method moves the registered URC lines to their queue."""
+        mock_uart_rx(mocker, ["+QMTSTAT: 0,1\r\n+CSQ: 20,99\r\n", "+QMTSTAT: 0,2\r\nOK\r\n"])
+        atcom.urc.register("+QMTSTAT")
+
+        result = atcom.get_response(desired_responses="+CSQ:")
+        assert result == {"status": Status.SUCCESS, "response": ["+CSQ: 20,99", "OK"]}
+        assert atcom.urc.get_all("+QMTSTAT") == ["+QMTSTAT: 0,1", "+QMTSTAT: 0,2"]
+
+    def test_get_urc_response_does_not_route_expected_line(self, mocker, atcom):
+        """Test the get_urc_response() method keeps a registered URC line if it is waited."""
+        mock_uart_rx(mocker, ["OK\r\n+QMTOPEN: 0,0\r\n"])
+        atcom.urc.register("+QMTOPEN")
+
+        result = atcom.get_urc_response(desired_responses="+QMTOPEN: 0,0")
+        assert result == {"status": Status.SUCCESS, "response": ["OK", "+QMTOPEN: 0,0"]}
+        assert atcom.urc.pending("+QMTOPEN") == 0
+
+    @pytest.mark.parametrize("idle", [False, True], ids=["one_read", "many_reads"])
+    def test_get_urc_response_with_window(self, mocker, atcom, idle):
+        """Test the get_urc_response() method keeps only the last lines in window mode."""
+        noise = []
+        for index in range(50):
+            noise += [f"+CEREG: {index}\r\n", None] if idle else [f"+CEREG: {index}\r\n"]
+        mock_uart_rx(mocker, noise + ["+QMTCONN: 0,0,0\r\n"])
+        route = mocker.spy(atcom.urc, "route")
+
+        result = atcom.get_urc_response(desired_responses="+QMTCONN: 0,0,0", window=3)
+
+        assert result == {
+            "status": Status.SUCCESS,
+            "response": ["+CEREG: 47", "+CEREG: 48", "+CEREG: 49", "+QMTCONN: 0,0,0"],
+        }
+        assert route.call_count == 47
+        route.assert_any_call("+CEREG: 0")
+
+    def test_poll_urc(self, mocker, atcom):
+        """Test the poll_urc() method routes lines and drops the others."""
+        mock_uart_rx(mocker, ['+QMTRECV: 0,1,"topic","message"\r\nRDY\r\n+CREG: 1\r\n'])
+        callback = mocker.Mock()
+        atcom.urc.register("+QMTRECV")
+        atcom.urc.register("RDY", callback=callback)
+
+        assert atcom.poll_urc() == 2
+        assert atcom.urc.get("+QMTRECV") == '+QMTRECV: 0,1,"topic","message"'
+        callback.assert_called_once_with("RDY")
+        assert atcom.rx_buffer.count == 0
+
+
+    def test_send_batch_chains_commands(self, mocker, atcom):
+        """Test the send_batch() method chains extended commands within the line limit."""
+        mocking = mocker.patch(
+            "pico_lte.utils.atcom.ATCom.send_at_comm",
+            return_value={"status": Status.SUCCESS, "response": ["OK"]},
+        )
+        mocker.patch.object(atcom, "MAX_LINE_LENGTH", 40)
+        commands = ['AT+QMTCFG="version",0,4', 'AT+QMTCFG="SSL",0,1,2', "ATE0", "AT+CMEE=2"]
+
+        result = atcom.send_batch(commands)
+
+        assert [call.args[0] for call in mocking.call_args_list] == [
+            'AT+QMTCFG="version",0,4',
+            'AT+QMTCFG="SSL",0,1,2',
+            "ATE0",
+            "AT+CMEE=2",
+        ]
+        assert result["results"] == [Status.SUCCESS] * 4
+
+        mocking.reset_mock()
+        mocker.patch.object(atcom, "MAX_LINE_LENGTH", 256)
+        atcom.send_batch(commands)
+
+        assert [call.args[0] for call in mocking.call_args_list] == [
+            'AT+QMTCFG="version",0,4;+QMTCFG="SSL",0,1,2',
+            "ATE0",
+            "AT+CMEE=2",
+        ]
+
+    def test_send_batch_maps_error_to_command(self, mocker, atcom):
+        """Test the send_batch() method finds the failing command of a chained line."""
+        ok = {"status": Status.SUCCESS, "response": ["OK"]}
+        error = {"status": Status.ERROR, "response": ["+CME ERROR: 50"]}
+        mocking = mocker.patch(
+            "pico_lte.utils.atcom.ATCom.send_at_comm", side_effect=[error, ok, error]
+        )
+
+        result = atcom.send_batch(["AT+A=1", "AT+B=2", "AT+C=3"])
+
+        assert [call.args[0] for call in mocking.call_args_list] == [
+            "AT+A=1;+B=2;+C=3",
+            "AT+A=1",
+            "AT+B=2",
+        ]
+        assert result == {
+            "status": Status.ERROR,
+            "response": ["+CME ERROR: 50"],
+            "results": [Status.SUCCESS, Status.ERROR, None],
+        }
+
+    def test_send_batch_timeout(self, mocker, atcom):
+        """Test the send_batch() method doesn't resend the commands after a timeout."""
+        timeout = {"status": Status.TIMEOUT, "response": "timeout"}
+        mocking = mocker.patch("pico_lte.utils.atcom.ATCom.send_at_comm", return_value=timeout)
+
+        result = atcom.send_batch(["AT+A=1", "AT+B=2"])
+
+        mocking.assert_called_once_with("AT+A=1;+B=2", timeout=5)
+        assert result["results"] == [Status.TIMEOUT, Status.TIMEOUT]
+
+    def test_send_at_comm_uses_query_cache(self, mocker, atcom):
+        """Test the send_at_comm() method replays a cached query through the matchers."""
+        mock_uart_rx(mocker, ['+CGDCONT: 1,"IP","super"\r\nOK\r\n'])
+        write = mocker.patch("machine.UART.write")
+
+        first = atcom.send_at_comm("AT+CGDCONT?", '"super"')
+        second = atcom.send_at_comm("AT+CGDCONT?", '"super"')
+        third = atcom.send_at_comm("AT+CGDCONT?", '"other"', '"super"')
+
+        assert write.call_count == 1
+        assert first == second == {
+            "status": Status.SUCCESS,
+            "response": ['+CGDCONT: 1,"IP","super"', "OK"],
+        }
+        assert third["status"] == Status.ERROR
+        assert (atcom.query_cache.hits, atcom.query_cache.misses) == (2, 1)
+
+    @pytest.mark.parametrize(
+        "command",
+        ['AT+CGDCONT=1,"IP","new"', 'AT+QICSGP=1,1,"new","","",0'],
+    )
+    def test_send_at_comm_invalidates_query_cache(self, mocker, atcom, command):
+        """Test the send_at_comm() method drops the cached query changed by a command."""
+        mock_uart_rx(
+            mocker,
+            [
+                '+CGDCONT: 1,"IP","super"\r\nOK\r\n',
+                None,
+                "OK\r\n",
+                None,
+                '+CGDCONT: 1,"IP","new"\r\nOK\r\n',
+            ],
+        )
+        write = mocker.patch("machine.UART.write")
+
+        atcom.send_at_comm("AT+CGDCONT?")
+        atcom.send_at_comm(command)
+        result = atcom.send_at_comm("AT+CGDCONT?")
+
+        assert write.call_count == 3
+        assert result["response"] == ['+CGDCONT: 1,"IP","new"', "OK"]
+
+    def test_send_at_comm_skips_applied_config(self, mocker, atcom):
+        """Test the send_at_comm() method doesn't send a configuration which is applied."""
+        mock_uart_rx(mocker, ["OK\r\n", None, "OK\r\n", None, "OK\r\n"])
+        write = mocker.patch("machine.UART.write")
+
+        atcom.send_at_comm('AT+QMTCFG="version",0,4')
+        result = atcom.send_at_comm('AT+QMTCFG="version",0,4')
+        assert result == {"status": Status.SUCCESS, "response": ["OK"]}
+        assert write.call_count == 1
+
+        atcom.send_at_comm('AT+QMTCFG="version",0,3')
+        assert write.call_count == 2
+
+        atcom.urc.register("APP RDY")  # a user route doesn't replace the reset
+        mock_uart_rx(mocker, ["APP RDY\r\n", "OK\r\n"])
+        assert atcom.poll_urc() == 1
+        atcom.send_at_comm('AT+QMTCFG="version",0,3')
+        assert write.call_count == 3
+        assert atcom.urc.get("APP RDY") == "APP RDY"
+
+    def test_ready_urc_in_response_resets_caches(self, mocker, atcom):
+        """Test a RDY line received within a response resets the applied configurations."""
+        mock_uart_rx(mocker, ["OK\r\n", None, "RDY\r\nOK\r\n", None, "OK\r\n"])
+        write = mocker.patch("machine.UART.write")
+
+        atcom.send_at_comm('AT+QMTCFG="version",0,4')
+        assert atcom.send_at_comm("AT")["response"] == ["RDY", "OK"]
+        atcom.send_at_comm('AT+QMTCFG="version",0,4')
+
+        assert write.call_count == 3
+
+    def test_send_batch_skips_applied_configs(self, mocker, atcom):
+        """Test the send_batch() method sends only the configurations which aren't applied."""
+        mocking = mocker.patch(
+            "pico_lte.utils.atcom.ATCom.send_at_comm",
+            return_value={"status": Status.SUCCESS, "response": ["OK"]},
+        )
+        atcom.config_shadow.apply('AT+QSSLCFG="seclevel",2,2', True)
+
+        result = atcom.send_batch(
+            ['AT+QSSLCFG="seclevel",2,2', 'AT+QSSLCFG="sslversion",2,4', "AT+CMEE=2"]
+        )
+
+        mocking.assert_called_once_with('AT+QSSLCFG="sslversion",2,4;+CMEE=2', timeout=5)
+        assert result["results"] == [Status.SUCCESS] * 3
+
+    def test_get_urc_response_records_stats(self, mocker, atcom):
+        """Test a URC wait after a command is measured in its own row."""
+        mock_uart_rx(mocker, ["OK\r\n", None, "+QMTOPEN: 0,0\r\n"])
+        mocker.patch("machine.UART.write")
+
+        atcom.send_at_comm('AT+QMTOPEN=0,"host",1883')
+        atcom.get_urc_response("+QMTOPEN: 0,0")
+
+        snapshot = atcom.stats.snapshot()
+        assert snapshot["AT+QMTOPEN"]["bytes_read"] == 4
+        assert snapshot["URC +QMTOPEN"]["count"] == 1
+        assert snapshot["URC +QMTOPEN"]["bytes_read"] == 15
+
+    def test_send_at_comm_records_stats(self, mocker, atcom):
+        """Test the send_at_comm() method records the statistics of the command verb."""
+        mock_uart_rx(mocker, ["+QMTPUB: 0,1,0\r\n", "OK\r\n"])
+        mocker.patch("machine.UART.write")
+
+        atcom.send_at_comm('AT+QMTPUB=0,1,1,0,"topic"', "+QMTPUB: 0,1,0")
+        atcom.send_at_comm("AT+QMTPUB=0,2,1,0,\"topic\"", timeout=0)
+
+        stats = atcom.stats.snapshot()["AT+QMTPUB"]
+        assert stats["count"] == 2
+        assert stats["bytes_written"] == 2 * len('AT+QMTPUB=0,1,1,0,"topic"\r')
+        assert stats["bytes_read"] == len("+QMTPUB: 0,1,0\r\nOK\r\n")
+        assert stats["timeouts"] == 1
+        assert stats["errors"] == 0
+
+class TestResponseMatcher:
+    """The test class for ResponseMatcher class."""
+
+    @pytest.mark.parametrize(
+        "responses, expected",
+        [(None, None), ("", None), ([], None)],
+    )
+    def test_build_without_responses(self, responses, expected):
+        """Test the build() method returns None if there is no response."""
+        assert ResponseMatcher.build(responses) is expected
+
+    def test_build_reuses_matcher(self):
+        """Test the build() method returns the same matcher if a matcher is given."""
+        matcher = ResponseMatcher(prefixes=["+CREG:"])
+        assert ResponseMatcher.build(matcher) is matcher
+
+    @pytest.mark.parametrize(
+        "responses, line, is_matched",
+        [
+            ("CONNECT", "CONNECT", True),
+            ("+QHTTPGET: 0,200", "+QHTTPGET: 0,200,15", True),
+            (["+CREG: 0,1", "+CREG: 0,5"], "+CREG: 0,5", True),
+            (["+CREG: 0,1", "+CREG: 0,5"], "+CREG: 0,2", False),
+        ],
+    )
+    def test_build_contains(self, responses, line, is_matched):
+        """Test the strings and lists are matched as 'contains' patterns."""
+        assert ResponseMatcher.build(responses).match(line) == is_matched
+
+    @pytest.mark.parametrize(
+        "line, is_matched",
+        [
+            ("+QMTSTAT: 0,1", True),
+            ("+QMTOPEN: 0,3", True),
+            ("+QMTOPEN: 0,0", False),
+            ("+QMTOPEN: 0,x", False),
+            ("+QMTOPEN: 1,3", False),
+            ("+QHTTPREAD: 702", True),
+            ("ERROR", True),
+            ("+QMTSTAT", False),
+        ],
+    )
+    def test_match(self, line, is_matched):
+        """Test the match() method with all the pattern types."""
+        matcher = ResponseMatcher(
+            contains=["ERROR"],
+            prefixes=["+QMTSTAT:"],
+            codes={"+QMTOPEN: 0,": range(1, 6), "+QHTTPREAD: ": [701, 702]},
+        )
+        assert matcher.match(line) == is_matched
+
+    def test_get_response_with_matcher(self, mocker):
+        """Test ATCom accepts a matcher as desired responses."""
+        mock_uart_rx(mocker, ["+QHTTPGET: 0,201,10\r\nOK\r\n"])
+        matcher = ResponseMatcher(codes={"+QHTTPGET: 0,": [200, 201]})
+
+        result = ATCom().get_response(desired_responses=matcher)
+        assert result["status"] == Status.SUCCESS
+
+
+class TestURCRouter:
+    """The test class for URCRouter class."""
+
+    @pytest.fixture
+    def router(self):
+        """It returns an URCRouter instance with a route."""
+        router = URCRouter()
+        router.register("+CEREG", maxlen=2)
+        return router
+
+    @pytest.mark.parametrize(
+        "line, is_routed",
+        [("+CEREG: 5", True), ("+CEREG:", True), ("+CEREGX: 1", False), ("OK", False)],
+    )
+    def test_route(self, router, line, is_routed):
+        """Test the route() method matches the prefix of the line."""
+        assert router.route(line) == is_routed
+
+    def test_queue_is_bounded(self, router):
+        """Test the oldest line is dropped when the queue is full."""
+        for index in range(3):
+            router.route(f"+CEREG: {index}")
+
+        assert router.pending("+CEREG") == 2
+        assert router.get("+CEREG") == "+CEREG: 1"
+        assert router.get("+CEREG") == "+CEREG: 2"
+        assert router.get("+CEREG") is None
+
+    def test_unregister(self, router):
+        """Test the unregister() method removes the route."""
+        router.unregister("+CEREG")
+
+        assert router.route("+CEREG: 1") is False
+        assert router.get_all("+CEREG") == []
+
+
+class TestQueryCache:
+    """The test class for QueryCache class."""
+
+    @pytest.fixture
+    def cache(self):
+        """It returns a QueryCache instance with a cached query."""
+        cache = QueryCache()
+        cache.register("AT+QMTCONN?", 5, ("AT+QMTDISC",))
+        cache.store("AT+QMTCONN?", ["+QMTCONN: 0,3", "OK"])
+        return cache
+
+    @pytest.mark.parametrize(
+        "command, verb",
+        [
+            ("AT+CGDCONT?", "AT+CGDCONT"),
+            ('AT+QGPSCFG="priority",0', "AT+QGPSCFG"),
+            ("ATE0", "ATE0"),
+        ],
+    )
+    def test_command_verb(self, command, verb):
+        """Test the command_verb() function."""
+        assert command_verb(command) == verb
+
+    def test_get(self, cache):
+        """Test the get() method returns the stored lines and counts hits."""
+        assert cache.get("AT+QMTCONN?") == ["+QMTCONN: 0,3", "OK"]
+        assert cache.get("AT+CGMM") is None
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    def test_get_expired(self, mocker, cache):
+        """Test the get() method doesn't return the lines after TTL."""
+        mocker.patch("pico_lte.utils.atcom.ticks_diff", return_value=5000)
+        assert cache.get("AT+QMTCONN?") is None
+        assert cache.misses == 1
+
+    def test_store_only_completed_responses(self, cache):
+        """Test the store() method ignores the responses which aren't completed with OK."""
+        cache.clear()
+        cache.store("AT+QMTCONN?", "timeout")
+        cache.store("AT+QMTCONN?", ["ERROR"])
+        assert cache.get("AT+QMTCONN?") is None
+
+    @pytest.mark.parametrize(
+        "command, is_dropped",
+        [
+            ("AT+QMTCONN=0,\"client\"", True),
+            ("AT+QMTDISC=0", True),
+            ('AT+QMTCFG="version",0,4;+QMTDISC=0', True),
+            ("AT+QMTOPEN=0,\"host\",8883", False),
+        ],
+    )
+    def test_invalidate(self, cache, command, is_dropped):
+        """Test the commands drop the cached queries which they may change."""
+        assert cache.get(command) is None
+        assert (cache.get("AT+QMTCONN?") is None) == is_dropped
+
+
+class TestConfigShadow:
+    """The test class for ConfigShadow class."""
+
+    @pytest.fixture
+    def shadow(self):
+        """It returns a ConfigShadow instance with an applied configuration."""
+        shadow = ConfigShadow()
+        shadow.register('AT+QMTCFG="version"')
+        shadow.register('AT+QMTCFG="SSL"')
+        shadow.register('AT+QHTTPCFG="contextid"', has_context=False)
+        shadow.apply('AT+QMTCFG="version",0,4', True)
+        shadow.apply('AT+QHTTPCFG="contextid",1', True)
+        return shadow
+
+    @pytest.mark.parametrize(
+        "command, is_applied",
+        [
+            ('AT+QMTCFG="version",0,4', True),
+            ('AT+QMTCFG="version",1,4', False),
+            ('AT+QMTCFG="version",0,3', False),
+            ('AT+QMTCFG="version",0', False),
+            ('AT+QHTTPCFG="contextid",1', True),
+            ('AT+QHTTPCFG="contextid"', False),
+            ('AT+QMTCFG="keepalive",0,120', False),
+            ('AT+QMTCFG="version",0,4;+QHTTPCFG="contextid",1', True),
+            ('AT+QMTCFG="version",0,4;+QMTCFG="SSL",0,1,2', False),
+        ],
+    )
+    def test_is_applied(self, shadow, command, is_applied):
+        """Test only the commands which set the applied values are skipped."""
+        assert shadow.is_applied(command) == is_applied
+        assert shadow.skipped == int(is_applied)
+
+    def test_apply_chained_commands(self, shadow):
+        """Test the apply() method remembers each value set by chained commands."""
+        shadow.apply('AT+QMTCFG="version",0,3;+QMTCFG="SSL",0,1,2', True)
+
+        assert shadow.is_applied('AT+QMTCFG="version",0,3')
+        assert shadow.is_applied('AT+QMTCFG="SSL",0,1,2')
+
+    def test_apply_failed_command(self, shadow):
+        """Test the apply() method forgets the value if setting it has failed."""
+        shadow.apply('AT+QMTCFG="version",0,3', False)
+
+        assert not shadow.is_applied('AT+QMTCFG="version",0,4')
+        assert not shadow.is_applied('AT+QMTCFG="version",0,3')
+
+    def test_clear(self, shadow):
+        """Test the clear() method forgets all the applied values."""
+        shadow.clear()
+
+        assert not shadow.is_applied('AT+QMTCFG="version",0,4')
+        assert not shadow.is_applied('AT+QHTTPCFG="contextid",1')
+
+
+class TestCommandStats:
+    """The test class for CommandStats class."""
+
+    def test_latency(self, mocker):
+        """Test the end() method updates the latency columns."""
+        stats = CommandStats()
+        mocker.patch("pico_lte.utils.atcom.ticks_diff", side_effect=[30, 10, 20])
+
+        for status in [Status.SUCCESS, Status.ERROR, Status.SUCCESS]:
+            stats.begin("AT+QHTTPREAD=60")
+            stats.end(status)
+
+        assert stats.snapshot() == {
+            "AT+QHTTPREAD": {
+                "count": 3,
+                "total_ms": 60,
+                "min_ms": 10,
+                "max_ms": 30,
+                "last_ms": 20,
+                "bytes_written": 0,
+                "bytes_read": 0,
+                "timeouts": 0,
+                "errors": 1,
+            }
+        }
+
+    def test_table_is_bounded(self):
+        """Test the verbs which don't fit the table are collected in the last row."""
+        stats = CommandStats(size=3)
+
+        for command in ["AT+A", "AT+B", "AT+C", "AT+D", "\x1a"]:
+            stats.begin(command)
+            stats.add_written(1)
+            stats.end(Status.SUCCESS)
+
+        snapshot = stats.snapshot()
+        assert list(snapshot) == ["AT+A", "AT+B", "OTHER"]
+        assert snapshot["OTHER"]["count"] == 3
+        assert snapshot["OTHER"]["bytes_written"] == 3
+
+    def test_end_clears_current(self):
+        """Test the bytes read after a command has ended aren't counted for it."""
+        stats = CommandStats()
+        stats.begin("AT+QMTOPEN=0,\"host\",1883")
+        stats.add_read(6)
+        stats.end(Status.SUCCESS)
+
+        stats.add_read(20)
+
+        assert stats.current is None
+        assert stats.snapshot()["AT+QMTOPEN"]["bytes_read"] == 6
+
+    def test_begin_urc(self):
+        """Test the URC waits are measured in the rows of their prefixes."""
+        stats = CommandStats()
+
+        stats.begin_urc(ResponseMatcher.build("+QMTOPEN: 0,0"))
+        stats.add_read(17)
+        stats.end(Status.SUCCESS)
+        stats.begin_urc(ResponseMatcher(codes={"+QHTTPGET: 0,": [200]}))
+        stats.end(Status.TIMEOUT)
+
+        snapshot = stats.snapshot()
+        assert snapshot["URC +QMTOPEN"]["bytes_read"] == 17
+        assert snapshot["URC +QHTTPGET"]["timeouts"] == 1
+
+    def test_reset(self):
+        """Test the reset() method clears the table."""
+        stats = CommandStats()
+        stats.begin("AT")
+        stats.end(Status.TIMEOUT)
+
+        stats.reset()
+
+        assert stats.snapshot() == {}
+        assert stats.rows[0] == [0] * len(CommandStats.FIELDS)
+
+
+class TestTransactionLock:
+    """Test class for the TransactionLock class."""
+
+    def test_reentrant(self):
+        """Test the owner thread can acquire the lock again."""
+        lock = TransactionLock()
+
+        with lock:
+            with lock:
+                assert lock.count == 2
+            assert lock.owner is not None
+
+        assert lock.owner is None
+        assert lock.count == 0
+
+    def test_exclusive_between_threads(self):
+        """Test another thread waits until the transaction ends."""
+        lock = TransactionLock()
+        events = []
+
+        def worker():
+            with lock:
+                events.append("worker")
+
+        with lock:
+            thread = threading.Thread(target=worker)
+            thread.start()
+            time.sleep(0.02)
+            events.append("owner")
+        thread.join(1)
+
+        assert events == ["owner", "worker"]
+
+    def test_commands_of_threads_are_not_interleaved(self, mocker):
+        """Test a transaction keeps the commands of another thread out."""
+        atcom = ATCom()
+        written = []
+        mocker.patch.object(atcom.modem_com, "write", side_effect=written.append)
+
+        def worker():
+            atcom.send_at_comm_once("AT+CSQ")
+
+        with atcom.transaction():
+            atcom.send_at_comm_once("AT+QMTPUB=0,1,1,0,\"topic\"")
+            thread = threading.Thread(target=worker)
+            thread.start()
+            time.sleep(0.02)
+            atcom.send_at_comm_once("payload", line_end=False)
+        thread.join(1)
+
+        assert written == [b'AT+QMTPUB=0,1,1,0,"topic"\r', b"payload", b"AT+CSQ\r"]
@@ -0,0 +1,170 @@
+"""
+Test module for the utils.buffer module.
+"""
+
+import pytest
+
+from pico_lte.utils.buffer import RingBuffer, decode_line
+
+
+class FakeStream:
+    """A stream which returns the given chunks with any() and readinto() methods."""
+
+    def __init__(self, *chunks):
+        self.chunks = list(chunks)
+
+    def any(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def readinto(self, buf):
+        chunk = self.chunks[0]
+        size = min(len(buf), len(chunk))
+        buf[:size] = chunk[:size]
+        if size == len(chunk):
+            self.chunks.pop(0)
+        else:
+            self.chunks[0] = chunk[size:]
+        return size
+
+
+def read_all_lines(ring):
+    """Returns all the complete lines in the ring buffer as bytes."""
+    lines = []
+    line = ring.readline()
+    while line is not None:
+        lines.append(bytes(line))
+        line = ring.readline()
+    return lines
+
+
+class TestRingBuffer:
+    """Test class for the RingBuffer class."""
+
+    @pytest.fixture(params=[True, False], ids=["bytearray_find", "bytes_find"])
+    def ring(self, request, monkeypatch):
+        """It returns a small RingBuffer instance, with or without bytearray.find()."""
+        monkeypatch.setattr("pico_lte.utils.buffer.BYTEARRAY_FIND", request.param)
+        return RingBuffer(16)
+
+    def test_initialization(self, ring):
+        """Test if the buffer is preallocated and empty."""
+        assert len(ring.buffer) == 16
+        assert ring.count == 0
+        assert ring.readline() is None
+
+    def test_fill_and_readline(self, ring):
+        """Test if the complete lines are returned without line endings."""
+        assert ring.fill(FakeStream(b"\r\nOK\r\n+CSQ")) == 10
+
+        assert read_all_lines(ring) == [b"OK"]
+        assert ring.count == 4
+
+    def test_readline_incremental(self, ring):
+        """Test if a line arriving in parts is returned when it is completed."""
+        ring.fill(FakeStream(b"+CREG: "))
+        assert ring.readline() is None
+        assert ring.scanned == 7
+
+        ring.fill(FakeStream(b"0,1\r\n"))
+        assert read_all_lines(ring) == [b"+CREG: 0,1"]
+
+    def test_wrap_around(self, ring):
+        """Test if a line stored across the end of the buffer is returned correctly."""
+        ring.fill(FakeStream(b"0123456789\r\n"))
+        assert read_all_lines(ring) == [b"0123456789"]
+
+        ring.fill(FakeStream(b"ab"))
+        ring.fill(FakeStream(b"cdefgh\r\nOK\r\n"))
+        assert read_all_lines(ring) == [b"abcdefgh", b"OK"]
+        assert ring.count == 0
+
+    def test_scan_continues_after_wrap(self, ring):
+        """Test if a line is found when the scanned part already wraps around the end."""
+        ring.fill(FakeStream(b"0123456789\r\nab"))
+        read_all_lines(ring)
+        ring.fill(FakeStream(b"cdef"))
+        assert ring.readline() is None
+        assert (ring.head, ring.scanned) == (12, 6)  # the next scan starts after the end
+
+        ring.fill(FakeStream(b"gh\r\n"))
+        assert read_all_lines(ring) == [b"abcdefgh"]
+
+    def test_contains(self, ring):
+        """Test if the stored bytes are searched, also across the end, without removing them."""
+        ring.fill(FakeStream(b"0123456789\r\nab"))
+        read_all_lines(ring)
+        ring.fill(FakeStream(b"c\r\nRDY\r\n"))
+
+        assert ring.contains(b"RDY\r\n")
+        assert ring.contains(b"bc")
+        assert not ring.contains(b"OK")
+        assert read_all_lines(ring) == [b"abc", b"RDY"]
+        assert not ring.contains(b"RDY")
+
+    def test_fill_stops_when_full(self, ring):
+        """Test if fill() doesn't read more than the capacity."""
+        stream = FakeStream(b"x" * 20)
+
+        assert ring.fill(stream) == 16
+        assert stream.any() == 4
+
+    def test_long_line_is_split(self, ring):
+        """Test if a line longer than the buffer is returned in parts."""
+        stream = FakeStream(b"y" * 20 + b"\r\n")
+        ring.fill(stream)
+        assert bytes(ring.readline()) == b"y" * 16
+
+        ring.fill(stream)
+        assert read_all_lines(ring) == [b"y" * 4]
+
+    def test_read_remaining(self, ring):
+        """Test if read_remaining() returns unterminated bytes."""
+        ring.fill(FakeStream(b"OK\r\n> "))
+        assert read_all_lines(ring) == [b"OK"]
+
+        assert bytes(ring.read_remaining()) == b"> "
+        assert ring.count == 0
+
+    def test_write(self, ring):
+        """Test if write() stores the bytes across the end of the buffer."""
+        ring.write(b"0123456789\r\nab")
+        assert read_all_lines(ring) == [b"0123456789"]
+
+        assert ring.write(b"cdefgh\r\nOK\r\n") == 12
+        assert read_all_lines(ring) == [b"abcdefgh", b"OK"]
+
+    def test_write_drops_overflow(self, ring):
+        """Test if write() doesn't store more than the capacity."""
+        assert ring.write(b"x" * 20) == 16
+        assert ring.count == 16
+
+    def test_readinto(self, ring):
+        """Test if readinto() copies the oldest bytes across the end of the buffer."""
+        ring.write(b"0123456789ab")
+        ring.readinto(bytearray(10))
+        ring.write(b"cdefgh")
+        buf = bytearray(10)
+
+        assert ring.readinto(buf) == 8
+        assert bytes(buf[:8]) == b"abcdefgh"
+        assert ring.count == 0
+
+    def test_clear(self, ring):
+        """Test if clear() drops all the bytes."""
+        ring.fill(FakeStream(b"OK\r\n"))
+        ring.clear()
+        assert ring.readline() is None
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (b"OK", "OK"),
+        (memoryview(b"+QMTRECV: 0,1"), "+QMTRECV: 0,1"),
+        ("é".encode(), "é"),
+        (b"AB\xffC", "ABC"),
+    ],
+)
+def test_decode_line(line, expected):
+    """Test the decode_line() function."""
+    assert decode_line(line) == expected
@@ -2,11 +2,36 @@
 Test Module for the utils.manager module.
 """
 
+import asyncio
+
 import pytest
 
-from pico_lte.utils.manager import Step, StateManager
+from pico_lte.utils.manager import (
+    DecorrelatedJitterBackoff,
+    ExponentialBackoff,
+    FixedBackoff,
+    Param,
+    Step,
+    StateManager,
+    Workflow,
+)
 from pico_lte.utils.status import Status
+from pico_lte.utils.atcom import ATCom
 from pico_lte.common import config
+from pico_lte.modules.auth import Auth
+from pico_lte.modules.base import Base
+from pico_lte.modules.file import File
+from pico_lte.modules.http import HTTP
+from pico_lte.modules.mqtt import MQTT
+from pico_lte.modules.network import Network
+from pico_lte.modules.ssl import SSL
+from pico_lte.apps.aws import AWS
+from pico_lte.apps.azure import Azure
+from pico_lte.apps.google_sheets import GoogleSheets
+from pico_lte.apps.scriptr import Scriptr
+from pico_lte.apps.slack import Slack
+from pico_lte.apps.telegram import Telegram
+from pico_lte.apps.thingspeak import ThingSpeak
 
 
 def example_function(function_code):
@@ -220,11 +245,11 @@ class TestManager:
         is True with both cached and non-cached probabilities.
         """
         # Get FirstStep as current step.
-        predefined_state_manager.current.is_ok = True
+        predefined_state_manager.is_ok = True
         predefined_state_manager.organizer()
 
         # Get SecondStep to test.
-        predefined_state_manager.current.is_ok = True
+        predefined_state_manager.is_ok = True
         predefined_state_manager.current.cachable = True
         response = predefined_state_manager.organizer()
 
@@ -238,7 +263,7 @@ class TestManager:
         """
         # Get SecondStep as current step.
         predefined_state_manager.organizer()
-        predefined_state_manager.current.is_ok = True
+        predefined_state_manager.is_ok = True
         predefined_state_manager.organizer()
 
         counter_before = predefined_state_manager.retry_counter
@@ -255,6 +280,25 @@ class TestManager:
         predefined_state_manager.organizer()
         assert predefined_state_manager.current.name == "failure"
 
+    def test_steps_are_per_instance(self, predefined_state_manager):
+        """Test the managers don't share their steps and retry counters."""
+        other = StateManager(predefined_state_manager.first_step, "other_function")
+        other.counter_tick()
+
+        assert "SecondStep" not in other.steps
+        assert other.retry_counter == 1
+        assert predefined_state_manager.retry_counter == 0
+
+    def test_last_response_is_per_function(self, predefined_state_manager):
+        """Test the last responses of different functions don't overwrite each other."""
+        other = StateManager(predefined_state_manager.first_step, "other_function")
+        predefined_state_manager.organizer()
+        predefined_state_manager.execute_current_step()
+        config["cache"].set_last_response("other", "other_function")
+
+        assert other.success()["response"] == "other"
+        assert predefined_state_manager.success()["response"] == 1
+
     def test_execute_organizer_step(self):
         """No need to test this function for now."""
         assert True
@@ -265,8 +309,9 @@ class TestManager:
         predefined_state_manager.organizer()
         result = predefined_state_manager.execute_current_step()
 
-        assert config["cache"].get_last_response() == result["response"]
-        assert predefined_state_manager.current.is_ok == True
+        function_name = predefined_state_manager.function_name
+        assert config["cache"].get_last_response(function_name) == result["response"]
+        assert predefined_state_manager.is_ok == True
 
     def test_run_with_default_parameters(self, predefined_state_manager):
         """Tests the run() method without begin and end parameters."""
@@ -305,3 +350,224 @@ class TestManager:
                 break
 
         assert result.get("response") == expected_response
+
+    def test_run_end_step(self, predefined_state_manager):
+        """Tests the result of the end step, which is neither success nor failure."""
+        result = predefined_state_manager.run(begin="SecondStep", end="SecondStep")
+
+        assert result == {"interval": StateManager.NO_WAIT_INTERVAL}
+
+    def test_run_async(self, predefined_state_manager):
+        """Tests the run_async() method with coroutine and ordinary step functions."""
+
+        async def example_coroutine(function_code):
+            return {"status": Status.SUCCESS, "response": function_code * 10}
+
+        predefined_state_manager.get_step("FifthStep").function = example_coroutine
+        predefined_state_manager.get_step("FirstStep").interval = 0
+
+        result = asyncio.run(predefined_state_manager.run_async())
+
+        assert result == {"status": Status.SUCCESS, "response": 50, "interval": 0}
+
+
+class TestBackoff:
+    """Test class for the backoff policies."""
+
+    def test_fixed_backoff(self):
+        """Test FixedBackoff waits the same interval before each retry."""
+        backoff = FixedBackoff(3)
+        assert [backoff.delay(attempt, 3) for attempt in range(1, 4)] == [3, 3, 3]
+
+    def test_exponential_backoff(self):
+        """Test ExponentialBackoff multiplies the interval on each retry up to the cap."""
+        backoff = ExponentialBackoff(1, factor=2, cap=10)
+        assert [backoff.delay(attempt, None) for attempt in range(1, 7)] == [1, 2, 4, 8, 10, 10]
+
+    def test_decorrelated_jitter_backoff(self):
+        """Test DecorrelatedJitterBackoff waits between base and three times the previous."""
+        backoff = DecorrelatedJitterBackoff(1, cap=15)
+        previous = None
+        delays = []
+        for attempt in range(1, 50):
+            delay = backoff.delay(attempt, previous)
+            assert 1 <= delay <= min(15, (previous or 1) * 3)
+            delays.append(delay)
+            previous = delay
+        assert len(set(delays)) > 1
+
+
+class TestRetryPolicies:
+    """Test class for the backoff and the deadline of StateManager."""
+
+    @staticmethod
+    def failing_step(backoff=None, retry=3):
+        """It returns a step which always fails."""
+        return Step(
+            name="FailingStep",
+            function=lambda: {"status": Status.ERROR, "response": "failed"},
+            success="success",
+            fail="failure",
+            interval=5,
+            retry=retry,
+            backoff=backoff,
+        )
+
+    def test_backoff_intervals(self):
+        """Test the intervals between the retries follow the backoff policy of the step."""
+        sm = StateManager(Workflow([self.failing_step(ExponentialBackoff(1))], "backoff_test"))
+
+        intervals = [sm.run()["interval"] for _ in range(4)]
+
+        # the interval of the step is waited after the last retry, as without backoff
+        assert intervals == [1, 2, 4, 5]
+        assert sm.run()["status"] == Status.ERROR
+
+    def test_interval_without_backoff(self):
+        """Test the interval of the step is used if it has no backoff policy."""
+        sm = StateManager(Workflow([self.failing_step()], "no_backoff_test"))
+        assert [sm.run()["interval"] for _ in range(3)] == [5, 5, 5]
+
+    @pytest.mark.parametrize("clock", ["pico_lte.utils.manager"], indirect=True)
+    def test_deadline_exceeded(self, clock):
+        """Test the run fails when its deadline is exceeded, and intervals don't pass it."""
+        workflow = Workflow([self.failing_step(retry=100)], "deadline_test", deadline=12)
+        sm = StateManager(workflow)
+
+        assert sm.run()["interval"] == 5
+        clock["now"] = 10000
+        assert sm.run()["interval"] == 2
+
+        clock["now"] = 12000
+        result = sm.run()
+
+        assert result == {"status": Status.ERROR, "response": "Deadline exceeded", "interval": 0}
+        assert sm.current.name == "failure"
+
+
+class TestWorkflow:
+    """Test class for the Workflow class."""
+
+    @pytest.fixture
+    def workflow(self):
+        """This fixture returns a Workflow which has two steps with a Param placeholder."""
+        return Workflow(
+            [
+                Step(
+                    function=example_function,
+                    name="FirstStep",
+                    success="SecondStep",
+                    fail="failure",
+                    function_params={"function_code": Param("first")},
+                ),
+                Step(
+                    function=example_function,
+                    name="SecondStep",
+                    success="success",
+                    fail="failure",
+                    function_params={"function_code": 2},
+                ),
+            ],
+            "workflow_test",
+        )
+
+    @pytest.mark.parametrize("first", [1, 10])
+    def test_run_binds_params(self, mocker, workflow, first):
+        """Test each run binds the Param placeholders to its own params."""
+        first_step = workflow.get_steps()["FirstStep"]
+        first_step.function = mocker.Mock(side_effect=example_function)
+
+        result = workflow.run({"first": first})
+
+        first_step.function.assert_called_once_with(function_code=first)
+        assert result == {"status": Status.SUCCESS, "response": 2, "interval": 0}
+
+    def test_runs_share_steps(self, workflow):
+        """Test the runs share the steps of the workflow and don't change them."""
+        first = StateManager(workflow, params={"first": 1})
+        second = StateManager(workflow, params={"first": 2})
+        steps = dict(workflow.get_steps())
+
+        first.run()
+        first.run()
+
+        assert first.steps is second.steps is workflow.steps
+        assert workflow.steps == steps
+        assert first.function_name == "workflow_test"
+        assert first.current.name == "SecondStep"
+        assert second.current.name == "organizer"
+
+    def test_add_step_copies_steps(self, workflow):
+        """Test adding a step to a run doesn't add it to the workflow."""
+        manager = StateManager(workflow, params={"first": 1})
+        manager.add_step(Step("ExtraStep", example_function, "success", "failure"))
+
+        assert "ExtraStep" in manager.steps
+        assert "ExtraStep" not in workflow.get_steps()
+
+    def test_builder_is_called_once(self, mocker):
+        """Test the steps are built on the first run, and only once."""
+        step = Step("OnlyStep", example_function, "success", "failure", {"function_code": 5})
+        builder = mocker.Mock(return_value=[step])
+        workflow = Workflow(builder, "workflow_builder_test")
+        builder.assert_not_called()
+
+        assert workflow.run()["response"] == 5
+        assert workflow.run()["response"] == 5
+        builder.assert_called_once()
+
+    def test_compile_resolves_transitions(self, workflow):
+        """Test the transitions are resolved to the steps they go to."""
+        steps = workflow.get_steps()
+
+        assert steps["FirstStep"].success_step is steps["SecondStep"]
+        assert steps["FirstStep"].fail_step is steps["failure"]
+        assert steps["SecondStep"].success_step is steps["success"]
+
+    def test_compile_unknown_step(self):
+        """Test a transition to a step which doesn't exist is caught when compiling."""
+        with pytest.raises(ValueError):
+            Workflow([Step("FirstStep", example_function, "SecnodStep", "failure")])
+
+    def test_compile_report(self, mocker):
+        """Test the unreachable steps and the cycles are reported and warned about."""
+        warning = mocker.patch("pico_lte.common.debug.warning")
+        steps = [
+            Step("Check", example_function, "success", "Fix"),
+            Step("Fix", example_function, "Check", "failure"),
+            Step("Orphan", example_function, "success", "failure"),
+        ]
+
+        workflow = Workflow(steps, "compile_test")
+        warning.reset_mock()
+        report = workflow.compile()
+
+        assert report == {"unreachable": ["Orphan"], "cycle": ["Check", "Fix"]}
+        assert warning.call_count == 2
+
+        warning.reset_mock()
+        Workflow(steps[:2], "compile_test", deadline=60)
+        warning.assert_not_called()
+
+    def test_app_workflows_compile(self):
+        """Test the workflows of the modules and the apps have no broken transitions."""
+        atcom = ATCom()
+        base = Base(atcom)
+        network = Network(atcom, base)
+        http, mqtt, ssl = HTTP(atcom), MQTT(atcom), SSL(atcom)
+        auth = Auth(atcom, File(atcom))
+        apps = [
+            network,
+            AWS(base, auth, network, ssl, mqtt, http),
+            Azure(base, auth, network, ssl, mqtt, http),
+            ThingSpeak(base, network, mqtt),
+            GoogleSheets(base, network, http),
+            Telegram(base, network, http),
+            Slack(base, network, http),
+            Scriptr(base, network, http),
+        ]
+
+        for app in apps:
+            for name in dir(app):
+                if name.endswith("_workflow"):
+                    assert getattr(app, name).compile()["unreachable"] == []
@@ -0,0 +1,114 @@
+"""
+Test module for the utils.rx_pump module.
+"""
+
+import time
+
+import pytest
+
+from pico_lte.utils.atcom import ATCom
+from pico_lte.utils.rx_pump import RXPump
+from pico_lte.utils.status import Status
+from pico_lte.utils.transcript import RecordingUART
+from tests.simulator import BG95Simulator
+
+
+def wait_until(condition, timeout=1):
+    """Waits until the condition is True, and returns its last value."""
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+
+class TestRXPump:
+    """Test class for RXPump."""
+
+    @pytest.fixture
+    def pump(self):
+        """It returns a running RXPump over a simulator, and stops it after the test."""
+        pump = RXPump(BG95Simulator(latency=0, echo=False), buffer_size=64)
+        pump.start()
+        yield pump
+        pump.stop()
+
+    def test_drains_uart_in_background(self, pump):
+        """Test the bytes are moved from UART without being read by the caller."""
+        pump.uart.inject("+QIURC: 1")
+
+        assert wait_until(lambda: pump.any() == 13)
+        assert pump.uart.any() == 0
+
+        buf = bytearray(32)
+        assert pump.readinto(buf) == 13
+        assert bytes(buf[:13]) == b"\r\n+QIURC: 1\r\n"
+        assert pump.readinto(buf) is None
+
+    def test_write(self, pump):
+        """Test the writes are passed to UART."""
+        pump.write(b"AT\r")
+
+        assert wait_until(lambda: pump.any() == 6)
+        assert pump.uart.commands == ["AT"]
+
+    def test_stop(self, pump):
+        """Test stop() waits until the thread exits."""
+        pump.stop()
+
+        assert pump.stopped
+        pump.uart.inject("RDY")
+        time.sleep(0.01)
+        assert pump.any() == 0
+
+
+class TestATComRXPump:
+    """Test class for running ATCom over RXPump."""
+
+    @pytest.fixture
+    def atcom(self):
+        """It returns an ATCom instance which talks to the simulator."""
+        atcom = ATCom()
+        atcom.modem_com = BG95Simulator(latency=0.002, echo=False)
+        yield atcom
+        atcom.stop_rx_pump()
+
+    def test_send_at_comm(self, atcom):
+        """Test commands are answered while the pump is running."""
+        simulator = atcom.modem_com
+        atcom.start_rx_pump()
+
+        assert isinstance(atcom.modem_com, RXPump)
+        assert atcom.send_at_comm("AT+CPIN?")["response"] == ["+CPIN: READY", "OK"]
+
+        atcom.stop_rx_pump()
+        assert atcom.modem_com is simulator
+
+    def test_urc_between_commands(self, atcom):
+        """Test a URC arriving between commands is kept by the pump."""
+        atcom.start_rx_pump()
+        atcom.modem_com.uart.inject("+QMTSTAT: 0,1")
+
+        assert wait_until(lambda: atcom.rx_pump.any())
+        result = atcom.get_urc_response("+QMTSTAT: 0,1", timeout=1)
+        assert result["status"] == Status.SUCCESS
+
+    def test_stop_keeps_pumped_bytes(self, atcom):
+        """Test the bytes in the pump are moved to ATCom when it is stopped."""
+        atcom.start_rx_pump()
+        atcom.modem_com.uart.inject("RDY")
+        wait_until(lambda: atcom.rx_pump.any())
+
+        atcom.stop_rx_pump()
+        assert bytes(atcom.rx_buffer.readline()) == b"RDY"
+
+    def test_pump_under_recording(self, atcom, tmp_path):
+        """Test the pump is placed under the recording wrapper."""
+        atcom.start_recording(str(tmp_path / "session.bin"))
+        atcom.start_rx_pump()
+
+        assert isinstance(atcom.modem_com, RecordingUART)
+        assert atcom.modem_com.uart is atcom.rx_pump
+
+        atcom.stop_rx_pump()
+        assert isinstance(atcom.modem_com.uart, BG95Simulator)
+        atcom.stop_recording()
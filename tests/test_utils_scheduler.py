@@ -0,0 +1,84 @@
+"""
+Test module for the utils.scheduler module.
+"""
+
+import pytest
+
+from pico_lte.utils.manager import Step, Workflow
+from pico_lte.utils.scheduler import Scheduler
+from pico_lte.utils.status import Status
+
+
+@pytest.mark.parametrize("clock", ["pico_lte.utils.scheduler"], indirect=True)
+class TestScheduler:
+    """Test class for Scheduler."""
+
+    @staticmethod
+    def make_workflow(name, intervals, calls, clock, status=Status.SUCCESS):
+        """It returns a workflow of steps with the given intervals, recording their calls."""
+
+        def step_function(code):
+            calls.append((code, clock["now"]))
+            return {"status": status, "response": code}
+
+        steps = []
+        for index, interval in enumerate(intervals):
+            last = index == len(intervals) - 1
+            steps.append(
+                Step(
+                    name=f"{name}{index}",
+                    function=step_function,
+                    success="success" if last else f"{name}{index + 1}",
+                    fail="failure",
+                    function_params={"code": f"{name}{index}"},
+                    interval=interval,
+                )
+            )
+        return Workflow(steps, f"scheduler_test_{name}")
+
+    def test_interleaves_managers(self, clock):
+        """Test the steps of the managers run when due, not one manager after another."""
+        calls = []
+        scheduler = Scheduler()
+        scheduler.add(self.make_workflow("a", [2, 0], calls, clock))
+        scheduler.add(self.make_workflow("b", [1, 1, 0], calls, clock))
+
+        results = scheduler.run()
+
+        assert calls == [("a0", 0), ("b0", 0), ("b1", 1000), ("a1", 2000), ("b2", 2000)]
+        assert clock["sleeps"] == [1000, 1000]
+        assert results == [
+            {"status": Status.SUCCESS, "response": "a1", "interval": 0},
+            {"status": Status.SUCCESS, "response": "b2", "interval": 0},
+        ]
+        assert scheduler.jobs == []
+
+    def test_run_once(self, clock):
+        """Test run_once() returns the time until the next step, and None at the end."""
+        calls = []
+        scheduler = Scheduler()
+        job = scheduler.add(self.make_workflow("a", [3], calls, clock))
+
+        assert scheduler.run_once() == 3000
+        clock["now"] += 1000
+        assert scheduler.run_once() == 2000
+        assert calls == [("a0", 0)]
+
+        clock["now"] += 2000
+        while not job.finished:
+            scheduler.run_once()
+
+        assert scheduler.run_once() is None
+        assert job.result["status"] == Status.SUCCESS
+
+    def test_callback_and_failure(self, mocker, clock):
+        """Test the callback is called with the final result of a failing manager."""
+        callback = mocker.Mock()
+        scheduler = Scheduler()
+        workflow = self.make_workflow("a", [0], [], clock, status=Status.ERROR)
+        job = scheduler.add(workflow, callback=callback)
+
+        scheduler.run()
+
+        callback.assert_called_once_with(job.result)
+        assert job.result["status"] == Status.ERROR
@@ -0,0 +1,103 @@
+"""
+Test module for the utils.state_store module.
+"""
+
+import pytest
+
+from pico_lte.common import StateCache
+from pico_lte.utils.helpers import read_json_file, write_json_file
+from pico_lte.utils.state_store import StateStore
+
+STORE_CLOCK = pytest.mark.parametrize("clock", ["pico_lte.utils.state_store"], indirect=True)
+
+
+class TestStateStore:
+    """Test class for StateStore."""
+
+    @pytest.fixture
+    def file_path(self, tmp_path):
+        """It returns the path of the state file in a temporary directory."""
+        return str(tmp_path / "state_cache.json")
+
+    @STORE_CLOCK
+    def test_save_and_load(self, file_path, clock):
+        """Test the states are saved in the versioned format without the empty ones."""
+        store = StateStore(file_path, "866123456789012")
+        store.save({"aws.publish_message": "ssl_configuration", "register_network": None})
+
+        assert read_json_file(file_path) == {
+            "v": StateStore.VERSION,
+            "id": "866123456789012",
+            "s": {"aws.publish_message": "ssl_configuration"},
+        }
+        assert StateStore(file_path, "866123456789012").load() == {
+            "aws.publish_message": "ssl_configuration"
+        }
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            None,
+            {"v": StateStore.VERSION, "id": "another_modem", "s": {"aws.publish": "ssl"}},
+            {"v": StateStore.VERSION + 1, "id": "866123456789012", "s": {"aws.publish": "ssl"}},
+            {"v": StateStore.VERSION, "id": "866123456789012", "s": "broken"},
+        ],
+    )
+    def test_load_invalid(self, file_path, data):
+        """Test the states are discarded if the file is missing, old or for another modem."""
+        if data is not None:
+            write_json_file(file_path, data)
+
+        assert StateStore(file_path, "866123456789012").load() == {}
+
+    @STORE_CLOCK
+    def test_writes_are_coalesced(self, mocker, file_path, clock):
+        """Test the states changing within the flush interval are written once."""
+        writer = mocker.patch(
+            "pico_lte.utils.state_store.write_json_file", side_effect=write_json_file
+        )
+        store = StateStore(file_path, "id", flush_interval=5000)
+
+        store.save({"aws": "ssl_configuration"})
+        clock["now"] = 1000
+        store.save({"aws": "set_mqtt_configs"})
+        store.save({"aws": "publish_message"})
+        assert writer.call_count == 1
+
+        clock["now"] = 6000
+        store.save({"aws": "publish_message", "azure": "ssl_configuration"})
+        assert writer.call_count == 2
+
+        clock["now"] = 7000
+        store.save({"aws": "publish_message", "azure": "ssl_configuration"})
+        store.flush()
+        assert writer.call_count == 2  # nothing has changed
+
+        store.save({"aws": "publish_message"})
+        store.flush()
+        assert writer.call_count == 3
+        assert StateStore(file_path, "id").load() == {"aws": "publish_message"}
+
+    @STORE_CLOCK
+    def test_clear(self, file_path, clock):
+        """Test clear() discards the saved states."""
+        store = StateStore(file_path, "id")
+        store.save({"aws": "ssl_configuration"})
+
+        store.clear()
+
+        assert StateStore(file_path, "id").load() == {}
+
+    @STORE_CLOCK
+    def test_state_cache_with_store(self, file_path, clock):
+        """Test StateCache restores the saved states, and saves its changing states."""
+        StateStore(file_path, "id").save({"aws.publish_message": "ssl_configuration"})
+
+        cache = StateCache()
+        cache.set_store(StateStore(file_path, "id"))
+        assert cache.get_state("aws.publish_message") == "ssl_configuration"
+
+        cache.set_state("aws.publish_message", "publish_message")
+        cache.flush()
+
+        assert StateStore(file_path, "id").load() == {"aws.publish_message": "publish_message"}
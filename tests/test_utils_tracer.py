@@ -0,0 +1,108 @@
+"""
+Test module for the utils.tracer module.
+"""
+
+import pytest
+
+from pico_lte.utils.manager import StateManager, Step, Workflow
+from pico_lte.utils.status import Status
+from pico_lte.utils.tracer import RunTrace, StepTracer
+
+
+@pytest.mark.parametrize(
+    "clock", [("pico_lte.utils.manager", "pico_lte.utils.tracer")], indirect=True
+)
+class TestStepTracer:
+    """Test class for StepTracer."""
+
+    @pytest.fixture
+    def tracer(self, mocker):
+        """It sets a tracer for all state managers during the test."""
+        tracer = StepTracer(capacity=2)
+        mocker.patch.object(StateManager, "tracer", tracer)
+        return tracer
+
+    @staticmethod
+    def make_workflow(clock, fails=1):
+        """It returns a workflow whose steps take time, the second failing #fails times."""
+        calls = {"connect": 0}
+
+        def register():
+            clock["now"] += 3000
+            return {"status": Status.SUCCESS, "response": "registered"}
+
+        def connect():
+            clock["now"] += 500
+            calls["connect"] += 1
+            status = Status.ERROR if calls["connect"] <= fails else Status.SUCCESS
+            return {"status": status, "response": "connect"}
+
+        return Workflow(
+            [
+                Step("register", register, "connect", "failure"),
+                Step("connect", connect, "success", "failure", retry=2),
+            ],
+            "tracer_test",
+        )
+
+    def test_traces_a_run(self, clock, tracer):
+        """Test the steps, transitions, retries and the total time of a run are recorded."""
+        result = self.make_workflow(clock).run()
+
+        assert result["status"] == Status.SUCCESS
+        trace = tracer.runs[0]
+        assert trace.function_name == "tracer_test"
+        assert trace.steps == [
+            ("register", 3000, Status.SUCCESS),
+            ("connect", 500, Status.ERROR),
+            ("connect", 500, Status.SUCCESS),
+        ]
+        assert trace.transitions == [
+            ("organizer", "register"),
+            ("register", "connect"),
+            ("connect", "connect"),
+            ("connect", "success"),
+        ]
+        assert trace.retries == 1
+        assert trace.total == 4000
+        assert trace.status == Status.SUCCESS
+
+    def test_summary(self, clock, tracer):
+        """Test the summary adds up the stored runs of each function."""
+        workflow = self.make_workflow(clock, fails=0)
+        workflow.run()
+        workflow.run()
+
+        assert tracer.summary("tracer_test") == {
+            "runs": 2,
+            "total": 7000,
+            "retries": 0,
+            "steps": {
+                "register": {"count": 2, "total": 6000, "max": 3000, "failures": 0},
+                "connect": {"count": 2, "total": 1000, "max": 500, "failures": 0},
+            },
+        }
+        assert list(tracer.summary()) == ["tracer_test"]
+        assert tracer.summary("unknown") is None
+
+    def test_buffer_is_bounded(self, clock, tracer):
+        """Test only the last runs are kept, and the events of a run are limited."""
+        workflow = self.make_workflow(clock, fails=0)
+        for _ in range(3):
+            workflow.run()
+        assert len(tracer.runs) == 2
+
+        trace = RunTrace("bounded", max_events=1)
+        trace.step("first", 1, Status.SUCCESS)
+        trace.step("second", 1, Status.SUCCESS)
+        assert trace.steps == [("first", 1, Status.SUCCESS)]
+        assert trace.dropped == 1
+
+        tracer.clear()
+        assert tracer.runs == []
+
+    def test_no_tracer(self, clock):
+        """Test the runs aren't traced without a tracer."""
+        manager = StateManager(self.make_workflow(clock))
+        manager.run()
+        assert manager.trace is None
@@ -0,0 +1,159 @@
+"""
+Test module for the utils.transcript module.
+"""
+
+import time
+
+import pytest
+
+from pico_lte.modules.base import Base
+from pico_lte.modules.mqtt import MQTT
+from pico_lte.utils.atcom import ATCom
+from pico_lte.utils.status import Status
+from pico_lte.utils.transcript import (
+    MAGIC,
+    READ,
+    WRITTEN,
+    RecordingUART,
+    TranscriptPlayer,
+    TranscriptRecorder,
+    parse_transcript,
+)
+from tests.simulator import BG95Simulator
+
+
+def record_session(file_path):
+    """Records an MQTT session with the simulator and returns the results."""
+    atcom = ATCom()
+    atcom.modem_com = BG95Simulator(latency=0.02, urc_latency=0.05, echo=False)
+    atcom.modem_com.active_contexts.add(1)
+    atcom.start_recording(file_path)
+
+    results = run_session(atcom)
+
+    atcom.stop_recording()
+    return results
+
+
+def run_session(atcom):
+    """Runs the same commands over the given ATCom instance."""
+    mqtt = MQTT(atcom)
+    return [
+        Base(atcom).check_sim_ready(),
+        mqtt.open_connection("broker.example.com", 1883),
+        mqtt.connect_broker("client"),
+        mqtt.publish_message("hello", "sensors/1"),
+    ]
+
+
+class TestTranscriptRecorder:
+    """Test class for TranscriptRecorder and RecordingUART."""
+
+    def test_record_and_parse(self, tmp_path):
+        """Test the records are written into the file and parsed back."""
+        file_path = str(tmp_path / "session.bin")
+        recorder = TranscriptRecorder(file_path, buffer_size=1024)
+        recorder.record(WRITTEN, b"AT\r")
+        recorder.record(READ, b"\r\nOK\r\n")
+
+        with open(file_path, "rb") as file:
+            assert file.read() == b""  # records are still buffered
+
+        recorder.close()
+        with open(file_path, "rb") as file:
+            records = parse_transcript(file.read())
+
+        assert [(direction, data) for direction, _, data in records] == [
+            (WRITTEN, b"AT\r"),
+            (READ, b"\r\nOK\r\n"),
+        ]
+        assert records[0][1] <= records[1][1]
+
+    def test_parse_invalid_transcript(self):
+        """Test parsing a file which isn't a transcript."""
+        with pytest.raises(ValueError):
+            parse_transcript(b"garbage")
+
+    def test_recording_uart(self, tmp_path, mocker):
+        """Test the wrapper records the bytes passing through the UART."""
+        uart = mocker.Mock()
+        uart.readinto.side_effect = lambda buf: buf.__setitem__(slice(0, 4), b"OK\r\n") or 4
+        recorder = mocker.Mock()
+        wrapper = RecordingUART(uart, recorder)
+
+        wrapper.write(b"AT\r")
+        assert wrapper.readinto(bytearray(16)) == 4
+
+        uart.write.assert_called_once_with(b"AT\r")
+        assert recorder.record.call_args_list == [
+            mocker.call(WRITTEN, b"AT\r"),
+            mocker.call(READ, b"OK\r\n"),
+        ]
+
+    def test_start_and_stop_recording(self, tmp_path):
+        """Test ATCom wraps and unwraps its UART while recording."""
+        atcom = ATCom()
+        uart = atcom.modem_com
+
+        atcom.start_recording(str(tmp_path / "session.bin"))
+        assert isinstance(atcom.modem_com, RecordingUART)
+
+        atcom.stop_recording()
+        assert atcom.modem_com is uart
+        assert atcom.recorder is None
+
+
+class TestTranscriptPlayer:
+    """Test class for replaying the transcripts through TranscriptPlayer."""
+
+    def test_replay_recorded_session(self, tmp_path):
+        """Test a recorded session gives the same results when it is replayed."""
+        file_path = str(tmp_path / "session.bin")
+        recorded = record_session(file_path)
+        assert all(result["status"] == Status.SUCCESS for result in recorded)
+
+        atcom = ATCom()
+        atcom.modem_com = TranscriptPlayer(file_path)
+        started = time.time()
+        replayed = run_session(atcom)
+
+        assert replayed == recorded
+        assert atcom.modem_com.mismatches == []
+        assert atcom.modem_com.finished
+        assert time.time() - started < 0.18  # faster than the recorded latencies
+
+    def test_replay_with_original_timing(self, tmp_path):
+        """Test the reads are delayed as much as they were recorded."""
+        file_path = str(tmp_path / "session.bin")
+        record_session(file_path)
+
+        atcom = ATCom()
+        atcom.modem_com = TranscriptPlayer(file_path, speed=1.0)
+        started = time.time()
+        run_session(atcom)
+
+        assert time.time() - started >= 0.18  # 4 * 20 ms responses, 2 * 50 ms URCs
+
+    def test_replay_mismatch(self):
+        """Test a write which differs from the recorded one is reported."""
+        player = TranscriptPlayer(MAGIC)
+        player.write(b"AT\r")
+
+        assert player.mismatches == [(b"", b"AT\r")]
+
+    def test_reads_wait_for_preceding_write(self, tmp_path):
+        """Test a recorded read isn't given before the preceding write."""
+        file_path = str(tmp_path / "session.bin")
+        recorder = TranscriptRecorder(file_path)
+        recorder.record(READ, b"RDY\r\n")
+        recorder.record(WRITTEN, b"AT\r")
+        recorder.record(READ, b"OK\r\n")
+        recorder.close()
+
+        player = TranscriptPlayer(file_path)
+        assert player.read() == b"RDY\r\n"
+        assert player.read() is None
+
+        player.write(b"AT\r")
+        assert player.read() == b"OK\r\n"
+        assert player.finished
@@ -0,0 +1,171 @@
+"""
+Test module for the utils.workflow_loader module.
+"""
+
+import pytest
+
+from pico_lte.apps.scriptr import Scriptr
+from pico_lte.apps.slack import Slack
+from pico_lte.apps.telegram import Telegram
+from pico_lte.modules.base import Base
+from pico_lte.modules.http import HTTP
+from pico_lte.modules.network import Network
+from pico_lte.utils.atcom import ATCom
+from pico_lte.utils.helpers import write_json_file
+from pico_lte.utils.manager import DecorrelatedJitterBackoff, ExponentialBackoff, Param
+from pico_lte.utils.status import Status
+from pico_lte.utils.workflow_loader import load_workflow, read_workflow
+
+
+class Target:
+    """Example target whose methods are called by the workflows."""
+
+    def __init__(self):
+        self.calls = []
+
+    def connect(self):
+        """It records the call and succeeds."""
+        self.calls.append("connect")
+        return {"status": Status.SUCCESS, "response": "connected"}
+
+    def send(self, data, qos=0):
+        """It records the call and succeeds."""
+        self.calls.append(("send", data, qos))
+        return {"status": Status.SUCCESS, "response": data}
+
+
+DEFINITION = {
+    "name": "loader_test",
+    "deadline": 60,
+    "steps": [
+        {"name": "connect", "call": "target.connect", "cachable": True},
+        {"name": "send", "call": "target.send", "params": {"data": "$data", "qos": 1}, "retry": 2},
+    ],
+}
+
+
+class TestWorkflowLoader:
+    """Test class for the workflow loader."""
+
+    def test_load_workflow(self):
+        """Test the steps are compiled with the default transitions and Param placeholders."""
+        workflow = load_workflow(DEFINITION, {"target": Target()})
+
+        assert workflow.function_name == "loader_test"
+        assert workflow.deadline == 60
+
+        steps = workflow.get_steps()
+        assert (steps["connect"].success, steps["connect"].fail) == ("send", "failure")
+        assert steps["connect"].cachable is True
+        assert (steps["send"].success, steps["send"].retry) == ("success", 2)
+        assert isinstance(steps["send"].function_params["data"], Param)
+        assert workflow.first_step is steps["connect"]
+
+    def test_load_backoff(self):
+        """Test the backoff policies are built like the steps defined in code."""
+        definition = {
+            "deadline": 300,
+            "steps": [
+                {
+                    "name": "connect",
+                    "call": "target.connect",
+                    "retry": 60,
+                    "backoff": {"type": "jitter", "base": 1, "cap": 15},
+                },
+                {
+                    "name": "send",
+                    "call": "target.send",
+                    "retry": 3,
+                    "backoff": {"type": "exponential", "base": 2},
+                },
+            ],
+        }
+
+        workflow = load_workflow(definition, {"target": Target()})
+        steps = workflow.get_steps()
+
+        assert workflow.deadline == 300
+        assert isinstance(steps["connect"].backoff, DecorrelatedJitterBackoff)
+        assert (steps["connect"].backoff.base, steps["connect"].backoff.cap) == (1, 15)
+        assert isinstance(steps["send"].backoff, ExponentialBackoff)
+        assert [steps["send"].backoff.delay(attempt, None) for attempt in (1, 2, 3)] == [2, 4, 8]
+
+    def test_run_loaded_workflow(self):
+        """Test a loaded workflow calls the methods of the targets with the run params."""
+        target = Target()
+        workflow = load_workflow(DEFINITION, {"target": target})
+
+        result = workflow.run({"data": "hello"})
+
+        assert result["status"] == Status.SUCCESS
+        assert result["response"] == "hello"
+        assert target.calls == ["connect", ("send", "hello", 1)]
+
+    @pytest.mark.parametrize(
+        "steps",
+        [
+            [],
+            ["connect"],
+            [{"name": "connect"}],
+            [{"name": "connect", "call": "target.unknown"}],
+            [{"name": "connect", "call": "other.connect"}],
+            [{"name": "connect", "call": "target.connect", "timeout": 5}],
+            [{"name": "connect", "call": "target.connect", "params": [1]}],
+            [{"name": "connect", "call": "target.connect", "success": "sned"}],
+            [
+                {"name": "connect", "call": "target.connect"},
+                {"name": "connect", "call": "target.send"},
+            ],
+            [{"name": "connect", "call": "target.connect", "backoff": "jitter"}],
+            [{"name": "connect", "call": "target.connect", "backoff": {"type": "linear"}}],
+            [{"name": "connect", "call": "target.connect", "backoff": {"type": "fixed"}}],
+            [
+                {
+                    "name": "connect",
+                    "call": "target.connect",
+                    "backoff": {"type": "jitter", "base": 1, "factor": 2},
+                }
+            ],
+            [
+                {
+                    "name": "connect",
+                    "call": "target.connect",
+                    "backoff": {"type": "fixed", "interval": "5"},
+                }
+            ],
+        ],
+    )
+    def test_invalid_definition(self, steps):
+        """Test the invalid definitions are rejected while loading."""
+        with pytest.raises(ValueError):
+            load_workflow({"steps": steps}, {"target": Target()})
+
+    @pytest.mark.parametrize("extra", [{"deadline": "5 minutes"}, {"timeout": 60}])
+    def test_invalid_workflow_keys(self, extra):
+        """Test the invalid keys of the workflow are rejected while loading."""
+        definition = dict(DEFINITION, **extra)
+
+        with pytest.raises(ValueError):
+            load_workflow(definition, {"target": Target()})
+
+    def test_read_workflow(self, tmp_path):
+        """Test the workflows are read from JSON files."""
+        file_path = str(tmp_path / "workflow.json")
+        write_json_file(file_path, DEFINITION)
+
+        workflow = read_workflow(file_path, {"target": Target()})
+        assert list(workflow.get_steps())[-2:] == ["connect", "send"]
+
+        with pytest.raises(ValueError):
+            read_workflow(str(tmp_path / "missing.json"), {"target": Target()})
+
+    @pytest.mark.parametrize("app", [Telegram, Slack, Scriptr])
+    def test_app_definitions(self, app):
+        """Test the workflow definitions of the apps are valid."""
+        atcom = ATCom()
+        base = Base(atcom)
+        app_object = app(base, Network(atcom, base), HTTP(atcom))
+
+        for name in dir(app_object):
+            if name.endswith("_workflow"):
+                assert getattr(app_object, name).get_steps()